@@ -1,57 +1,158 @@
 import random
-from utilities import random_orientation, generate_random_coordinate
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+from endgame import ENDGAME_TIME_CAP, endgame_counts, endgame_shot
+from metrics import METRICS, COUNT_BUCKETS
+from placements import has_table, make_placement, placement_table
+from utilities import BOARD_SIZE, CELL_ROW_COL, DIRECTION_STEPS, RAYS
+
+# Number of whole-fleet draws tried by uniform placement before falling back to ship-by-ship placement
+UNIFORM_PLACEMENT_ATTEMPTS = 1000
+
+# Random positions tried for one ship on a board without a placement table before giving up
+RANDOM_PLACEMENT_ATTEMPTS = 10000
+
+# Boards with more cells than this keep only the targeted cells in their `ShotPool` and draw by rejection sampling,
+# since a list and a dict entry per cell would cost far more than the ships and shots on a large sparse board
+POOL_CELL_LIMIT = 4096
 
 # Function for AI to place ships on the board
-def ai_place_ships(board, ships):
-    # For each ship in the ship types, attempt to place it on the board randomly
-    for ship in ships.ship_types:
-        placed = False
-        while not placed:
-            # Randomly choose orientation (horizontal/vertical) and starting coordinate
-            orientation = random_orientation()
-            start_coordinate = generate_random_coordinate()
-
-            # Parse the start coordinate (handling cases like A10)
-            if len(start_coordinate) == 3 and start_coordinate[1:] == "10":
-                col = ord(start_coordinate[0]) - ord('A')  # Convert column letter to index (A=0, B=1,...)
-                row = 9  # Row 10 is index 9
+def ai_place_ships(board, ships, uniform=False):
+    """
+    AI places its fleet by drawing each ship directly from the placements that are still valid,
+    so the work per fleet is bounded by the size of the placement table.
+    With `uniform=True` every complete fleet layout is equally likely.
+    Boards too large for a placement table draw random positions until each ship fits.
+    Ships are numbered from 1 in fleet order (see `Ships.set_fleet`).
+    """
+    lengths = [ship[1] for ship in ships.ship_types]
+    if uniform:
+        layout = sample_uniform_fleet(board, lengths)
+        if layout is not None:
+            for ship_id, placement in enumerate(layout, 1):
+                board.add_ship(placement, ship_id)  # Place the ship on the board
+            return
+
+    if not has_table(board.size, max(lengths, default=0)):
+        for ship_id, length in enumerate(lengths, 1):
+            board.add_ship(_random_placement(board, length), ship_id)  # Place the ship on the board
+        return
+
+    table = placement_table(board.size)
+    # For each ship in the ship types, choose one of the placements that fit on the board and overlap nothing
+    for ship_id, length in enumerate(lengths, 1):
+        candidates = [placement for placement in table.for_length(length) if board.can_place(placement)]
+        if not candidates:
+            raise ValueError("No room left on the board for a ship of size " + str(length) + ".")
+        board.add_ship(random.choice(candidates), ship_id)  # Place the ship on the board
+
+# Draw random positions for a ship of `length` until one fits on the board, for boards without a placement table.
+# On a large board with a sparse fleet almost every draw fits, so this costs a few lookups per ship.
+def _random_placement(board, length):
+    size = board.size
+    if length <= size:
+        for _ in range(RANDOM_PLACEMENT_ATTEMPTS):
+            if random.random() < 0.5:
+                placement = make_placement(random.randrange(size), random.randrange(size - length + 1), length, 'h', size)
             else:
-                col = ord(start_coordinate[0]) - ord('A')  # Convert column letter to index
-                row = int(start_coordinate[1]) - 1  # Convert row to 0-based index
-
-            try:
-                # Handle horizontal placement
-                if orientation == 'h':
-                    if col + ship[1] > 10 or any(not board.is_empty(row, col + i) for i in range(ship[1])):
-                        continue  # Skip to next iteration if placement isn't valid
-                    for i in range(ship[1]):
-                        board.board[row][col + i] = ship[1]  # Place ship horizontally on the board
-
-                # Handle vertical placement
-                else:
-                    if row + ship[1] > 10 or any(not board.is_empty(row + i, col) for i in range(ship[1])):
-                        continue  # Skip to next iteration if placement isn't valid
-                    for i in range(ship[1]):
-                        board.board[row + i][col] = ship[1]  # Place ship vertically on the board
-
-                placed = True  # Mark the ship as placed successfully
-            except Exception:
-                continue  # In case of any error, skip and try again
+                placement = make_placement(random.randrange(size - length + 1), random.randrange(size), length, 'v', size)
+            if board.can_place(placement):
+                return placement
+            if METRICS.enabled:
+                METRICS.count('placement_retries_total', strategy='random')
+    raise ValueError("No room left on the board for a ship of size " + str(length) + ".")
+
+# Draw a complete fleet layout uniformly at random from all non-overlapping layouts.
+# Each ship is drawn from every placement of its length and the whole draw is rejected if any ships overlap,
+# which keeps the result exactly uniform. Returns the list of placements, or None if no draw succeeded
+# within `UNIFORM_PLACEMENT_ATTEMPTS` tries or the board is too large for a placement table.
+def sample_uniform_fleet(board, lengths):
+    if not has_table(board.size, max(lengths, default=0)):
+        return None
+    table = placement_table(board.size)
+    choices = [table.for_length(length) for length in lengths]
+    for _ in range(UNIFORM_PLACEMENT_ATTEMPTS):
+        occupied = board.ship_mask
+        layout = []
+        for placements in choices:
+            placement = random.choice(placements)
+            if placement.mask & occupied:
+                break  # Overlap, so reject the whole fleet and start over
+            occupied |= placement.mask
+            layout.append(placement)
+        else:
+            return layout
+        if METRICS.enabled:
+            METRICS.count('placement_retries_total', strategy='uniform')
+    return None
+
+# Tracks the coordinates an AI has targeted during one game.
+# It works like the set of targeted (row, col) pairs (`in`, `add`, iteration), and also keeps every untargeted
+# cell in a swap-remove list, so a random untargeted cell can be drawn in constant time however full the board is.
+# Boards with more than `POOL_CELL_LIMIT` cells skip the list (`untargeted` and `positions` are None) and draw
+# random cells until an untargeted one comes up, which is quick while most of a large board is still open.
+class ShotPool:
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size  # Number of rows and columns of the board being fired at
+        self.targeted = set()  # Coordinates that have already been fired at
+        self.untargeted = None  # Cells still available
+        self.positions = None  # Index of each cell in `untargeted`
+        if size * size <= POOL_CELL_LIMIT:
+            self.untargeted = [(row, col) for row in range(size) for col in range(size)]
+            self.positions = {cell: i for i, cell in enumerate(self.untargeted)}
+
+    def __contains__(self, cell):
+        return cell in self.targeted
+
+    def __iter__(self):
+        return iter(self.targeted)
+
+    def __len__(self):
+        return len(self.targeted)
+
+    # Mark a coordinate as targeted, removing it from the pool by swapping the last cell into its slot.
+    def add(self, cell):
+        if self.positions is None:
+            if 0 <= cell[0] < self.size and 0 <= cell[1] < self.size:
+                self.targeted.add(cell)
+            return
+        position = self.positions.pop(cell, None)
+        if position is None:
+            return  # Already targeted (or not on the board)
+        last = self.untargeted.pop()
+        if position < len(self.untargeted):
+            self.untargeted[position] = last
+            self.positions[last] = position
+        self.targeted.add(cell)
+
+    # Pick a random untargeted coordinate, mark it as targeted and return it as (row, col).
+    def draw(self):
+        if self.untargeted is None:
+            if len(self.targeted) >= self.size * self.size:
+                raise IndexError("Every coordinate has already been targeted.")
+            while True:
+                cell = (random.randrange(self.size), random.randrange(self.size))
+                if cell not in self.targeted:
+                    self.targeted.add(cell)
+                    return cell
+                if METRICS.enabled:
+                    METRICS.count('shot_draw_rejections_total')
+        if not self.untargeted:
+            raise IndexError("Every coordinate has already been targeted.")
+        cell = self.untargeted[random.randrange(len(self.untargeted))]
+        self.add(cell)
+        return cell
 
 # AI fires randomly at untargeted locations (Easy Mode)
 def ai_fire_easy(board, targeted_coordinates):
     """
     AI fires at a random untargeted location.
+    `targeted_coordinates` is the AI's `ShotPool`, so each shot takes constant time.
     """
-    while True:
-        # Generate random column and row
-        col = random.randint(0, 9)  # Columns from 0 (A) to 9 (J)
-        row = random.randint(0, 9)  # Rows from 0 (1) to 9 (10)
-
-        # Check if the chosen coordinate has been targeted before
-        if (row, col) not in targeted_coordinates:
-            targeted_coordinates.add((row, col))  # Mark the coordinate as targeted
-            return chr(ord('A') + col) + str(row + 1)  # Return the coordinate in the correct format (e.g., 'A5')
+    row, col = targeted_coordinates.draw()  # Draw a coordinate that has not been targeted before
+    return row * targeted_coordinates.size + col  # Return the cell index (see `utilities.COORDINATES` for the 'A5' form)
 
 # AI targets ship segments directly (Hard Mode)
 def ai_fire_hard(board):
@@ -59,36 +160,346 @@ def ai_fire_hard(board):
     AI fires and always hits a ship's segment.
     It systematically searches for any ship segment and targets it.
     """
-    for row in range(10):
-        for col in range(10):
+    for row in range(board.size):
+        for col in range(board.size):
             # If the cell contains part of a ship (int) and hasn't been hit yet
             if isinstance(board.board[row][col], int):
-                return chr(ord('A') + col) + str(row + 1)  # Convert to coordinate format and return
+                return row * board.size + col  # Return the cell index
     return None  # Return None if no ship segment is left (this should not happen if game isn't over)
 
+# Extra weight given to placements that pass through unresolved hits, so the AI finishes off wounded ships first
+HIT_WEIGHT = 20
+
+# Count, for every cell, the ship placements along each row that cover it.
+# `blocked` and `hits` are 0/1 integer arrays; placements through a blocked cell are skipped and each placement
+# is weighted by how many hits it passes through when `target_mode` is on.
+def _row_density(blocked, hits, lengths, target_mode):
+    size = blocked.shape[1]
+    density = np.zeros(blocked.shape)
+    # Prefix sums along each row turn every window sum into a single subtraction
+    blocked_sums = np.zeros((blocked.shape[0], size + 1), dtype=np.int32)
+    np.cumsum(blocked, axis=1, out=blocked_sums[:, 1:])
+    hit_sums = np.zeros((hits.shape[0], size + 1), dtype=np.int32)
+    np.cumsum(hits, axis=1, out=hit_sums[:, 1:])
+
+    for length in lengths:
+        if length > size:
+            continue
+        window_blocked = blocked_sums[:, length:] - blocked_sums[:, :-length]  # Misses inside each window
+        weights = (window_blocked == 0).astype(np.float64)  # Only windows without misses are possible placements
+        if target_mode:
+            window_hits = hit_sums[:, length:] - hit_sums[:, :-length]  # Hits inside each window
+            weights *= 1 + HIT_WEIGHT * window_hits
+        starts = weights.shape[1]
+        for offset in range(length):  # Spread each window's weight over the cells it covers
+            density[:, offset:offset + starts] += weights
+    return density
+
+# The probability and Monte Carlo AIs work on 10x10 bitmasks and placement tables, so they need the standard board.
+def _check_standard_board(board):
+    if board.size != BOARD_SIZE:
+        raise ValueError("This AI only plays on the standard " + str(BOARD_SIZE) + "x" + str(BOARD_SIZE) + " board.")
+
+# Read the AI's knowledge from the board as bitmasks (bit = row * 10 + col): cells hit and cells missed.
+def board_knowledge(board):
+    hit_mask = 0
+    miss_mask = 0
+    for row, cells in enumerate(board.board):
+        for col, cell in enumerate(cells):
+            if cell == "X":
+                hit_mask |= 1 << (row * 10 + col)
+            elif cell == ".":
+                miss_mask |= 1 << (row * 10 + col)
+    return hit_mask, miss_mask
+
+# Turn a cell bitmask into a 10x10 array of 0s and 1s.
+def _mask_to_array(mask):
+    bits = np.unpackbits(np.frombuffer(mask.to_bytes(13, 'little'), dtype=np.uint8), bitorder='little')
+    return bits[:100].reshape(10, 10).astype(np.int32)
+
+# Bounded least-recently-used cache of probability maps, keyed by what the AI knows about the board:
+# (hit mask, miss mask, sizes of the sunk ships, sizes of the ships still afloat, whether the endgame solver is used).
+# Only opening states repeat often enough to be worth caching (see `PROBABILITY_CACHE_MAX_KNOWN_CELLS`), and they
+# repeat across games, so one cache is shared by every game played in the process.
+class ProbabilityCache:
+    def __init__(self, maxsize=50000):
+        self.maxsize = maxsize  # Most maps kept before the least recently used one is dropped
+        self.entries = OrderedDict()  # Key -> probability map, oldest first
+        self.hits = 0  # Lookups answered from the cache
+        self.misses = 0  # Lookups that had to compute the map
+        self.memory_bytes = 0  # Approximate memory held by keys and maps
+
+    # Approximate memory used by one cache entry.
+    @staticmethod
+    def _entry_size(key, value):
+        return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + value.nbytes + sys.getsizeof(value)
+
+    # Return the cached map for `key`, or None, and mark it as recently used.
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    # Store a map, dropping the least recently used ones if the cache is full.
+    def put(self, key, value):
+        if key in self.entries:
+            return
+        self.entries[key] = value
+        self.memory_bytes += self._entry_size(key, value)
+        while len(self.entries) > self.maxsize:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.memory_bytes -= self._entry_size(old_key, old_value)
+
+    # Fraction of lookups answered from the cache.
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    # Summary of the cache's effectiveness and size.
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+            'memory_bytes': self.memory_bytes
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+
+# Probability maps shared by every game in this process
+PROBABILITY_CACHE = ProbabilityCache()
+
+# Most known cells (hits and misses) a knowledge state may have for its map to be cached. In seeded games, lookups
+# with up to 4 known cells hit the cache at least 40% of the time (99% on an empty board), but later states almost
+# never come up twice, so caching them would only cost memory and lookups.
+PROBABILITY_CACHE_MAX_KNOWN_CELLS = 4
+
+# Build the probability density map for a knowledge state: the hit and miss masks, the number of segments
+# belonging to sunk ships and the sizes of the ships still afloat. Cells that were already fired at are set to -1.
+def probability_map(hit_mask, miss_mask, sunk_segments, lengths):
+    hits = _mask_to_array(hit_mask)  # Known hits
+    misses = _mask_to_array(miss_mask)  # Known misses
+
+    # Target mode: some hits do not yet belong to a sunk ship
+    target_mode = hit_mask.bit_count() > sunk_segments
+
+    # Outside target mode every hit belongs to a sunk ship, so those cells block placements just like misses
+    blocked = misses if target_mode else misses | hits
+
+    # Horizontal placements work on rows directly, vertical placements on the transposed board
+    density = _row_density(blocked, hits, lengths, target_mode)
+    density += _row_density(blocked.T, hits.T, lengths, target_mode).T
+
+    # Never fire at a cell that was already targeted
+    density[(hits | misses).astype(bool)] = -1
+    density = density.astype(np.float32)  # Halves the memory held by the cache; the counts stay exact
+    density.setflags(write=False)  # Maps are shared through the cache, so they must not change
+    return density
+
+# Turn the endgame solver's exact hit counts into a map like `probability_map`, with known cells set to -1.
+def _endgame_density(counts, known_mask):
+    density = np.array(counts, dtype=np.float32).reshape(10, 10)
+    density[_mask_to_array(known_mask).astype(bool)] = -1
+    density.setflags(write=False)
+    return density
+
+# AI fires at the cell covered by the most possible ship placements (Expert Mode)
+def ai_fire_probability(board, ships, ai_targeted_coordinates, cache=PROBABILITY_CACHE, endgame=True):
+    """
+    AI builds a probability density map from the hits and misses it has seen.
+    For each ship that is still afloat, it counts every placement that avoids known misses
+    and fires at the cell covered by the most placements.
+    Maps for opening positions are looked up in `cache` before any other work (pass None to always recompute).
+    With `endgame=True`, positions with few enough fleet arrangements are solved exactly (see `endgame.py`)
+    and the exact counts are used as the map.
+    Works on the standard 10x10 board, with any fleet.
+    """
+    _check_standard_board(board)
+    hit_mask, miss_mask = board_knowledge(board)
+    # The fleet is announced, so the AI knows which ship sizes are still afloat
+    lengths = tuple(length for length, units in zip(ships.lengths, ships.remaining_units) if units > 0)
+    sunk_lengths = tuple(length for length, units in zip(ships.lengths, ships.remaining_units) if units == 0)
+
+    if (hit_mask | miss_mask).bit_count() > PROBABILITY_CACHE_MAX_KNOWN_CELLS:
+        cache = None  # This state will not come up again
+    key = (hit_mask, miss_mask, sunk_lengths, lengths, endgame)
+    density = cache.get(key) if cache is not None else None
+    if density is None:
+        counts = endgame_counts(hit_mask, miss_mask, sunk_lengths, lengths) if endgame else None
+        if counts is not None:
+            density = _endgame_density(counts, hit_mask | miss_mask)
+        else:
+            density = probability_map(hit_mask, miss_mask, sum(sunk_lengths), lengths)
+        if cache is not None:
+            cache.put(key, density)
+
+    # Never fire at a cell the AI has targeted outside of the known hits and misses
+    extra = [(row, col) for row, col in ai_targeted_coordinates if density[row, col] >= 0]
+    if extra:
+        density = density.copy()
+        for row, col in extra:
+            density[row, col] = -1
+
+    # Pick randomly among the best cells so the AI is not predictable
+    best = np.flatnonzero(density == density.max())
+    index = int(random.choice(best))
+    ai_targeted_coordinates.add(CELL_ROW_COL[index])  # Mark as targeted
+    return index
+
+# Default time the Monte Carlo AI may spend choosing one shot, in seconds
+MONTE_CARLO_TIME_BUDGET = 0.005
+
+# Random draws tried for one ship before the whole sampled layout is abandoned
+SAMPLE_TRIES_PER_SHIP = 20
+
+# Sample one full fleet layout that fits what the AI has observed, or return None if the draw failed.
+# Sunk ships must lie entirely on hits; ships still afloat must avoid misses and cannot be fully hit.
+# Hits that no sunk ship explains are covered first, each by a random afloat ship placed through that cell,
+# and the remaining afloat ships are then placed anywhere they fit.
+# Returns the placements of the ships still afloat.
+def _sample_layout(sunk_candidates, afloat_candidates, covering_by_cell, hit_mask):
+    occupied = 0
+    for candidates in sunk_candidates:
+        for _ in range(SAMPLE_TRIES_PER_SHIP):
+            placement = random.choice(candidates)
+            if not placement.mask & occupied:
+                break
+        else:
+            return None
+        occupied |= placement.mask
+
+    layout = []
+    unplaced = list(range(len(afloat_candidates)))
+    uncovered = hit_mask & ~occupied  # Hits no sampled ship explains yet
+    while uncovered:
+        cell = (uncovered & -uncovered).bit_length() - 1  # Lowest unexplained hit
+        for _ in range(SAMPLE_TRIES_PER_SHIP):
+            ship = random.choice(unplaced) if unplaced else None
+            pool = covering_by_cell[ship].get(cell) if ship is not None else None
+            if not pool:
+                continue
+            placement = random.choice(pool)
+            if not placement.mask & occupied:
+                break
+        else:
+            return None  # No afloat ship could be fitted through this hit
+        unplaced.remove(ship)
+        occupied |= placement.mask
+        layout.append(placement)
+        uncovered &= ~placement.mask
+
+    for ship in unplaced:
+        candidates = afloat_candidates[ship]
+        for _ in range(SAMPLE_TRIES_PER_SHIP):
+            placement = random.choice(candidates)
+            if not placement.mask & occupied:
+                break
+        else:
+            return None
+        occupied |= placement.mask
+        layout.append(placement)
+    return layout
+
+# AI samples fleet layouts that fit its observations and fires where ships are most often found (Master Mode)
+def ai_fire_monte_carlo(board, ships, ai_targeted_coordinates, time_budget=MONTE_CARLO_TIME_BUDGET):
+    """
+    AI draws many complete fleet layouts (using the fleet from `ships.ship_types`) that agree with every hit,
+    miss and sunk ship it has seen, counts how often each untargeted cell is occupied and fires at the most likely one.
+    It stops sampling when `time_budget` seconds have passed and uses the best answer found so far.
+    Positions with few enough fleet arrangements are solved exactly instead (see `endgame.py`); the solver is
+    also held to `time_budget`, as this AI is timed by the clock anyway.
+    Works on the standard 10x10 board, with any fleet of ships up to 5 long.
+    """
+    _check_standard_board(board)
+    deadline = time.perf_counter() + time_budget
+    hit_mask, miss_mask = board_knowledge(board)
+    index = endgame_shot(hit_mask, miss_mask, ships, ai_targeted_coordinates, time_budget)
+    if index is not None:
+        ai_targeted_coordinates.add(CELL_ROW_COL[index])  # Mark as targeted
+        return index
+    table = placement_table()
+
+    # Candidate placements for every ship, based on whether it has been sunk (ship size = ship_types[i][1])
+    sunk_candidates = []
+    afloat = []
+    for ship, units in zip(ships.ship_types, ships.remaining_units):
+        placements = table.for_length(ship[1])
+        if units == 0:
+            sunk_candidates.append([p for p in placements if not p.mask & ~hit_mask])
+        else:
+            afloat.append([p for p in placements if not p.mask & miss_mask and p.mask & ~hit_mask])
+    # For every afloat ship, the placements passing through each hit cell
+    covering = []
+    for candidates in afloat:
+        by_cell = {}
+        for placement in candidates:
+            if placement.mask & hit_mask:
+                for row, col in placement.cells:
+                    if hit_mask >> (row * 10 + col) & 1:
+                        by_cell.setdefault(row * 10 + col, []).append(placement)
+        covering.append(by_cell)
+
+    counts = [0] * 100  # How often each cell is occupied by a ship still afloat
+    samples = 0
+    if all(sunk_candidates) and all(afloat):
+        while True:
+            layout = _sample_layout(sunk_candidates, afloat, covering, hit_mask)
+            if layout is not None:
+                samples += 1
+                for placement in layout:
+                    for row, col in placement.cells:
+                        counts[row * 10 + col] += 1
+            if time.perf_counter() >= deadline:
+                break
+
+    known = hit_mask | miss_mask
+    options = [cell for cell in range(100)
+               if not known >> cell & 1 and CELL_ROW_COL[cell] not in ai_targeted_coordinates]
+    if not samples:
+        # Nothing consistent was found in time, so fall back to the probability density map
+        return ai_fire_probability(board, ships, ai_targeted_coordinates, endgame=False)
+
+    best_count = max(counts[cell] for cell in options)
+    index = random.choice([cell for cell in options if counts[cell] == best_count])
+    ai_targeted_coordinates.add(CELL_ROW_COL[index])  # Mark as targeted
+    return index
+
+# Return the index of the cell `steps` cells away from (row, col) in a direction, or None if that is off the board.
+# The standard board reads it from the precomputed rays; other sizes step through the grid.
+def _step_from(row, col, direction, steps, size):
+    if size == BOARD_SIZE:
+        ray = RAYS[direction][row * size + col]
+        return ray[steps - 1] if steps <= len(ray) else None
+    row_step, col_step = DIRECTION_STEPS[direction]
+    row, col = row + row_step * steps, col + col_step * steps
+    if 0 <= row < size and 0 <= col < size:
+        return row * size + col
+    return None
+
 # AI uses a mix of random firing and systematic targeting (Medium Mode)
-def ai_fire_medium(board, ai_state, ai_targeted_coordinates):
+def ai_fire_medium(board, ai_state, ai_targeted_coordinates, depth=0):
     """
     AI fires at random until it hits a ship, then switches to target mode.
     Systematically continues to fire at adjacent cells to sink the ship.
+    Returns the cell index to fire at.
+    `depth` counts how many times the AI has called itself again for this shot after a dead end.
     """
-    # Define movement directions: up, down, left, right
-    DIRECTIONS = {
-        'up': (-1, 0),
-        'down': (1, 0),
-        'left': (0, -1),
-        'right': (0, 1)
-    }
-
-    # If AI isn't in target mode, it fires randomly
+    if METRICS.enabled and depth:
+        METRICS.observe('medium_recursion_depth', depth, COUNT_BUCKETS)
+    size = ai_targeted_coordinates.size
+    # If AI isn't in target mode, it fires randomly at a coordinate drawn from its pool of untargeted cells
     if not ai_state['target_mode']:
-        while True:
-            col = random.randint(0, 9)  # Random column
-            row = random.randint(0, 9)  # Random row
-            if (row, col) not in ai_targeted_coordinates:  # Check if the coordinate hasn't been targeted
-                ai_targeted_coordinates.add((row, col))  # Mark as targeted
-                coordinate = chr(ord('A') + col) + str(row + 1)
-                return coordinate
+        row, col = ai_targeted_coordinates.draw()
+        return row * size + col
 
     # In target mode, attempt to sink the hit ship
     else:
@@ -108,7 +519,7 @@ def ai_fire_medium(board, ai_state, ai_targeted_coordinates):
                 ai_state['direction'] = None
                 ai_state['steps_in_current_direction'] = 0
                 ai_state['initial_hit'] = None
-                return ai_fire_medium(board, ai_state, ai_targeted_coordinates)  # Go back to random firing
+                return ai_fire_medium(board, ai_state, ai_targeted_coordinates, depth + 1)  # Go back to random firing
             else:
                 ai_state['direction'] = random.choice(remaining_directions)  # Choose a new direction
                 ai_state['directions_tried'].append(ai_state['direction'])  # Mark direction as tried
@@ -118,25 +529,88 @@ def ai_fire_medium(board, ai_state, ai_targeted_coordinates):
         else:
             ai_state['steps_in_current_direction'] += 1  # Increment steps in the current direction
 
-        # Calculate the next coordinate in the current direction
-        dir_row_delta, dir_col_delta = DIRECTIONS[ai_state['direction']]
-        steps = ai_state['steps_in_current_direction']
-        new_row = initial_row + dir_row_delta * steps
-        new_col = initial_col + dir_col_delta * steps
+        # Look up the next cell in the current direction (None past the edge of the board)
+        index = _step_from(initial_row, initial_col, ai_state['direction'], ai_state['steps_in_current_direction'], size)
 
         # Check if the new coordinate is within bounds and hasn't been targeted yet
-        if 0 <= new_row < 10 and 0 <= new_col < 10:
-            if (new_row, new_col) not in ai_targeted_coordinates:
-                ai_targeted_coordinates.add((new_row, new_col))  # Mark as targeted
-                coordinate = chr(ord('A') + new_col) + str(new_row + 1)
-                return coordinate
+        if index is not None:
+            cell = divmod(index, size)
+            if cell not in ai_targeted_coordinates:
+                ai_targeted_coordinates.add(cell)  # Mark as targeted
+                return index
             else:
                 # Already targeted, need to pick a new direction
+                if METRICS.enabled:
+                    METRICS.count('medium_rejected_targets_total', reason='targeted')
                 ai_state['direction'] = None
                 ai_state['steps_in_current_direction'] = 0
-                return ai_fire_medium(board, ai_state, ai_targeted_coordinates)  # Continue targeting mode
+                return ai_fire_medium(board, ai_state, ai_targeted_coordinates, depth + 1)  # Continue targeting mode
         else:
             # Out of bounds, need to try a new direction
+            if METRICS.enabled:
+                METRICS.count('medium_rejected_targets_total', reason='off_board')
             ai_state['direction'] = None
             ai_state['steps_in_current_direction'] = 0
-            return ai_fire_medium(board, ai_state, ai_targeted_coordinates)  # Continue targeting mode
+            return ai_fire_medium(board, ai_state, ai_targeted_coordinates, depth + 1)  # Continue targeting mode
+
+# AI plays like Medium Mode until the endgame, then fires at the cell most likely to hit (Endgame Mode)
+def ai_fire_endgame(board, ships, ai_state, ai_targeted_coordinates, time_cap=ENDGAME_TIME_CAP):
+    """
+    AI hunts and targets like `ai_fire_medium`, but first asks the endgame solver for an exact answer.
+    The solver only answers once few fleet arrangements fit what the AI has seen, and gives up within
+    its node budget or `time_cap` seconds otherwise, so early shots cost about the same as Medium Mode.
+    On boards other than the standard 10x10 it plays exactly like Medium Mode.
+    """
+    if board.size == BOARD_SIZE:
+        hit_mask, miss_mask = board_knowledge(board)
+        index = endgame_shot(hit_mask, miss_mask, ships, ai_targeted_coordinates, time_cap)
+        if index is not None:
+            ai_targeted_coordinates.add(CELL_ROW_COL[index])  # Mark as targeted
+            return index
+    return ai_fire_medium(board, ai_state, ai_targeted_coordinates)
+
+# Create a fresh state dictionary for the medium AI.
+# The `target_mode` flag indicates whether the AI is currently trying to sink a ship after a successful hit.
+# `directions_tried` and `steps_in_current_direction` help the AI navigate around a hit ship to find the rest of it.
+def new_ai_state():
+    return {
+        'last_hit': None,
+        'target_mode': False,  # Whether AI is actively targeting after a hit
+        'directions_tried': [],  # Tracks directions AI has already tried
+        'direction': None,  # The direction in which AI is currently firing
+        'steps_in_current_direction': 0,  # How many steps the AI has taken in the current direction
+        'initial_hit': None  # Stores the first hit's coordinates to help AI retrace its strategy if needed
+    }
+
+# Update the AI state after a shot at (row, col) returned `fire_result` (0 = miss, 1 = hit, 2 = sunk).
+# This is shared by the interactive game loop and the headless simulation so both AIs behave identically.
+def update_ai_state(ai_state, fire_result, row, col):
+    if fire_result == 0:  # Missed shot
+        if ai_state['target_mode']:
+            # If AI was in targeting mode, reset the targeting direction and stop tracking hits in the current direction.
+            ai_state['direction'] = None
+            ai_state['steps_in_current_direction'] = 0
+        else:
+            # If not in targeting mode, reset the last hit and targeting state.
+            ai_state['last_hit'] = None
+            ai_state['target_mode'] = False
+    elif fire_result == 1:  # Hit shot
+        # If AI was not already in targeting mode, enter targeting mode and start tracking the hit.
+        if not ai_state['target_mode']:
+            ai_state['target_mode'] = True
+            ai_state['last_hit'] = (row, col)  # Update last hit coordinates for AI's strategy.
+            ai_state['initial_hit'] = (row, col)  # Record the initial hit to return if needed.
+            ai_state['directions_tried'] = []  # Reset directions tried for targeting.
+            ai_state['direction'] = None  # Reset current direction for AI's firing.
+            ai_state['steps_in_current_direction'] = 0  # Reset steps in current direction.
+        else:
+            # Update the last hit if already in targeting mode.
+            ai_state['last_hit'] = (row, col)
+    elif fire_result == 2:  # AI sunk a ship
+        # If AI sinks a ship, reset targeting mode and stop tracking hits.
+        ai_state['target_mode'] = False  # Reset AI targeting mode.
+        ai_state['last_hit'] = None  # Reset last hit coordinates.
+        ai_state['initial_hit'] = None  # Reset initial hit.
+        ai_state['directions_tried'] = []  # Clear the list of tried directions.
+        ai_state['direction'] = None  # Reset current direction.
+        ai_state['steps_in_current_direction'] = 0  # Reset steps in current direction.
@@ -0,0 +1,205 @@
+# Lockstep batch simulation of many AI-vs-AI games at once with NumPy.
+# K games are held as stacked arrays (one row of 100 cells per game, i.e. a (K, 10, 10) board flattened to
+# (K, 100)) for ship ids, shots and hits. Every step fires one shot in every active game, resolves hits, sinks
+# and game over with array operations, and drops finished games from the active set.
+#
+# Each player's shots only depend on the opponent's board, so a game between A and B is decided by how many
+# shots each needs to sink the other's fleet: A (who fires first) wins if it needs no more shots than B.
+# `simulate_batch` therefore runs both sides as independent batches and compares their shot counts.
+#
+# Example: python batch_simulation.py --games 100000 --a medium --b easy
+
+import argparse
+import time
+
+import numpy as np
+
+from placements import placement_table
+
+BOARD_SIZE = 10
+CELLS = BOARD_SIZE * BOARD_SIZE
+
+# Cell-by-placement matrix for every placement of a ship length: row p has True on the cells placement p covers.
+def _placement_matrix(length):
+    placements = placement_table(BOARD_SIZE).for_length(length)
+    matrix = np.zeros((len(placements), CELLS), dtype=bool)
+    for p, placement in enumerate(placements):
+        for row, col in placement.cells:
+            matrix[p, row * BOARD_SIZE + col] = True
+    return matrix
+
+# Place a fleet of ships with sizes 1..num_ships on each of `count` boards.
+# Returns a (count, 100) int8 array holding the ship id (its size, like `Board.board`) or 0 for open water.
+# Each ship is drawn uniformly from the placements that do not overlap the ships already placed, exactly like
+# `ai_place_ships`, but for all boards at once.
+def place_fleets(count, num_ships, rng):
+    ship_ids = np.zeros((count, CELLS), dtype=np.int8)
+    occupied = np.zeros((count, CELLS), dtype=np.float32)
+    for length in range(1, num_ships + 1):
+        matrix = _placement_matrix(length)
+        valid = (occupied @ matrix.T.astype(np.float32)) == 0  # (count, placements): overlaps nothing
+        scores = rng.random(valid.shape) * valid  # Random score for every valid placement, 0 for invalid ones
+        chosen = matrix[scores.argmax(axis=1)]  # (count, 100) cells of the chosen placement
+        ship_ids[chosen] = length
+        occupied += chosen
+    return ship_ids
+
+# Next cell in each game's random firing order that has not been fired at yet.
+# Each game walks a fixed random permutation of the board, so every draw costs constant time per game.
+def _next_in_order(state):
+    rows = np.arange(len(state.games))
+    while True:
+        cells = state.order[rows, state.cursor]
+        taken = state.shot[rows, cells]
+        if not taken.any():
+            return cells
+        state.cursor[taken] += 1  # Skip cells that were already fired at
+
+# Batched equivalent of `ai_fire_easy`: every game fires at a random cell it has not fired at yet.
+def fire_random(state, rng):
+    return _next_in_order(state)
+
+# Batched hunt/target policy, the batched counterpart of `ai_fire_medium`.
+# Games with a hit on a ship that is not yet sunk fire at a random untargeted neighbor of such a hit;
+# all other games fire at a random untargeted cell.
+def fire_hunt_target(state, rng):
+    shot = state.shot.reshape(-1, BOARD_SIZE, BOARD_SIZE)
+    open_hits = (state.hit & ~state.sunk).reshape(-1, BOARD_SIZE, BOARD_SIZE)
+
+    # Cells next to an unresolved hit (up, down, left and right)
+    near = np.zeros_like(open_hits)
+    near[:, 1:, :] |= open_hits[:, :-1, :]
+    near[:, :-1, :] |= open_hits[:, 1:, :]
+    near[:, :, 1:] |= open_hits[:, :, :-1]
+    near[:, :, :-1] |= open_hits[:, :, 1:]
+
+    near = near.reshape(-1, CELLS) & ~state.shot
+
+    cells = _next_in_order(state)  # Hunt: the next random untargeted cell
+    targeting = near.any(axis=1)
+    if targeting.any():
+        # Target: a random untargeted neighbor of an unresolved hit. Every other cell scores -inf, so a neighbor
+        # whose random score is exactly 0 still beats the cells that are not candidates.
+        scores = rng.random((int(targeting.sum()), CELLS), dtype=np.float32)
+        scores = np.where(near[targeting], scores, -np.inf)
+        cells[targeting] = scores.argmax(axis=1)
+    return cells
+
+# Batched firing policies, named like the shooters in `simulation.py`.
+BATCH_POLICIES = {
+    'easy': fire_random,
+    'medium': fire_hunt_target
+}
+
+# Shot, hit and sink state for one side of K games (the shooter's view of the opponent's fleets).
+# Only games that are still being played are kept; `games` maps each row back to its original game number.
+class BatchState:
+    def __init__(self, ship_ids, num_ships):
+        count = len(ship_ids)
+        self.games = np.arange(count)  # Original game number of each row
+        self.ship_ids = ship_ids  # (K, 100) ship id per cell, 0 for open water
+        self.shot = np.zeros((count, CELLS), dtype=bool)  # Cells fired at
+        self.hit = np.zeros((count, CELLS), dtype=bool)  # Ship cells hit
+        self.sunk = np.zeros((count, CELLS), dtype=bool)  # Cells of ships that have been sunk
+        # Remaining units per ship id (column 0, open water, never reaches zero)
+        self.remaining = np.zeros((count, num_ships + 1), dtype=np.int16)
+        self.remaining[:, 0] = CELLS + 1
+        self.remaining[:, 1:] = np.arange(1, num_ships + 1)
+        self.segments_left = np.full(count, num_ships * (num_ships + 1) // 2, dtype=np.int16)
+        self.order = None  # Random firing order of each game, set by `shuffle`
+        self.cursor = np.zeros(count, dtype=np.intp)  # Position of each game in its firing order
+
+    # Give every game its own random permutation of the board to hunt in.
+    def shuffle(self, rng):
+        self.order = rng.permuted(np.tile(np.arange(CELLS, dtype=np.int8), (len(self.games), 1)), axis=1)
+
+    # Keep only the rows selected by the boolean array `keep`.
+    def compress(self, keep):
+        self.games = self.games[keep]
+        self.ship_ids = self.ship_ids[keep]
+        self.shot = self.shot[keep]
+        self.hit = self.hit[keep]
+        self.sunk = self.sunk[keep]
+        self.remaining = self.remaining[keep]
+        self.segments_left = self.segments_left[keep]
+        self.order = self.order[keep]
+        self.cursor = self.cursor[keep]
+
+# Fire one policy at K fleets in lockstep until every fleet is sunk.
+# Returns the number of shots each game needed (`max_shots` for games that were not finished).
+def run_batch(ship_ids, num_ships, policy, rng, max_shots=CELLS):
+    state = BatchState(ship_ids, num_ships)
+    state.shuffle(rng)
+    shots = np.full(len(ship_ids), max_shots, dtype=np.int16)
+    rows = np.arange(len(ship_ids))
+
+    for shot_number in range(1, max_shots + 1):
+        cells = policy(state, rng)  # One shot per active game
+        rows = rows[:len(cells)]
+
+        # Resolve the shots
+        targets = state.ship_ids[rows, cells]
+        hits = targets > 0
+        state.shot[rows, cells] = True
+        state.hit[rows, cells] = hits
+
+        # Update the hit ships and find the ones that were just sunk
+        hit_rows = rows[hits]
+        hit_ids = targets[hits]
+        state.remaining[hit_rows, hit_ids] -= 1
+        state.segments_left[hit_rows] -= 1
+        sunk_now = state.remaining[hit_rows, hit_ids] == 0
+        if sunk_now.any():
+            sunk_rows = hit_rows[sunk_now]
+            state.sunk[sunk_rows] |= state.ship_ids[sunk_rows] == hit_ids[sunk_now][:, None]
+
+            # Record finished games and drop them from the active set
+            finished = state.segments_left == 0
+            if finished.any():
+                shots[state.games[finished]] = shot_number
+                state.compress(~finished)
+                if not len(state.games):
+                    break
+
+    return shots
+
+# Simulate `games` games between two batched policies and return (winner, shots).
+# `winner` is 0 where player A wins and 1 where player B wins; `shots` is a (games, 2) array of shots fired by A and B.
+# A fires first, so on equal shot counts A sinks B's fleet first; B stops one shot short of its own total.
+def simulate_batch(games, policy_a, policy_b, seed=None, num_ships=5):
+    rng = np.random.default_rng(seed)
+    fleets_a = place_fleets(games, num_ships, rng)
+    fleets_b = place_fleets(games, num_ships, rng)
+    needed_a = run_batch(fleets_b, num_ships, BATCH_POLICIES[policy_a], rng)
+    needed_b = run_batch(fleets_a, num_ships, BATCH_POLICIES[policy_b], rng)
+
+    winner = (needed_b < needed_a).astype(np.int8)  # B only wins if it needs strictly fewer shots
+    shots = np.empty((games, 2), dtype=np.int16)
+    shots[:, 0] = np.where(winner == 0, needed_a, needed_b)  # A stops when A wins or when B finishes
+    shots[:, 1] = np.where(winner == 0, needed_a - 1, needed_b)
+    return winner, shots
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many Battleship games at once with NumPy.")
+    parser.add_argument('--games', type=int, default=100000, help="total number of games")
+    parser.add_argument('--batch', type=int, default=20000, help="games held in memory at once")
+    parser.add_argument('--a', choices=sorted(BATCH_POLICIES), default='medium', help="policy of player A")
+    parser.add_argument('--b', choices=sorted(BATCH_POLICIES), default='easy', help="policy of player B")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    wins_a = 0
+    total_shots = 0
+    for batch, offset in enumerate(range(0, args.games, args.batch)):
+        count = min(args.batch, args.games - offset)
+        winner, shots = simulate_batch(count, args.a, args.b, seed=args.seed + batch)
+        wins_a += int(count - winner.sum())
+        total_shots += int(shots[np.arange(count), winner].sum())
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.a} vs {args.b}: {args.games} games in {elapsed:.2f}s ({args.games / elapsed * 60:,.0f} games/min)")
+    print(f"  A wins {wins_a / args.games * 100:.1f}%, mean shots to win {total_shots / args.games:.1f}")
+
+if __name__ == '__main__':
+    main()
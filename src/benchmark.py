@@ -0,0 +1,195 @@
+# Micro and macro benchmarks for the game engine hot paths.
+# Micro benchmarks time single calls (`Board.fire`, `Board.fire_index`, `Board.fire_many`, `Board.perform_airstrike`, `Board.game_over`, the coordinate
+# utilities, `ai_place_ships` and every `ai_fire_*` function) on fixed seeds and on empty, half-played and nearly
+# finished boards. Macro benchmarks time complete headless games. Results are printed as ops/sec and can be saved
+# as JSON, so an optimized board backend or AI can be compared with the current one.
+#
+# Example: python benchmark.py --backend bitboard --output bitboard.json
+
+import argparse
+import json
+import platform
+import random
+import time
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from ships import Ships
+from ai import (PROBABILITY_CACHE, ShotPool, ai_place_ships, ai_fire_easy, ai_fire_medium, ai_fire_hard, ai_fire_probability,
+                ai_fire_monte_carlo, ai_fire_endgame, new_ai_state, update_ai_state)
+from simulation import simulate_game
+from utilities import CELL_ROW_COL, COORDINATES, coordinate_to_indices, is_valid_coordinate, row_cells
+
+BACKENDS = {
+    'board': Board,
+    'bitboard': BitBoard,
+    'sparse': SparseBoard
+}
+
+# Fraction of the board that has been fired at in each benchmarked board state
+BOARD_STATES = {
+    'empty': 0.0,
+    'half': 0.5,
+    'late': 0.9
+}
+
+# Everything needed to fire at a board in a given state: the board, its ships and an AI's view of it.
+class BoardState:
+    def __init__(self, board_class, fraction, seed):
+        random.seed(seed)
+        self.board = board_class(1)
+        self.ships = Ships(1)
+        self.ships.set_num_ships(5)
+        self.ships.load_types()
+        ai_place_ships(self.board, self.ships)
+        self.ai_state = new_ai_state()
+        self.targeted_coordinates = ShotPool()
+
+        # Play random shots until the requested share of the board is used up (stopping before the game ends)
+        for _ in range(int(100 * fraction)):
+            index = ai_fire_easy(self.board, self.targeted_coordinates)
+            row, col = CELL_ROW_COL[index]
+            if isinstance(self.board.board[row][col], int) and self.board.remaining_segments == 1:
+                continue  # Leave the last ship segment afloat
+            fire_result = self.board.fire_index(index, self.ships)
+            update_ai_state(self.ai_state, fire_result, row, col)
+
+        # An untargeted coordinate for the fire benchmark
+        row, col = random.choice(self.targeted_coordinates.untargeted)
+        self.next_index = row * 10 + col
+        self.next_coordinate = COORDINATES[self.next_index]
+
+# Time `operation` once on each of `count` freshly prepared states (seeded 0 to count - 1).
+# This is used for calls that change the state they run on. Only the calls to `operation` are timed;
+# building the states with `prepare` is not.
+def time_operation(prepare, operation, count):
+    states = [prepare(seed) for seed in range(count)]
+    start = time.perf_counter()
+    for state in states:
+        operation(state)
+    return count, time.perf_counter() - start
+
+# Time a stateless function by calling it repeatedly until `min_time` seconds have passed.
+def time_function(function, min_time):
+    calls = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        for _ in range(1000):
+            function()
+        elapsed += time.perf_counter() - start
+        calls += 1000
+    return calls, elapsed
+
+# Build the list of benchmarks as (name, board state, runner) tuples; each runner returns (ops, seconds).
+def build_benchmarks(board_class, min_time, count, games):
+    benchmarks = []
+
+    def add(name, state, runner):
+        benchmarks.append((name, state, runner))
+
+    # Coordinate utilities
+    add('utilities.coordinate_to_indices', None, lambda: time_function(lambda: coordinate_to_indices("J10"), min_time))
+    add('utilities.is_valid_coordinate', None, lambda: time_function(lambda: is_valid_coordinate("J10"), min_time))
+
+    # Fleet placement on an empty board
+    def prepare_empty(seed):
+        ships = Ships(1)
+        ships.set_num_ships(5)
+        ships.load_types()
+        return board_class(1), ships
+    add('ai.ai_place_ships', 'empty',
+        lambda: time_operation(prepare_empty, lambda state: ai_place_ships(*state), count))
+
+    for state_name, fraction in BOARD_STATES.items():
+        def prepare(seed, fraction=fraction):
+            return BoardState(board_class, fraction, seed)
+
+        # Calls that change the board or the AI's state run once per prepared state
+        add('Board.fire', state_name,
+            lambda prepare=prepare: time_operation(prepare, lambda s: s.board.fire(s.next_coordinate, s.ships), count))
+        add('Board.fire_index', state_name,
+            lambda prepare=prepare: time_operation(prepare, lambda s: s.board.fire_index(s.next_index, s.ships), count))
+        add('Board.fire_many', state_name,
+            lambda prepare=prepare: time_operation(prepare, lambda s: s.board.fire_many(row_cells(5), s.ships), count))
+        add('Board.perform_airstrike', state_name,
+            lambda prepare=prepare: time_operation(prepare, lambda s: s.board.perform_airstrike(5, s.ships), count))
+        add('ai.ai_fire_easy', state_name,
+            lambda prepare=prepare: time_operation(
+                prepare, lambda s: ai_fire_easy(s.board, s.targeted_coordinates), count))
+        add('ai.ai_fire_medium', state_name,
+            lambda prepare=prepare: time_operation(
+                prepare, lambda s: ai_fire_medium(s.board, s.ai_state, s.targeted_coordinates), count))
+        # Without the cache, so every call computes its map (the prepared states repeat, which would time cache hits)
+        add('ai.ai_fire_probability', state_name,
+            lambda prepare=prepare: time_operation(
+                prepare, lambda s: ai_fire_probability(s.board, s.ships, s.targeted_coordinates, cache=None), count))
+        # Sampling runs until its time budget (MONTE_CARLO_TIME_BUDGET) unless the endgame solver answers first
+        add('ai.ai_fire_monte_carlo', state_name,
+            lambda prepare=prepare: time_operation(
+                prepare, lambda s: ai_fire_monte_carlo(s.board, s.ships, s.targeted_coordinates), count))
+        add('ai.ai_fire_endgame', state_name,
+            lambda prepare=prepare: time_operation(
+                prepare, lambda s: ai_fire_endgame(s.board, s.ships, s.ai_state, s.targeted_coordinates), count))
+
+        # Read-only calls are repeated on a single prepared state
+        def read_only(method, prepare=prepare):
+            state = prepare(0)
+            return time_function(lambda: method(state), min_time)
+        add('Board.game_over', state_name, lambda read_only=read_only: read_only(lambda s: s.board.game_over()))
+        add('ai.ai_fire_hard', state_name, lambda read_only=read_only: read_only(lambda s: ai_fire_hard(s.board)))
+
+    # Complete headless games on fixed seeds. Monte Carlo games spend their time budget on almost every shot,
+    # so a tenth as many are played.
+    for shooter in ('easy', 'medium', 'endgame', 'probability', 'monte_carlo'):
+        def run_games(shooter=shooter):
+            played = max(1, games // 10) if shooter == 'monte_carlo' else games
+            start = time.perf_counter()
+            for seed in range(played):
+                simulate_game('random', shooter, 'random', shooter, seed=seed, board_class=board_class)
+            return played, time.perf_counter() - start
+        add('simulate_game.' + shooter, None, run_games)
+
+    return benchmarks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Battleship engine hot paths.")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='board', help="board backend to benchmark")
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds to measure each read-only micro benchmark")
+    parser.add_argument('--states', type=int, default=1000, help="prepared board states per state-changing micro benchmark")
+    parser.add_argument('--games', type=int, default=200, help="games per macro benchmark")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this text")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for name, state, runner in build_benchmarks(BACKENDS[args.backend], args.min_time, args.states, args.games):
+        if args.filter not in name:
+            continue
+        ops, seconds = runner()
+        result = {
+            'name': name,
+            'state': state,
+            'backend': args.backend,
+            'ops': ops,
+            'seconds': seconds,
+            'ops_per_sec': ops / seconds if seconds else 0.0
+        }
+        results.append(result)
+        label = name + (f" [{state}]" if state else "")
+        print(f"{label:45} {result['ops_per_sec']:14,.0f} ops/sec", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'backend': args.backend,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'probability_cache': PROBABILITY_CACHE.stats(),
+                'results': results
+            }, output, indent=2)
+        print("Results saved to " + args.output)
+
+if __name__ == '__main__':
+    main()
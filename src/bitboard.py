@@ -0,0 +1,197 @@
+from board import Board, resolve_volley
+from game_io import TERMINAL_IO
+from placements import MAX_TABLE_SIZE
+from utilities import BOARD_SIZE
+
+# Convert a (row, column) pair into the single bit that represents that cell.
+def cell_bit(row, column, size=BOARD_SIZE):
+    return 1 << (row * size + column)
+
+# Convert a list, tuple or range of cell indices into a bitmask. A range (a row, a column, or any evenly spaced
+# cells) is turned into its mask with a few arithmetic operations instead of one per cell.
+def cells_mask(cells):
+    if isinstance(cells, range) and cells.step > 0:
+        if not cells:
+            return 0
+        count = len(cells)
+        step = cells.step
+        return ((1 << (step * count)) - 1) // ((1 << step) - 1) << cells.start  # Bits start, start + step, ...
+    mask = 0
+    for index in cells:
+        mask |= 1 << index
+    return mask
+
+# A read/write view of one row of a BitBoard, so code that indexes `board.board[row][col]` keeps working.
+# The views only need the board's `size`, `get_cell` and `set_cell`, so other backends can reuse them.
+# Writes go through `set_cell`, so they keep the board's live segment count (and so `game_over`) right.
+class _RowView:
+    def __init__(self, bitboard, row):
+        self.bitboard = bitboard
+        self.row = row
+
+    def __getitem__(self, column):
+        return self.bitboard.get_cell(self.row, column)
+
+    def __setitem__(self, column, value):
+        self.bitboard.set_cell(self.row, column, value)
+
+    def __len__(self):
+        return self.bitboard.size
+
+    def __iter__(self):
+        return (self.bitboard.get_cell(self.row, column) for column in range(self.bitboard.size))
+
+# A view of the whole grid that mimics the list-of-lists layout of `Board.board`.
+class _GridView:
+    def __init__(self, bitboard):
+        self.bitboard = bitboard
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.bitboard.size:
+            raise IndexError("row index out of range")
+        return _RowView(self.bitboard, row)
+
+    def __len__(self):
+        return self.bitboard.size
+
+    def __iter__(self):
+        return (_RowView(self.bitboard, row) for row in range(self.bitboard.size))
+
+# Board backend that stores ships, hits and misses as integer bitmasks (one bit per cell, bit = row * size + column).
+# Firing is a couple of bit operations and the game-over check is a single mask test.
+# It keeps all of the `Board` public methods, and `board.board[row][col]` still reads and writes the usual
+# "~", ".", "X" and ship-size values, so `Game`, `main.py` and the AI modules run unchanged.
+# Boards up to `placements.MAX_TABLE_SIZE` are supported, since the ships are written from the placement masks;
+# use `SparseBoard` for larger maps.
+class BitBoard(Board):
+    def __init__(self, player_num, size=BOARD_SIZE, io=None):
+        if size > MAX_TABLE_SIZE:
+            raise ValueError("BitBoard supports boards up to " + str(MAX_TABLE_SIZE) + "x" + str(MAX_TABLE_SIZE) + "; use SparseBoard for larger boards.")
+        self.player_num = player_num  # Store the player number (either player 1 or player 2)
+        self.size = size  # Number of rows and columns
+        self.row_mask = (1 << size) - 1  # Full bitmask for one row
+        self.ships = 0  # Bits set for every cell that holds part of a ship
+        self.hits = 0  # Bits set for every ship cell that has been hit
+        self.misses = 0  # Bits set for every open-water cell that has been fired at
+        self.ship_masks = {}  # Maps each ship id (the ship size in the standard fleet) to the bits its segments occupy
+        self.remaining_segments = 0  # Live count of ship segments that have not been hit yet
+        self.placements = []  # Placements of the ships on this board, in the order they were placed
+        self.io = io or TERMINAL_IO  # Where prompts and messages for this board's owner go
+
+    # The ship bitmask doubles as the occupancy mask used to validate placements.
+    @property
+    def ship_mask(self):
+        return self.ships
+
+    # Write a precomputed placement straight into the bitmasks.
+    def add_ship(self, placement, ship_id=None):
+        value = placement.length if ship_id is None else ship_id
+        self.ships |= placement.mask
+        self.ship_masks[value] = self.ship_masks.get(value, 0) | placement.mask
+        self.remaining_segments += placement.length
+        self.placements.append(placement)
+
+    # Expose the bitmasks through a list-of-lists style view for code that reads the grid directly.
+    @property
+    def board(self):
+        return _GridView(self)
+
+    # Return the value the list-of-lists board would hold at this cell ("~", ".", "X" or the ship size).
+    def get_cell(self, row, column):
+        bit = cell_bit(row, column, self.size)
+        if self.hits & bit:
+            return "X"
+        if self.misses & bit:
+            return "."
+        if self.ships & bit:
+            return self._ship_at(bit)
+        return "~"
+
+    # Write a value into a cell, keeping the bitmasks and the live segment count consistent.
+    def set_cell(self, row, column, value):
+        was_afloat = isinstance(self.get_cell(row, column), int)
+        bit = cell_bit(row, column, self.size)
+        if isinstance(value, int):  # Placing a ship segment
+            self.ships |= bit
+            self.ship_masks[value] = self.ship_masks.get(value, 0) | bit
+            self.hits &= ~bit
+            self.misses &= ~bit
+        elif value == "X":
+            self.hits |= bit
+            self.misses &= ~bit
+        elif value == ".":  # A miss replaces whatever was there, as it would in a list-of-lists grid
+            self._clear_ship(bit)
+            self.misses |= bit
+            self.hits &= ~bit
+        else:  # Open water
+            self._clear_ship(bit)
+            self.hits &= ~bit
+            self.misses &= ~bit
+        self.remaining_segments += isinstance(self.get_cell(row, column), int) - was_afloat
+
+    # Find the id (size in the standard fleet) of the ship occupying the given cell bit.
+    def _ship_at(self, bit):
+        for size, mask in self.ship_masks.items():
+            if mask & bit:
+                return size
+        return None
+
+    # Remove a ship segment from the ship masks.
+    def _clear_ship(self, bit):
+        self.ships &= ~bit
+        for size in self.ship_masks:
+            self.ship_masks[size] &= ~bit
+
+    def is_empty(self, row, column):
+        return not (self.ships | self.hits | self.misses) & cell_bit(row, column, self.size)
+
+    # Process a shot at a cell index (for `Board.fire_index`) with the same return codes as `Board.fire`:
+    # 0 for a miss, 1 for a hit and 2 for a sunk ship. The cell index is also the cell's bit position.
+    def _fire_index(self, index, ship):
+        bit = 1 << index
+        if (self.hits | self.misses) & bit:  # If the player already fired at this spot
+            self.io.write("You already targeted this location.")
+            return 0
+        if self.ships & bit:  # If the shot hits a ship
+            self.hits |= bit
+            self.remaining_segments -= 1  # One less segment left afloat
+            if ship.hit_unit(self._ship_at(bit)):  # Decrease the remaining parts of the hit ship
+                return 2  # Ship is sunk
+            return 1  # Ship is hit but not sunk
+        self.misses |= bit  # Open water, mark the miss
+        return 0
+
+    # Fire at every cell of a row at once (for `Board.perform_airstrike`) and return the number of new hits.
+    # If the owner's `ship` object is given, each hit ship loses the matching number of units.
+    def _perform_airstrike(self, row, ship=None):
+        row_bits = self.row_mask << (row * self.size)
+        new_hits = self.ships & row_bits & ~self.hits
+        self.hits |= new_hits
+        self.misses |= row_bits & ~self.ships
+        hits = new_hits.bit_count()
+        self.remaining_segments -= hits
+        if ship is not None:
+            for size, mask in self.ship_masks.items():
+                for _ in range((mask & new_hits).bit_count()):
+                    ship.hit_unit(size)
+        return hits
+
+    # Fire at a volley of cell indices (for `Board.fire_many`). The whole volley becomes one mask, so the board is
+    # updated with a handful of mask operations whatever its length; only the hits are then looked at one by one.
+    def _fire_many(self, cells, ship):
+        volley = cells_mask(cells)
+        new_cells = volley & ~(self.hits | self.misses)
+        new_hits = new_cells & self.ships
+        self.hits |= new_hits
+        self.misses |= new_cells & ~self.ships
+        self.remaining_segments -= new_hits.bit_count()
+        hit_cells = []
+        while new_hits:
+            low = new_hits & -new_hits
+            hit_cells.append(low.bit_length() - 1)
+            new_hits ^= low
+        return resolve_volley(cells, hit_cells, lambda index: self._ship_at(1 << index), ship)
+
+    # The game is over once every ship bit has also been hit.
+    def game_over(self):
+        return (self.ships & ~self.hits) == 0
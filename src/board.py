@@ -1,46 +1,94 @@
+from collections import namedtuple
+from time import perf_counter
+
+from game_io import TERMINAL_IO
+from metrics import METRICS
+from placements import placement_at
+from renderer import OWN_BOARD, OPPONENT_BOARD
+from utilities import BOARD_SIZE, CELL_ROW_COL, parse_cell, row_cells, column_cells, square_cells
+
+# Outcome of firing at several cells at once (see `Board.fire_many`): `results` holds the usual code for each cell in
+# the order given (0 for a miss or a cell already fired at, 1 for a hit and 2 for the hit that sinks a ship), and
+# `sunk` the ids of the ships sunk by the volley, in the order they went down.
+Volley = namedtuple('Volley', ['results', 'sunk'])
+
+# Build the `Volley` for a volley of `cells` once the board has been updated. `hit_cells` are the cells where the
+# volley hit a ship segment that had not been hit before, and `ship_at(cell)` gives the id of the ship there.
+# The hits are passed to the owner's `ship` object in volley order, so a ship is reported as sunk at the cell that
+# sank it, exactly as if the cells had been fired at one by one. Every other cell is a 0 and costs nothing here.
+def resolve_volley(cells, hit_cells, ship_at, ship):
+    results = [0] * len(cells)
+    sunk = []
+    pending = set(hit_cells)  # Hits not reached yet; a cell repeated later in the volley is no longer in here
+    for position, index in enumerate(cells):
+        if not pending:
+            break  # Every hit has been reported, the rest of the volley is misses
+        if index in pending:
+            pending.discard(index)
+            ship_id = ship_at(index)
+            if ship.hit_unit(ship_id):
+                sunk.append(ship_id)
+                results[position] = 2
+            else:
+                results[position] = 1
+    return Volley(results, sunk)
+
 class Board:
     # The constructor initializes the game board for a specific player (either player 1 or player 2).
-    # The board is a 10x10 grid filled with "~", which represents open water.
+    # The board is a `size` x `size` grid (10x10 by default) filled with "~", which represents open water.
     # The `player_num` parameter helps track the board's owner, and the board is represented as a 2D list.
-    def __init__(self, player_num):
+    # Prompts, messages and board drawings go through `io` (the terminal by default, see `game_io.py`).
+    def __init__(self, player_num, size=BOARD_SIZE, io=None):
         self.player_num = player_num  # Store the player number (either player 1 or player 2)
-        self.board = [["~" for _ in range(10)] for _ in range(10)]  # Initialize a 10x10 grid filled with "~" (open water)
+        self.size = size  # Number of rows and columns
+        self.board = [["~" for _ in range(size)] for _ in range(size)]  # Initialize the grid filled with "~" (open water)
+        self.remaining_segments = 0  # Live count of ship segments that have not been hit yet
+        self.ship_mask = 0  # Bitmask of every cell that holds part of a ship (bit = row * size + column)
+        self.placements = []  # Placements of the ships on this board, in the order they were placed
+        self.io = io or TERMINAL_IO  # Where prompts and messages for this board's owner go
 
     # This method displays a key to help players understand the symbols used on the board.
     # It shows the symbol meanings for ships, hits, misses, and open spots.
     def symbol_key(self):
-        print("Symbol Key for Battleship: ")
-        print(f'\tShip: O\n\tShip hit: X\n\tShip sunk: *\n\tOpen spot: ~\n\tMissfire: .\n')
+        self.io.write("Symbol Key for Battleship: ")
+        self.io.write(f'\tShip: O\n\tShip hit: X\n\tShip sunk: *\n\tOpen spot: ~\n\tMissfire: .\n')
 
     # This method displays the current player's own board. It shows the layout of ships and hits/misses.
     # The top row shows column letters (A-J), and each row shows the corresponding row number and ship positions.
+    # Drawing goes through the board's I/O; in a terminal, the renderer only redraws the cells that changed.
     def display_board(self):
-        print("Here is your board: ")
-        print("  " + " ".join(chr(ord('A') + i) for i in range(10)))  # Print column headers (A-J)
-        for i, row in enumerate(self.board):
-            # Replace ship integers with "O" to represent ship positions, keeping other symbols unchanged
-            formatted_row = ["O" if isinstance(cell, int) else cell for cell in row]
-            print(f"{i + 1:2} " + " ".join(formatted_row))  # Print row numbers and the row content
+        # Replace ship integers with "O" to represent ship positions, keeping other symbols unchanged
+        rows = [["O" if isinstance(cell, int) else cell for cell in row] for row in self.board]
+        self.io.show_board(OWN_BOARD, "Here is your board: ", rows)
 
     # This method displays the opponent's board from the player's perspective.
     # The opponent's ships are hidden (shown as "~"), but hits and misses are visible.
     def display_opponent_board(self):
-        print("Here is your opponent's board: ")
-        print("  " + " ".join(chr(ord('A') + i) for i in range(10)))  # Print column headers (A-J)
-        for i, row in enumerate(self.board):
-            # Hide ship positions and only show hits, misses, and empty spots
-            display_row = ['~' if isinstance(cell, int) else cell for cell in row]
-            print(f"{i + 1:2} " + " ".join(display_row))
+        rows = [['~' if isinstance(cell, int) else cell for cell in row] for row in self.board]
+        self.io.show_board(OPPONENT_BOARD, "Here is your opponent's board: ", rows)
+
+    # This method returns the value held at a cell ("~", ".", "X" or a ship id).
+    def get_cell(self, row, column):
+        return self.board[row][column]
+
+    # This method writes a value into a cell and keeps the live segment count used by `game_over` in step:
+    # overwriting a ship segment that has not been hit takes it off the count, writing a ship id adds one.
+    # Code that edits a board cell by cell should go through here, since writes straight into `self.board`
+    # do not update the count.
+    def set_cell(self, row, column, value):
+        was_afloat = isinstance(self.board[row][column], int)
+        self.board[row][column] = value
+        self.remaining_segments += isinstance(value, int) - was_afloat
 
     # This method checks if a particular board position is empty (i.e., contains a "~").
     # It returns True if the position is open and False otherwise.
     def is_empty(self, row, column):
         return self.board[row][column] == "~"
 
-    # This method checks if a given coordinate is within the bounds of the 10x10 board.
-    # It returns True if the row and column are within the valid range (0-9) and False if they are out of bounds.
+    # This method checks if a given coordinate is within the bounds of the board.
+    # It returns True if the row and column are within the valid range (0-9 on a 10x10 board) and False if they are out of bounds.
     def is_within_bounds(self, row, column):
-        return 0 <= row < 10 and 0 <= column < 10
+        return 0 <= row < self.size and 0 <= column < self.size
 
     # This method checks if a given coordinate is both within bounds and empty.
     # It's used to ensure that ships are placed within valid and unoccupied spaces.
@@ -54,15 +102,20 @@ class Board:
         orientation = None
         # Loop until the player selects a valid orientation (horizontal or vertical)
         while orientation not in ['h', 'v']:
-            orientation = input("Would you like your ship to be horizontal or vertical?\nEnter 'h' for horizontal. Enter 'v' for vertical.\n").strip().lower()
+            orientation = self.io.read("Would you like your ship to be horizontal or vertical?\nEnter 'h' for horizontal. Enter 'v' for vertical.\n").strip().lower()
         
         # Loop until a valid ship placement is entered
         while True:
             try:
                 # Ask the player to enter the starting coordinate for the ship placement (e.g., "A1")
-                location = input("Enter the upper leftmost coordinate you would like your ship to be placed at (e.g., A1): ").strip().upper()
+                location = self.io.read("Enter the upper leftmost coordinate you would like your ship to be placed at (e.g., A1): ").strip().upper()
                 # Convert the input into board coordinates (row, column) and validate the format
-                if len(location) == 2:  # Handles coordinates like A1, B3, etc.
+                if self.size != BOARD_SIZE:  # Custom boards use the general parser (e.g., AB120 on a large board)
+                    index = parse_cell(location, self.size)
+                    if index is None:
+                        raise ValueError("Invalid coordinate format.")
+                    row, col = divmod(index, self.size)
+                elif len(location) == 2:  # Handles coordinates like A1, B3, etc.
                     col = ord(location[0]) - ord('A')
                     row = int(location[1]) - 1
                 elif len(location) == 3 and location[1:] == "10":  # Handles coordinates like A10
@@ -71,89 +124,204 @@ class Board:
                 else:
                     raise ValueError("Invalid coordinate format.")
 
-                # Check if the starting coordinate is within the board bounds
-                if not self.is_within_bounds(row, col):
-                    raise ValueError("Starting coordinate is out of bounds.")
-
-                # For horizontal placement, check if the ship fits within bounds and does not overlap other ships
-                if orientation == 'h':
-                    if col + ship[1] > 10:
-                        raise ValueError("Ship will go out of bounds horizontally.")
-                    if any(not self.is_empty(row, col + i) for i in range(ship[1])):  # Check for overlapping ships
-                        raise ValueError("Ship overlaps with another ship.")
-                    for i in range(ship[1]):  # Place the ship on the board
-                        self.board[row][col + i] = ship[1]
-                
-                # For vertical placement, check if the ship fits within bounds and does not overlap other ships
-                else:
-                    if row + ship[1] > 10:
-                        raise ValueError("Ship will go out of bounds vertically.")
-                    if any(not self.is_empty(row + i, col) for i in range(ship[1])):  # Check for overlapping ships
-                        raise ValueError("Ship overlaps with another ship.")
-                    for i in range(ship[1]):  # Place the ship on the board
-                        self.board[row + i][col] = ship[1]
-                
+                placement = self.check_placement(row, col, ship[1], orientation)  # Raises ValueError if it does not fit
+                self.add_ship(placement)  # Place the ship on the board
                 break  # Exit the loop after successfully placing the ship
 
             except ValueError as e:
                 # If there is an error during ship placement, show the error and prompt the user to try again
-                print(e)
-                print("Invalid placement. Please try again.")
+                self.io.write(str(e))
+                self.io.write("Invalid placement. Please try again.")
+
+    # This method checks that a ship of the given length can start at (row, col) with the given orientation.
+    # It returns the matching placement, or raises a ValueError explaining why the ship does not fit.
+    def check_placement(self, row, col, length, orientation):
+        # Check if the starting coordinate is within the board bounds
+        if not self.is_within_bounds(row, col):
+            raise ValueError("Starting coordinate is out of bounds.")
+
+        # Look up the precomputed placement; there is none if the ship would run off the board
+        placement = placement_at(row, col, length, orientation, self.size)
+        if placement is None:
+            if orientation == 'h':
+                raise ValueError("Ship will go out of bounds horizontally.")
+            raise ValueError("Ship will go out of bounds vertically.")
+        if not self.can_place(placement):  # Check for overlapping ships
+            raise ValueError("Ship overlaps with another ship.")
+        return placement
+
+    # This method checks whether a precomputed placement (see `placements.py`) is free of other ships.
+    # It is a single mask test against the cells already occupied; placements on boards too large for
+    # masks check their cells one by one.
+    def can_place(self, placement):
+        if placement.mask is None:
+            return all(not isinstance(self.board[row][col], int) for row, col in placement.cells)
+        return not placement.mask & self.ship_mask
+
+    # This method writes a precomputed placement onto the board. The placement must already have been validated.
+    # `ship_id` is the value stored in the ship's cells and passed to `Ships.hit_unit`; it defaults to the ship's
+    # length, which is the ship's number in the standard fleet (see `Ships.set_fleet` for custom fleets).
+    # It also adds the ship's segments to the live count used by `game_over`.
+    def add_ship(self, placement, ship_id=None):
+        value = placement.length if ship_id is None else ship_id
+        for row, col in placement.cells:
+            self.board[row][col] = value
+        if placement.mask is not None:
+            self.ship_mask |= placement.mask
+        self.remaining_segments += placement.length
+        self.placements.append(placement)
+
+    # This method writes a ship of the given length onto the board, starting at (row, col) and extending
+    # to the right ('h') or downward ('v'). The placement must already have been validated.
+    def place_ship_at(self, row, col, length, orientation):
+        self.add_ship(placement_at(row, col, length, orientation, self.size))
 
     # This method processes a player's shot at the opponent's board.
     # It takes a coordinate as input and checks if the shot hits, misses, or sinks a ship.
     # It returns 0 for a miss, 1 for a hit, and 2 for a sunk ship.
+    # The coordinate is looked up once and the shot is handled by `fire_index`.
     def fire(self, guess_coordinate, ship):
-        try:
-            # Convert the input coordinate (e.g., "A1") into board indices (row, column)
-            if len(guess_coordinate) == 3 and guess_coordinate[1:] == "10":
-                col = ord(guess_coordinate[0]) - ord('A')
-                row = 9
-            else:
-                col = ord(guess_coordinate[0]) - ord('A')
-                row = int(guess_coordinate[1]) - 1
-
-            # Check if the shot is within the board's bounds
-            if not self.is_within_bounds(row, col):
-                print("Out of bounds. Please select a valid coordinate.")
-                return 0
-
-            target_value = self.board[row][col]  # Get the value of the board cell at the shot coordinate
-            if isinstance(target_value, int):  # If the shot hits a ship (represented by an integer)
-                self.board[row][col] = "X"  # Mark the hit with an "X"
-                ship.remaining_units[target_value - 1] -= 1  # Decrease the remaining parts of the hit ship
-                if ship.remaining_units[target_value - 1] == 0:
-                    return 2  # Ship is sunk
-                return 1  # Ship is hit but not sunk
-            elif target_value == "~":  # If the shot misses (open water)
-                self.board[row][col] = "."  # Mark the miss with a "."
-                return 0  # Miss
-            else:  # If the player already fired at this spot
-                print("You already targeted this location.")
-                return 0
-        except Exception:
-            # If an invalid coordinate is provided, catch the error and prompt the player to try again
-            print("Error with the coordinate. Please try again.")
+        index = parse_cell(guess_coordinate, self.size)
+        if index is None:
+            # If an invalid coordinate is provided, tell the player to try again
+            self.io.write("Error with the coordinate. Please try again.")
+            return 0
+        return self.fire_index(index, ship)
+
+    # This method fires at a cell given by its index (row * size + column), without any string parsing.
+    # It is used by the AI and simulation paths and returns the same codes as `fire`.
+    # When metrics are enabled, it counts the shot and records how long it took (see `metrics.py`).
+    def fire_index(self, index, ship):
+        if not METRICS.enabled:
+            return self._fire_index(index, ship)
+        start = perf_counter()
+        fire_result = self._fire_index(index, ship)
+        METRICS.observe('fire_seconds', perf_counter() - start)
+        METRICS.count('shots_total')
+        if fire_result:
+            METRICS.count('hits_total')
+            if fire_result == 2:
+                METRICS.count('sinks_total')
+        return fire_result
+
+    # This method fires at a cell index like `fire_index`, but is not counted in the metrics. It is used to replay
+    # shots that were already counted when they were first fired, e.g. when a saved game is restored.
+    def replay_shot(self, index, ship):
+        return self._fire_index(index, ship)
+
+    # This method updates the board for a shot at a cell index. Board backends override it to fire at their own storage.
+    def _fire_index(self, index, ship):
+        if self.size == BOARD_SIZE:
+            row, col = CELL_ROW_COL[index]
+        else:
+            row, col = divmod(index, self.size)
+        target_value = self.board[row][col]  # Get the value of the board cell at the shot coordinate
+        if isinstance(target_value, int):  # If the shot hits a ship (represented by an integer)
+            self.board[row][col] = "X"  # Mark the hit with an "X"
+            self.remaining_segments -= 1  # One less segment left afloat
+            if ship.hit_unit(target_value):  # Decrease the remaining parts of the hit ship
+                return 2  # Ship is sunk
+            return 1  # Ship is hit but not sunk
+        elif target_value == "~":  # If the shot misses (open water)
+            self.board[row][col] = "."  # Mark the miss with a "."
+            return 0  # Miss
+        else:  # If the player already fired at this spot
+            self.io.write("You already targeted this location.")
             return 0
 
     # This method performs an airstrike on a selected row.
     # The airstrike targets all columns in the row and marks hits and misses.
+    # If the owner's `ship` object is given, the hit ships lose their remaining units just like with `fire`.
     # It returns the number of hits achieved in that row.
-    def perform_airstrike(self, row):
+    def perform_airstrike(self, row, ship=None):
+        hits = self._perform_airstrike(row, ship)
+        if METRICS.enabled:
+            METRICS.count('airstrikes_total')
+            METRICS.count('airstrike_hits_total', hits)
+        return hits
+
+    # This method updates the board for an airstrike on a row. Board backends override it to fire at their own storage.
+    def _perform_airstrike(self, row, ship=None):
         hits = 0  # Initialize a hit counter
-        for col in range(10):
-            if isinstance(self.board[row][col], int):  # If there is a ship in the current cell, hit it
+        for col in range(self.size):
+            target_value = self.board[row][col]
+            if isinstance(target_value, int):  # If there is a ship in the current cell, hit it
                 self.board[row][col] = "X"
+                self.remaining_segments -= 1  # One less segment left afloat
+                if ship is not None:
+                    ship.hit_unit(target_value)
                 hits += 1  # Increment the hit counter for each hit
             elif self.board[row][col] == "~":  # If the cell is open water, mark it as a miss
                 self.board[row][col] = "."
         return hits  # Return the total number of hits in the row
 
+    # This method fires at several cells in one pass and returns a `Volley`. `cells` is any iterable of cell indices
+    # (row * size + column); a ValueError is raised, before anything is fired, if one is off the board.
+    # Row and column strikes, bombs and salvos are all built on it. Each hit ship loses its units in the owner's
+    # `ship` object just like with `fire`, but the whole volley is resolved with one call, so it is much cheaper than
+    # calling `fire` in a loop. Cells already fired at (including repeats within the volley) count as misses and
+    # are not reported to the player one by one.
+    def fire_many(self, cells, ship):
+        if not isinstance(cells, (list, tuple, range)):
+            cells = tuple(cells)  # A generator can only be read once, and the bounds check reads it first
+        if cells and (min(cells) < 0 or max(cells) >= self.size * self.size):
+            raise ValueError("Every cell of a volley must be on the board.")
+        if not METRICS.enabled:
+            return self._fire_many(cells, ship)
+        start = perf_counter()
+        volley = self._fire_many(cells, ship)
+        METRICS.observe('fire_many_seconds', perf_counter() - start)
+        METRICS.count('volleys_total')
+        METRICS.count('shots_total', len(cells))
+        METRICS.count('hits_total', len(cells) - volley.results.count(0))
+        METRICS.count('sinks_total', len(volley.sunk))
+        return volley
+
+    # This method updates the board for a volley of cell indices. Board backends override it to fire at their own storage.
+    # Every cell is marked in a single pass (a repeated cell already reads as fired at); only the hits need any further work.
+    def _fire_many(self, cells, ship):
+        grid = self.board
+        size = self.size
+        hit_values = {}  # Cell index -> id of the ship hit there
+        for index in cells:
+            row, col = CELL_ROW_COL[index] if size == BOARD_SIZE else divmod(index, size)
+            target_value = grid[row][col]
+            if target_value == "~":  # Open water, mark the miss
+                grid[row][col] = "."
+            elif isinstance(target_value, int):  # A ship segment that has not been hit yet
+                grid[row][col] = "X"
+                hit_values[index] = target_value
+        self.remaining_segments -= len(hit_values)
+        return resolve_volley(cells, hit_values, hit_values.__getitem__, ship)
+
+    # This method fires at every cell of a row (0-based) and returns a `Volley`.
+    def strike_row(self, row, ship):
+        return self.fire_many(row_cells(row, self.size), ship)
+
+    # This method fires at every cell of a column (0-based) and returns a `Volley`.
+    def strike_column(self, col, ship):
+        return self.fire_many(column_cells(col, self.size), ship)
+
+    # This method drops a bomb centred on (row, col) that hits the 3x3 square around it (less at the edges)
+    # and returns a `Volley`.
+    def bomb(self, row, col, ship):
+        if not self.is_within_bounds(row, col):
+            raise ValueError("Bomb target is out of bounds.")
+        return self.fire_many(square_cells(row, col, self.size), ship)
+
+    # This method fires a salvo: several shots given as coordinates (e.g., ["A1", "C4", "J10"]) resolved together.
+    # It raises a ValueError naming the first invalid coordinate, before any shot is fired, and returns a `Volley`.
+    def salvo(self, coordinates, ship):
+        cells = []
+        for coordinate in coordinates:
+            index = parse_cell(coordinate, self.size)
+            if index is None:
+                raise ValueError("Invalid coordinate in salvo: " + coordinate + ".")
+            cells.append(index)
+        return self.fire_many(cells, ship)
+
     # This method checks if the game is over by verifying if there are any ships remaining on the board.
     # It returns True if all ships have been hit and sunk, and False if any ships remain.
+    # The live segment count is kept up to date by `add_ship`, `set_cell`, `fire`, `fire_many` and `perform_airstrike`, so no scan is needed.
     def game_over(self):
-        for rows in self.board:  # Iterate through each row on the board
-            for space in rows:  # Check each space in the row
-                if isinstance(space, int):  # If any space contains part of a ship (an integer), the game is not over
-                    return False
-        return True  # If no ships remain, return True indicating the game is over
+        return self.remaining_segments == 0
@@ -0,0 +1,175 @@
+# Exact endgame solver for the AIs.
+# Once most of the board is resolved and only a few ships are left, there are few enough fleet arrangements that
+# fit the hits, misses and sunk ships to list them all. The solver does this with a depth-first search over the
+# precomputed placement masks (see `placements.py`) and counts, for every cell, how many arrangements put a ship
+# still afloat there. Dividing by the number of arrangements gives the exact chance that a shot at the cell hits.
+#
+# The solver switches on when at most `ENDGAME_MAX_CONFIGURATIONS` arrangements are left: it gives up as soon as it
+# finds more, and the caller falls back to its usual heuristic. Counting the arrangements is itself the expensive
+# part, so two cheap checks come first: few ship segments must be left to find, and a quick upper bound on the
+# number of arrangements must be small. The search also gives up after `ENDGAME_MAX_NODES` candidate placements.
+# These limits count work, not time, so the same position always gets the same answer whatever the machine's speed;
+# seeded games, replays and the board backends all stay reproducible. Interactive callers also pass `time_cap`, a
+# wall-clock cap that only matters on a machine too slow to reach the node budget in time.
+
+import random
+import time
+
+from placements import placement_table
+from utilities import BOARD_SIZE, CELL_COUNT, CELL_ROW_COL
+
+# Most arrangements the solver will enumerate; with more than this the position is not an endgame yet
+ENDGAME_MAX_CONFIGURATIONS = 1000
+
+# Most ship segments the AI may still have to find (afloat ship cells not hit yet) for the solver to be tried.
+# With more, there are almost always more than `ENDGAME_MAX_CONFIGURATIONS` arrangements, so they are not counted.
+ENDGAME_MAX_UNFOUND_SEGMENTS = 3
+
+# Largest product of per-ship candidate counts for which the search is started at all.
+# The product is an upper bound on the number of arrangements and costs almost nothing to compute.
+ENDGAME_CANDIDATE_LIMIT = 100000
+
+# Most candidate placements one search may try
+ENDGAME_MAX_NODES = 20000
+
+# Seconds one search may take in interactive play (`ai_fire_endgame`); the node budget is usually reached well before
+ENDGAME_TIME_CAP = 0.02
+
+# Candidate placements tried between two checks of the clock, when a time cap is given
+CLOCK_CHECK_INTERVAL = 256
+
+# Raised inside the search when it goes over its arrangement, node or time limit.
+class _SearchAborted(Exception):
+    pass
+
+# Count every fleet arrangement that fits what the AI has seen on a 10x10 board.
+# `hit_mask` and `miss_mask` are the cells hit and missed (bit = row * 10 + col), `sunk_lengths` the lengths of the
+# sunk ships and `afloat_lengths` those of the ships still afloat. Sunk ships lie entirely on hits; ships afloat
+# avoid misses and cannot lie entirely on hits, and every hit belongs to some ship.
+# Returns (arrangements, counts), where counts[cell] is the number of arrangements with a ship afloat on that cell,
+# or None if the position has too many arrangements, the node budget ran out or the optional `time_cap` (in seconds)
+# passed. Without a time cap the result only depends on the position.
+def count_arrangements(hit_mask, miss_mask, sunk_lengths, afloat_lengths, max_configurations=ENDGAME_MAX_CONFIGURATIONS,
+                       max_nodes=ENDGAME_MAX_NODES, time_cap=None):
+    deadline = None if time_cap is None else time.perf_counter() + time_cap
+    table = placement_table(BOARD_SIZE)
+
+    # Candidate masks for every ship: (is afloat, length, masks). Afloat ships come first as they have the most
+    # candidates, so the upper bound on the number of arrangements (the product of the candidate counts) usually
+    # rules out a position that is not an endgame yet before every list is built.
+    ships = []
+    candidates = {}  # (is afloat, length) -> masks, shared by ships of the same length
+    bound = 1
+    for afloat, lengths in ((True, afloat_lengths), (False, sunk_lengths)):
+        for length in lengths:
+            masks = candidates.get((afloat, length))
+            if masks is None:
+                if afloat:
+                    masks = [p.mask for p in table.for_length(length) if not p.mask & miss_mask and p.mask & ~hit_mask]
+                else:
+                    masks = [p.mask for p in table.for_length(length) if not p.mask & ~hit_mask]
+                candidates[(afloat, length)] = masks
+            ships.append((afloat, length, masks))
+            bound *= len(masks)
+            if bound > ENDGAME_CANDIDATE_LIMIT:
+                return None
+    if bound == 0:
+        return 0, [0] * CELL_COUNT
+
+    # Branch on the most constrained ships first so dead ends are found early
+    ships.sort(key=lambda ship: len(ship[2]))
+    # Segments the ships from each depth on can still cover, and the cells they can reach at all,
+    # used to prune branches that would leave hits unexplained
+    capacity = [0] * (len(ships) + 1)
+    reach = [0] * (len(ships) + 1)
+    for depth in range(len(ships) - 1, -1, -1):
+        capacity[depth] = capacity[depth + 1] + ships[depth][1]
+        reach[depth] = reach[depth + 1]
+        for mask in ships[depth][2]:
+            reach[depth] |= mask
+
+    # Every call returns the number of ways to complete the arrangement from its depth on, and each afloat mask is
+    # credited with the completions found below it, so finished arrangements need no further work.
+    mask_counts = {}  # Afloat placement mask -> arrangements using it
+    last = len(ships) - 1
+    arrangements = 0
+    nodes = 0
+
+    def search(depth, occupied):
+        nonlocal arrangements, nodes
+        uncovered = hit_mask & ~occupied
+        if uncovered & ~reach[depth] or uncovered.bit_count() > capacity[depth]:
+            return 0  # The remaining ships cannot cover every unexplained hit
+        afloat, _, masks = ships[depth]
+        completions = 0
+        for mask in masks:
+            nodes += 1
+            if nodes > max_nodes:
+                raise _SearchAborted()
+            if deadline is not None and nodes % CLOCK_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                raise _SearchAborted()
+            if mask & occupied:
+                continue
+            if depth == last:
+                below = 0 if uncovered & ~mask else 1  # The last ship must cover every hit left
+            else:
+                below = search(depth + 1, occupied | mask)
+            if below:
+                if afloat:
+                    mask_counts[mask] = mask_counts.get(mask, 0) + below
+                completions += below
+        if depth == last:
+            arrangements += completions
+            if arrangements > max_configurations:
+                raise _SearchAborted()
+        return completions
+
+    if not ships:
+        return (0 if hit_mask else 1), [0] * CELL_COUNT
+    try:
+        search(0, 0)
+    except _SearchAborted:
+        return None
+
+    counts = [0] * CELL_COUNT
+    for mask, count in mask_counts.items():
+        while mask:
+            low = mask & -mask
+            counts[low.bit_length() - 1] += count
+            mask ^= low
+    return arrangements, counts
+
+# Number of afloat ship segments the AI has not found yet: the afloat ships' cells minus the hits no sunk ship explains.
+def unfound_segments(hit_mask, sunk_lengths, afloat_lengths):
+    return sum(afloat_lengths) - (hit_mask.bit_count() - sum(sunk_lengths))
+
+# Exact hit counts for every cell, or None if the position is not an endgame yet (too many segments left to find
+# or too many arrangements) or no arrangement fits. `sunk_lengths` and `afloat_lengths` are the lengths of the
+# opponent's sunk and afloat ships (the fleet is announced, so the AI knows which ships are sunk).
+# Checking the unfound segments first costs almost nothing, so early in a game the solver is not even set up.
+def endgame_counts(hit_mask, miss_mask, sunk_lengths, afloat_lengths, time_cap=None):
+    if not afloat_lengths or unfound_segments(hit_mask, sunk_lengths, afloat_lengths) > ENDGAME_MAX_UNFOUND_SEGMENTS:
+        return None
+    solved = count_arrangements(hit_mask, miss_mask, sunk_lengths, afloat_lengths, ENDGAME_MAX_CONFIGURATIONS,
+                                ENDGAME_MAX_NODES, time_cap)
+    if solved is None or solved[0] == 0:
+        return None  # Too many arrangements, out of budget, or no arrangement fits (e.g., knowledge from elsewhere)
+    return solved[1]
+
+# Pick the shot with the highest exact chance of hitting, or return None if the position is not an endgame yet
+# (or the search ran out of budget), so the caller can fall back to its usual strategy.
+# `ships` is the opponent's `Ships` and `targeted_coordinates` the AI's `ShotPool`; ties are broken at random.
+def endgame_shot(hit_mask, miss_mask, ships, targeted_coordinates, time_cap=None):
+    sunk_lengths = [length for length, units in zip(ships.lengths, ships.remaining_units) if units == 0]
+    afloat_lengths = [length for length, units in zip(ships.lengths, ships.remaining_units) if units > 0]
+    counts = endgame_counts(hit_mask, miss_mask, sunk_lengths, afloat_lengths, time_cap)
+    if counts is None:
+        return None
+
+    known = hit_mask | miss_mask
+    options = [cell for cell in range(CELL_COUNT)
+               if counts[cell] and not known >> cell & 1 and CELL_ROW_COL[cell] not in targeted_coordinates]
+    if not options:
+        return None
+    best_count = max(counts[cell] for cell in options)
+    return random.choice([cell for cell in options if counts[cell] == best_count])
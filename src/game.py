@@ -1,13 +1,17 @@
-from utilities import is_valid_coordinate, clear_screen
+from game_io import TERMINAL_IO
+from utilities import parse_cell
 
 class Game:
     # Initialize the Game class with boards, ships, and currentplayer objects.
     # Also initializes a `player_hits` array to keep track of consecutive hits for both players (Player 1 and Player 2).
-    def __init__(self, boards, ships, currentplayer):
+    # Prompts and messages go through `io` (the terminal by default, see `game_io.py`).
+    def __init__(self, boards, ships, currentplayer, io=None):
         self.boards = boards  # List of boards, one for each player
         self.ships = ships  # List of ships, one for each player
         self.currentplayer = currentplayer  # SwitchPlayers object to track current player's turn
         self.player_hits = [0, 0]  # Track consecutive hits for each player to trigger airstrikes
+        self.replay = None  # Optional `ReplayWriter` that records every shot and airstrike
+        self.io = io or TERMINAL_IO  # Where prompts and messages for the players go
 
     # Setup phase for each player to position their ships on the board.
     # This method takes in a player number and initiates the setup process for that player.
@@ -32,7 +36,7 @@ class Game:
             self.boards[player].place_ships(ship)  # Ask the player for coordinates and place the ship
             self.boards[player].display_board()  # Display the board after placing each ship
 
-        clear_screen()  # Clear the screen after the player finishes placing all their ships
+        self.io.clear()  # Clear the screen after the player finishes placing all their ships
         self.currentplayer.end_turn()  # End the player's setup turn
 
     # Method to check if the player is eligible for an airstrike after 3 consecutive hits.
@@ -40,27 +44,30 @@ class Game:
     def check_airstrike(self, player):
         # Check if the current player has had 3 or more consecutive hits
         if self.player_hits[player] >= 3:
-            print("You have earned an airstrike! Choose a row (1-10) to fire at.")
+            size = self.boards[1 - player].size  # Rows on the opponent's board
+            self.io.write(f"You have earned an airstrike! Choose a row (1-{size}) to fire at.")
             
             # Loop until a valid row number is chosen for the airstrike
             while True:
                 try:
-                    row = int(input("Enter row number (1-10) for airstrike: ")) - 1  # Convert to 0-based index
-                    if row < 0 or row > 9:
-                        raise ValueError("Row must be between 1 and 10.")  # Ensure row is within valid range
+                    row = int(self.io.read(f"Enter row number (1-{size}) for airstrike: ")) - 1  # Convert to 0-based index
+                    if row < 0 or row >= size:
+                        raise ValueError(f"Row must be between 1 and {size}.")  # Ensure row is within valid range
                     break
                 except ValueError as e:
-                    print(e)
+                    self.io.write(str(e))
                     continue
             
             # Perform the airstrike, which targets all columns in the selected row
-            hits = self.boards[1 - player].perform_airstrike(row)
-            print(f"Airstrike hit {hits} times on row {row + 1}.")  # Report the number of hits from the airstrike
+            if self.replay is not None:
+                self.replay.record_airstrike(row)
+            hits = self.boards[1 - player].perform_airstrike(row, self.ships[1 - player])
+            self.io.write(f"Airstrike hit {hits} times on row {row + 1}.")  # Report the number of hits from the airstrike
             self.boards[1 - player].display_opponent_board()  # Show the updated opponent's board
 
             # Check if the airstrike results in a game win
             if self.boards[1 - player].game_over():
-                print(f"GAME OVER: Player {player + 1} wins!")  # Announce the winner
+                self.io.write(f"GAME OVER: Player {player + 1} wins!")  # Announce the winner
                 return True  # Return True to indicate the game is over
 
             # Reset the hit counter after the airstrike is performed
@@ -72,27 +79,31 @@ class Game:
     def take_turn(self, player):
         player_continue = True  # Flag to determine if the player gets additional actions during their turn
         opponent = 1 - player  # Determine the opponent (player 0's opponent is player 1, and vice versa)
+        size = self.boards[opponent].size  # Coordinates are checked against the opponent's board
         self.boards[opponent].display_opponent_board()  # Display the opponent's board to the player
 
         # Loop to allow the player to continue taking actions (firing shots) in their turn
         while player_continue:
             # Prompt the player to enter a coordinate where they want to fire
             while True:
-                guess_coordinate = input("Input the coordinate you want to fire at (e.g., A5 or A10): ").upper()
-                if is_valid_coordinate(guess_coordinate):  # Validate the input coordinate
+                guess_coordinate = self.io.read("Input the coordinate you want to fire at (e.g., A5 or A10): ").upper()
+                index = parse_cell(guess_coordinate, size)  # Validate the input coordinate
+                if index is not None:
                     break
                 else:
-                    print("Invalid coordinate! Please enter a valid coordinate (e.g., A5 or A10).")
+                    self.io.write("Invalid coordinate! Please enter a valid coordinate (e.g., A5 or A10).")
 
             # Fire at the guessed coordinate and determine the result
             fire = self.boards[opponent].fire(guess_coordinate, self.ships[opponent])
+            if self.replay is not None:
+                self.replay.record_shot(*divmod(index, size), fire)
 
             # Check the result of the firing action
             if fire == 0:
-                print("MISS")  # No ship hit, missed the shot
+                self.io.write("MISS")  # No ship hit, missed the shot
                 player_continue = False  # End the player's turn
             elif fire == 1:
-                print("HIT")  # Successfully hit an opponent's ship
+                self.io.write("HIT")  # Successfully hit an opponent's ship
                 self.player_hits[player] += 1  # Increment the hit counter for consecutive hits
 
                 # Check if the player has earned an airstrike or if the game has ended
@@ -100,15 +111,43 @@ class Game:
                     return True  # Return True to indicate the game is over
                 player_continue = False  # End the player's turn after the hit
             elif fire == 2:
-                print("SUNK BATTLESHIP")  # The hit resulted in sinking an opponent's ship
+                self.io.write("SUNK BATTLESHIP")  # The hit resulted in sinking an opponent's ship
                 self.player_hits[player] += 1  # Increment the hit counter
 
                 # Check if an airstrike is earned or if the game is over
                 if self.check_airstrike(player):
                     return True  # End the game if airstrike wins the game
                 if self.boards[opponent].game_over():
-                    print(f"GAME OVER: Player {player + 1} wins!")  # Announce the winner
+                    self.io.write(f"GAME OVER: Player {player + 1} wins!")  # Announce the winner
                     return True  # Return True to indicate the game is over
                 player_continue = False  # End the player's turn after sinking the ship
 
         return False  # Return False to indicate the game continues
+
+    # Salvo variant of `take_turn`: the player fires one shot for each of their own ships still afloat, all at once.
+    # The shots are entered on one line and resolved together with `Board.salvo`. Airstrikes are not used in this
+    # variant, and salvos are not recorded in replays, whose format has one shot per turn.
+    def take_salvo_turn(self, player):
+        opponent = 1 - player
+        shots = sum(1 for units in self.ships[player].remaining_units if units > 0)
+        self.boards[opponent].display_opponent_board()
+
+        # Loop until the player enters the right number of different, valid coordinates
+        while True:
+            coordinates = self.io.read(f"Input {shots} coordinates to fire at, separated by spaces (e.g., A5 B6 J10): ").upper().split()
+            if len(coordinates) != shots or len(set(coordinates)) != shots:
+                self.io.write(f"Please enter {shots} different coordinates.")
+                continue
+            try:
+                volley = self.boards[opponent].salvo(coordinates, self.ships[opponent])
+                break
+            except ValueError as e:
+                self.io.write(str(e))
+
+        # Report every shot, then the ships sunk by the salvo
+        for coordinate, result in zip(coordinates, volley.results):
+            self.io.write(coordinate + ": " + ("MISS", "HIT", "SUNK BATTLESHIP")[result])
+        if self.boards[opponent].game_over():
+            self.io.write(f"GAME OVER: Player {player + 1} wins!")
+            return True
+        return False
@@ -0,0 +1,93 @@
+# Input and output for the human side of the game.
+# `Board`, `Ships`, `Game` and `SwitchPlayers` never call `input()` or `print()` themselves; they ask their `io`
+# object instead, so the same code (including its validation loops) can run in a terminal, from a script of
+# pre-recorded answers, or silently:
+#
+#   TerminalIO  - reads from the keyboard, prints to the screen and draws the boards with the shared renderer.
+#   ScriptedIO  - answers every prompt with the next line of a script (a list, any iterator or a file) and
+#                 discards the output, or copies it to a stream as a transcript. Running out of answers raises
+#                 EOFError, just like `input()` at the end of standard input.
+#   NullIO      - discards all output and has no input at all, for headless code that never prompts.
+#
+# Every object defaults to `TERMINAL_IO`. To drive a whole game from a script, pass one `ScriptedIO` to all of them:
+#
+#   io = ScriptedIO.from_file('moves.txt')
+#   game = Game([Board(1, io=io), Board(2, io=io)], [Ships(1, io=io), Ships(2, io=io)], SwitchPlayers(io=io), io=io)
+
+from renderer import RENDERER, panel_lines
+
+# Talks to the player through the terminal.
+class TerminalIO:
+    def __init__(self, renderer=None):
+        self.renderer = renderer or RENDERER  # Draws the boards and clears the screen
+
+    # Ask the player a question and return their answer (without the trailing newline).
+    def read(self, prompt=""):
+        return input(prompt)
+
+    # Show a message on its own line.
+    def write(self, message=""):
+        print(message)
+
+    # Draw a board panel (see `renderer.py`); `rows` is a list of rows of one-character cell symbols.
+    def show_board(self, panel, title, rows):
+        self.renderer.show(panel, title, rows)
+
+    # Blank the screen between players' turns.
+    def clear(self):
+        self.renderer.clear()
+
+# Answers prompts from a script of pre-recorded moves, one answer per line.
+class ScriptedIO:
+    # `answers` is any iterable of strings, e.g., ["1", "h", "A1"] or an open file.
+    # If `transcript` is a stream, prompts, answers and messages are written to it as they would appear on screen.
+    def __init__(self, answers, transcript=None):
+        self.answers = iter(answers)
+        self.transcript = transcript
+        self.answered = 0  # Number of answers used so far, handy for pointing at the failing line of a script
+
+    # Load a script from a text file, one answer per line. Blank lines are answers too (pressing Enter).
+    @classmethod
+    def from_file(cls, path, transcript=None):
+        with open(path) as script:
+            return cls(script.read().splitlines(), transcript)
+
+    def read(self, prompt=""):
+        try:
+            answer = next(self.answers)
+        except StopIteration:
+            raise EOFError(f"The script ran out of answers after {self.answered} lines.") from None
+        answer = answer.rstrip("\r\n")
+        self.answered += 1
+        if self.transcript is not None:
+            self.transcript.write(prompt + answer + "\n")
+        return answer
+
+    def write(self, message=""):
+        if self.transcript is not None:
+            self.transcript.write(f"{message}\n")
+
+    # Boards are written out in full as plain text, so the transcript shows every state the player saw.
+    def show_board(self, panel, title, rows):
+        if self.transcript is not None:
+            self.transcript.write("\n".join(panel_lines(title, rows)) + "\n")
+
+    def clear(self):
+        pass
+
+# Discards everything. Asking it for input is an error, as there is nobody to answer.
+class NullIO:
+    def read(self, prompt=""):
+        raise EOFError("No input available: " + prompt.strip())
+
+    def write(self, message=""):
+        pass
+
+    def show_board(self, panel, title, rows):
+        pass
+
+    def clear(self):
+        pass
+
+# Default I/O for every board, fleet and game
+TERMINAL_IO = TerminalIO()
@@ -0,0 +1,256 @@
+# Snapshots of a whole game in one compact, immutable value.
+# A game's state is spread over the `Board` grids, the `Ships` counters, `Game.player_hits`,
+# `SwitchPlayers.player_num` and the AI's `ai_state` dict and `ShotPool`. `capture_state` reads all of it into a
+# `GameState`, whose ships, hits and misses are integer bitmasks (bit = row * size + column), and `restore_state`
+# builds fresh, independent objects from it again. Because a snapshot never changes, it can be shared by any number
+# of callers without copying; `apply_shot` forks a new snapshot with one more shot fired, without building any
+# boards, so a lookahead AI can explore many hypothetical moves cheaply. `encode_state` and `decode_state` turn a
+# snapshot into bytes and back, for checkpoints and save files.
+#
+# Serialized form of a snapshot (little-endian):
+#   header: version (B), board size (H), current player (B, 1 or 2), airstrike hits for each player (BB),
+#           flags (B, bit 0 = AI state present)
+#   per player: fleet size (H) followed by each ship's length (B), placed ship count (H) followed by each ship's
+#               length, orientation (0 = 'h', 1 = 'v'), row and column (BBHH), then the hit and miss cells as
+#               bitmasks of (size * size + 7) // 8 bytes
+#   AI only: cells the AI has targeted (bitmask), target mode (B), direction (B, 4 = none),
+#            number of directions tried (B) and the directions tried in the order they were tried (B, two bits each,
+#            first direction lowest), steps in that direction (H),
+#            last hit and initial hit (i each, row * size + column or -1 = none)
+# Session files (see `session_store.py`) store a match as a small header followed by this snapshot.
+
+import struct
+from collections import namedtuple
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from ships import Ships
+from ai import ShotPool
+from placements import placement_at
+
+VERSION = 1
+DIRECTIONS = ('up', 'down', 'left', 'right')
+
+_HEADER = struct.Struct('<BHBBBB')
+_PLACEMENT = struct.Struct('<BBHH')
+_AI = struct.Struct('<BBBBHii')
+
+# One player's fleet and the shots fired at it.
+# `lengths` is the fleet (see `Ships.set_fleet`), `placements` the placed ships as (length, orientation, row, col)
+# tuples in the order they were placed, `ship_masks` the cells of each placed ship, and `hits`/`misses` the cells
+# of this player's board that have been fired at.
+PlayerState = namedtuple('PlayerState', ['lengths', 'placements', 'ship_masks', 'hits', 'misses'])
+
+# The whole game: the board `size`, a `PlayerState` per player, the airstrike hit counters (`Game.player_hits`),
+# the player whose turn it is (`SwitchPlayers.player_num`, 1 or 2), and the AI's state, which is None in games
+# without an AI. `ai_state` holds the medium AI's dict as a tuple in `AI_STATE_KEYS` order and `ai_targeted` the
+# cells in its `ShotPool` as a bitmask.
+GameState = namedtuple('GameState', ['size', 'players', 'player_hits', 'player_num', 'ai_state', 'ai_targeted'])
+
+# Keys of the medium AI's state dict (see `ai.new_ai_state`), in the order they are kept in `GameState.ai_state`
+AI_STATE_KEYS = ('last_hit', 'target_mode', 'directions_tried', 'direction', 'steps_in_current_direction',
+                 'initial_hit')
+
+# Bitmask of the cells a placement covers.
+def _placement_mask(cells, size):
+    mask = 0
+    for row, col in cells:
+        mask |= 1 << (row * size + col)
+    return mask
+
+# Cell indices set in a bitmask, lowest first.
+def _mask_indices(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+# Bitmask of a set of cell indices, built in a byte array so large boards cost one pass instead of one big-integer
+# operation per cell.
+def _indices_mask(indices, size):
+    data = bytearray((size * size + 7) // 8)
+    for index in indices:
+        data[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(data, 'little')
+
+# Read the hit and miss bitmasks off any board backend.
+def _shot_masks(board):
+    if isinstance(board, BitBoard):
+        return board.hits, board.misses
+    if isinstance(board, SparseBoard):
+        return _indices_mask(board.hits, board.size), _indices_mask(board.misses, board.size)
+    hits = 0
+    misses = 0
+    for row, cells in enumerate(board.board):
+        for col, cell in enumerate(cells):
+            if cell == "X":
+                hits |= 1 << (row * board.size + col)
+            elif cell == ".":
+                misses |= 1 << (row * board.size + col)
+    return hits, misses
+
+def _capture_player(board, ships):
+    hits, misses = _shot_masks(board)
+    placements = tuple((p.length, p.orientation, p.row, p.col) for p in board.placements)
+    ship_masks = tuple(_placement_mask(p.cells, board.size) for p in board.placements)
+    return PlayerState(tuple(ships.lengths), placements, ship_masks, hits, misses)
+
+# Take a snapshot of a game from its parts. `game` (a `Game`, or anything with `player_hits`) supplies the airstrike
+# counters and `players` (a `SwitchPlayers`) the current player; `ai_state` and `ai_targeted_coordinates` are the
+# AI's dict and `ShotPool` in a game against the AI (an AI that has not fired yet may leave out the `ShotPool`).
+# The parts are only read, so the game can go on afterwards.
+def capture_state(boards, ships, game=None, players=None, ai_state=None, ai_targeted_coordinates=None):
+    size = boards[0].size
+    frozen_ai = None
+    targeted = None
+    if ai_state is not None:
+        frozen_ai = tuple(tuple(ai_state[key]) if key == 'directions_tried' else ai_state[key]
+                          for key in AI_STATE_KEYS)
+        targeted = 0
+        for row, col in ai_targeted_coordinates or ():
+            targeted |= 1 << (row * size + col)
+    return GameState(size,
+                     (_capture_player(boards[0], ships[0]), _capture_player(boards[1], ships[1])),
+                     tuple(game.player_hits) if game is not None else (0, 0),
+                     players.player_num if players is not None else 1,
+                     frozen_ai, targeted)
+
+# The independent objects `restore_state` builds from a snapshot.
+RestoredGame = namedtuple('RestoredGame', ['boards', 'ships', 'player_hits', 'player_num', 'ai_state',
+                                           'ai_targeted_coordinates'])
+
+def _restore_player(player_num, state, player, board_class):
+    board = board_class(player_num, state.size)
+    ships = Ships(player_num)
+    ships.set_fleet(player.lengths)
+    ships.load_types()
+    # Each placed ship takes the id of the first ship of its length in the fleet that is not on the board yet, so
+    # the ids on the board and the counters in `Ships` agree, and in the standard fleet (where ship i has length i)
+    # every ship keeps its id. Ships of the same length are interchangeable, as the shots are replayed below.
+    free_ids = {}
+    for ship_id, length in enumerate(player.lengths, 1):
+        free_ids.setdefault(length, []).append(ship_id)
+    for length, orientation, row, col in player.placements:
+        board.add_ship(placement_at(row, col, length, orientation, state.size), free_ids[length].pop(0))
+    # Replay the shots, so every counter the board and ships keep comes out as it was
+    for index in _mask_indices(player.hits | player.misses):
+        board.replay_shot(index, ships)
+    return board, ships
+
+# Build fresh boards (of `board_class`), ships, counters and AI state from a snapshot.
+# Nothing is shared with the snapshot or with other restores, so each restore can be played on independently.
+def restore_state(state, board_class=Board):
+    board_1, ships_1 = _restore_player(1, state, state.players[0], board_class)
+    board_2, ships_2 = _restore_player(2, state, state.players[1], board_class)
+    ai_state = None
+    pool = None
+    if state.ai_state is not None:
+        ai_state = dict(zip(AI_STATE_KEYS, state.ai_state))
+        ai_state['directions_tried'] = list(ai_state['directions_tried'])
+        pool = ShotPool(state.size)
+        for index in _mask_indices(state.ai_targeted):
+            pool.add(divmod(index, state.size))
+    return RestoredGame([board_1, board_2], [ships_1, ships_2], list(state.player_hits), state.player_num,
+                        ai_state, pool)
+
+# Fork a snapshot with one shot fired by `player` (0 or 1) at cell `index` of the opponent's board.
+# Returns (new snapshot, fire_result) with the codes of `Board.fire`: 0 for a miss (or a cell already fired at),
+# 1 for a hit and 2 for a sunk ship. Only the opponent's shot masks change; turns, airstrike counters and the
+# AI's state are left to the caller.
+def apply_shot(state, player, index):
+    target = state.players[1 - player]
+    bit = 1 << index
+    if (target.hits | target.misses) & bit:
+        return state, 0
+    fire_result = 0
+    for mask in target.ship_masks:
+        if mask & bit:
+            hits = target.hits | bit
+            target = target._replace(hits=hits)
+            fire_result = 2 if not mask & ~hits else 1
+            break
+    else:
+        target = target._replace(misses=target.misses | bit)
+    players = (state.players[0], target) if player == 0 else (target, state.players[1])
+    return state._replace(players=players), fire_result
+
+# Whether every ship `player` (0 or 1) has placed has been sunk.
+def fleet_sunk(state, player):
+    target = state.players[player]
+    return all(not mask & ~target.hits for mask in target.ship_masks)
+
+# Cells of the AI's state as cell indices, with -1 for none.
+def _cell_code(cell, size):
+    return -1 if cell is None else cell[0] * size + cell[1]
+
+def _code_cell(code, size):
+    return None if code < 0 else divmod(code, size)
+
+# Serialize a snapshot to bytes.
+def encode_state(state):
+    mask_bytes = (state.size * state.size + 7) // 8
+    parts = [_HEADER.pack(VERSION, state.size, state.player_num, state.player_hits[0], state.player_hits[1],
+                          1 if state.ai_state is not None else 0)]
+    for player in state.players:
+        parts.append(struct.pack('<H', len(player.lengths)) + bytes(player.lengths))
+        parts.append(struct.pack('<H', len(player.placements)))
+        for length, orientation, row, col in player.placements:
+            parts.append(_PLACEMENT.pack(length, 0 if orientation == 'h' else 1, row, col))
+        parts.append(player.hits.to_bytes(mask_bytes, 'little'))
+        parts.append(player.misses.to_bytes(mask_bytes, 'little'))
+    if state.ai_state is not None:
+        ai = dict(zip(AI_STATE_KEYS, state.ai_state))
+        tried = 0
+        for position, direction in enumerate(ai['directions_tried']):
+            tried |= DIRECTIONS.index(direction) << (2 * position)
+        parts.append(state.ai_targeted.to_bytes(mask_bytes, 'little'))
+        parts.append(_AI.pack(1 if ai['target_mode'] else 0,
+                              4 if ai['direction'] is None else DIRECTIONS.index(ai['direction']),
+                              len(ai['directions_tried']), tried, ai['steps_in_current_direction'],
+                              _cell_code(ai['last_hit'], state.size), _cell_code(ai['initial_hit'], state.size)))
+    return b"".join(parts)
+
+# Rebuild a snapshot from the bytes written by `encode_state`.
+def decode_state(data):
+    version, size, player_num, hits_0, hits_1, flags = _HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError("Unsupported game state version " + str(version) + ".")
+    mask_bytes = (size * size + 7) // 8
+    offset = _HEADER.size
+    players = []
+    for _ in range(2):
+        (count,) = struct.unpack_from('<H', data, offset)
+        lengths = tuple(data[offset + 2:offset + 2 + count])
+        offset += 2 + count
+        (count,) = struct.unpack_from('<H', data, offset)
+        offset += 2
+        placements = []
+        ship_masks = []
+        for _ in range(count):
+            length, orientation, row, col = _PLACEMENT.unpack_from(data, offset)
+            offset += _PLACEMENT.size
+            orientation = 'h' if orientation == 0 else 'v'
+            placements.append((length, orientation, row, col))
+            ship_masks.append(_placement_mask(placement_at(row, col, length, orientation, size).cells, size))
+        hits = int.from_bytes(data[offset:offset + mask_bytes], 'little')
+        misses = int.from_bytes(data[offset + mask_bytes:offset + 2 * mask_bytes], 'little')
+        offset += 2 * mask_bytes
+        players.append(PlayerState(lengths, tuple(placements), tuple(ship_masks), hits, misses))
+
+    ai_state = None
+    targeted = None
+    if flags & 1:
+        targeted = int.from_bytes(data[offset:offset + mask_bytes], 'little')
+        offset += mask_bytes
+        target_mode, direction, tried_count, tried, steps, last_hit, initial_hit = _AI.unpack_from(data, offset)
+        ai = {
+            'last_hit': _code_cell(last_hit, size),
+            'target_mode': bool(target_mode),
+            'directions_tried': tuple(DIRECTIONS[tried >> (2 * position) & 3] for position in range(tried_count)),
+            'direction': None if direction == 4 else DIRECTIONS[direction],
+            'steps_in_current_direction': steps,
+            'initial_hit': _code_cell(initial_hit, size)
+        }
+        ai_state = tuple(ai[key] for key in AI_STATE_KEYS)
+    return GameState(size, tuple(players), (hits_0, hits_1), player_num, ai_state, targeted)
@@ -0,0 +1,211 @@
+# Load generator for the game server in `server.py`.
+# It starts a server on localhost (or uses one that is already running with --port) and opens N concurrent client
+# connections. Every client plays complete games against the server's AI for a fixed duration, using the same
+# AI functions as the rest of the game as its brain: `ai_place_ships` lays out its fleet and `ai_fire_easy` or
+# `ai_fire_medium` picks its shots. At the end it reports sustained games per second, per-command latency
+# percentiles and error counts.
+#
+# Example: python load_test.py --clients 500 --duration 30 --brain medium --opponent easy
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from board import Board
+from ships import Ships
+from ai import ShotPool, ai_place_ships, ai_fire_easy, ai_fire_medium, new_ai_state, update_ai_state
+from utilities import COORDINATES, CELL_ROW_COL
+
+# Firing strategies a client can use, named like the shooters in `simulation.py`
+BRAINS = ('easy', 'medium')
+
+# Reply words for the results of a shot, as sent by the server
+FIRE_RESULTS = {'MISS': 0, 'HIT': 1, 'SUNK': 2}
+
+# Latency samples and error counts shared by every client.
+class LoadStats:
+    def __init__(self):
+        self.latencies = {}  # Command -> list of seconds from sending it to receiving its reply
+        self.errors = {}  # Kind of error -> count
+        self.games = 0  # Games played to the end
+        self.wins = 0  # Games the clients won
+
+    def record(self, command, seconds):
+        self.latencies.setdefault(command, []).append(seconds)
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    # Latency percentiles for one command in milliseconds.
+    def percentiles(self, command):
+        samples = sorted(self.latencies[command])
+        def at(percent):
+            return samples[min(len(samples) - 1, int(percent / 100 * len(samples)))] * 1000
+        return {'count': len(samples), 'p50': at(50), 'p90': at(90), 'p99': at(99), 'max': samples[-1] * 1000}
+
+# One simulated player connected to the server.
+class LoadClient:
+    def __init__(self, stats, brain, opponent, num_ships):
+        self.stats = stats
+        self.brain = brain
+        self.opponent = opponent
+        self.num_ships = num_ships
+        self.reader = None
+        self.writer = None
+
+    # Send a command and return its reply line, timing the round trip.
+    async def request(self, line):
+        name = line.split()[0]
+        start = time.perf_counter()
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+        reply = await self.read_line()
+        self.stats.record(name, time.perf_counter() - start)
+        if reply.startswith("ERR"):
+            self.stats.error(name + " " + reply)
+        return reply
+
+    async def read_line(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection.")
+        return line.decode().rstrip("\n")
+
+    # Play one game against the server's AI. Returns True if this client won.
+    async def play_game(self):
+        reply = await self.request(f"NEW AI {self.opponent} {self.num_ships}")
+        if not reply.startswith("OK"):
+            raise ConnectionError(reply)
+
+        # Lay out the fleet locally with the AI placement, then send each ship to the server
+        board = Board(1)
+        ships = Ships(1)
+        ships.set_num_ships(self.num_ships)
+        ships.load_types()
+        ai_place_ships(board, ships)
+        for placement in board.placements:
+            coordinate = COORDINATES[placement.row * 10 + placement.col]
+            await self.request(f"PLACE {placement.length} {placement.orientation} {coordinate}")
+        await self.read_line()  # EVENT START TURN 1
+
+        fleet_segments = self.num_ships * (self.num_ships + 1) // 2
+        hits_made = 0  # Segments of the server's fleet this client has hit
+        hits_taken = 0  # Segments of this client's fleet the server's AI has hit
+        targeted = ShotPool()
+        ai_state = new_ai_state()
+        while True:
+            if self.brain == 'easy':
+                index = ai_fire_easy(None, targeted)
+            else:
+                index = ai_fire_medium(None, ai_state, targeted)
+            reply = (await self.request("FIRE " + COORDINATES[index])).split()
+            if reply[0] != "OK":
+                return False
+            fire_result = FIRE_RESULTS[reply[1]]
+            row, col = CELL_ROW_COL[index]
+            update_ai_state(ai_state, fire_result, row, col)
+            if fire_result:
+                hits_made += 1
+
+            if len(reply) > 2 and hits_made < fleet_segments:  # "OK HIT AIRSTRIKE": strike the row of this hit
+                strike = (await self.request(f"AIRSTRIKE {row + 1}")).split()
+                hits_made += int(strike[2])
+                for strike_col in range(10):
+                    targeted.add((row, strike_col))  # The whole row has been fired at now
+
+            # The reply is followed by the AI's answer (unless this client just won) and, at the end, the winner
+            if hits_made < fleet_segments:
+                event = (await self.read_line()).split()  # EVENT OPPONENT FIRE <coordinate> <result>
+                if event[-1] != "MISS":
+                    hits_taken += 1
+            if hits_made >= fleet_segments or hits_taken >= fleet_segments:
+                await self.read_line()  # EVENT WIN PLAYER n
+                return hits_made >= fleet_segments
+
+    # Play games until `deadline` (a `time.perf_counter` value); games under way at the deadline are finished.
+    async def run(self, host, port, deadline):
+        try:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+            await self.read_line()  # WELCOME
+            while time.perf_counter() < deadline:
+                won = await self.play_game()
+                self.stats.games += 1
+                self.stats.wins += won
+            self.writer.write(b"QUIT\n")
+            await self.writer.drain()
+        except (ConnectionError, OSError) as e:
+            self.stats.error("connection " + type(e).__name__)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+# Start `server.py` on a free port in a child process and return (process, port).
+def start_server(session_dir):
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, os.path.join(here, 'server.py'), '--port', '0',
+                                '--sessions', session_dir], stdout=subprocess.PIPE, text=True, cwd=here)
+    banner = process.stdout.readline()  # "Serving Battleship on ('127.0.0.1', port)"
+    if not banner:
+        raise RuntimeError("The server did not start.")
+    port = int(banner.rsplit(',', 1)[1].strip(" )\n"))
+    return process, port
+
+async def run_load(host, port, clients, duration, brain, opponent, num_ships):
+    stats = LoadStats()
+    deadline = time.perf_counter() + duration
+    workers = [LoadClient(stats, brain, opponent, num_ships) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker.run(host, port, deadline) for worker in workers))
+    return stats, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the Battleship server with simulated clients.")
+    parser.add_argument('--clients', type=int, default=100, help="concurrent client connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to keep starting new games")
+    parser.add_argument('--brain', choices=BRAINS, default='medium', help="firing strategy of the clients")
+    parser.add_argument('--opponent', default='easy', help="AI difficulty the server plays with")
+    parser.add_argument('--ships', type=int, default=5, help="ships per fleet")
+    parser.add_argument('--port', type=int, help="use a server already running on this port")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    process = None
+    session_dir = None
+    port = args.port
+    if port is None:
+        session_dir = tempfile.TemporaryDirectory()
+        process, port = start_server(session_dir.name)
+    try:
+        stats, elapsed = asyncio.run(run_load('127.0.0.1', port, args.clients, args.duration, args.brain,
+                                              args.opponent, args.ships))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            session_dir.cleanup()
+
+    print(f"{args.clients} clients, {stats.games} games in {elapsed:.1f}s: {stats.games / elapsed:.1f} games/s, "
+          f"clients won {stats.wins / stats.games * 100 if stats.games else 0:.1f}%")
+    results = {'clients': args.clients, 'games': stats.games, 'seconds': elapsed,
+               'games_per_sec': stats.games / elapsed, 'latency_ms': {}, 'errors': stats.errors}
+    for command in sorted(stats.latencies):
+        summary = stats.percentiles(command)
+        results['latency_ms'][command] = summary
+        print(f"  {command:10} {summary['count']:8} requests  p50 {summary['p50']:7.2f} ms  p90 {summary['p90']:7.2f} ms"
+              f"  p99 {summary['p99']:7.2f} ms  max {summary['max']:7.2f} ms")
+    print(f"  errors: {sum(stats.errors.values())}")
+    for kind, count in sorted(stats.errors.items()):
+        print(f"    {count:6}  {kind}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print("Results saved to " + args.output)
+
+if __name__ == '__main__':
+    main()
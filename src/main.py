@@ -3,20 +3,28 @@
 # The `Ships` class handles the logic for creating, placing, and tracking ships.
 # The `SwitchPlayers` class is responsible for switching between the two players.
 # The `Game` class encapsulates the overall game logic, including the flow of turns and checking for game-over conditions.
-# The AI functions (`ai_place_ships`, `ai_fire_easy`, `ai_fire_medium`, `ai_fire_hard`) are used to control the AI's behavior at different difficulty levels.
-# The `coordinate_to_indices` utility function helps convert human-readable coordinates (e.g., "A5") to board indices.
+# `ai_place_ships` places the AI's ships, and the `SHOOTERS` registry from `simulation.py` picks the AI's shots at each difficulty level (timed in the engine metrics like in simulations).
+# The `COORDINATES` and `CELL_ROW_COL` tables turn the cell index an AI fires at into a human-readable coordinate (e.g., "A5") and board indices.
+# The `ReplayWriter` class records the game to a compact binary replay log when a file name is given on the command line.
+
+import sys
 
 from board import Board
 from ships import Ships
 from switch_players import SwitchPlayers
 from game import Game
-from ai import ai_place_ships, ai_fire_easy, ai_fire_medium, ai_fire_hard
-from utilities import coordinate_to_indices
+from ai import ShotPool, ai_place_ships, new_ai_state, update_ai_state
+from simulation import SHOOTERS
+from utilities import COORDINATES, CELL_ROW_COL
+from replay import ReplayWriter
 
 # Player identifiers for distinguishing between player 1 and player 2
 player1 = 1
 player2 = 2
 
+# Names in `SHOOTERS` of the AI difficulty levels offered in the menu, in menu order (1 = Easy ... 5 = Master)
+AI_DIFFICULTIES = ('easy', 'medium', 'hard', 'probability', 'monte_carlo')
+
 # This function displays the title screen of the Battleship game to the player.
 # It provides a brief welcome message and prompts the user to choose between two game modes:
 # 1. Player vs Player (PvP) where both players are human.
@@ -42,28 +50,42 @@ def display_title_screen():
             print("Invalid input. Please enter 1 or 2.")  # Notify the user if input is invalid
     return choice  # Return the user's choice of game mode
 
+# This function asks two human players whether they want to play the salvo variant, where each turn is one volley
+# of shots (one for every ship the player still has afloat) instead of single shots and airstrikes.
+# It returns True for the salvo variant and False for the standard game.
+def choose_salvo_variant():
+    while True:
+        answer = input("Play the salvo variant (one shot per ship afloat each turn)? (y/n): ").strip().lower()
+        if answer in ['y', 'n']:  # Ensure input is either y or n
+            return answer == 'y'
+        print("Invalid input. Please enter y or n.")  # Notify the user if input is invalid
+
 # This function prompts the user to choose the difficulty level of the AI opponent.
-# It offers three difficulty levels:
+# It offers five difficulty levels:
 # 1. Easy: AI fires randomly without strategy.
 # 2. Medium: AI starts targeting intelligently after a hit, but with basic logic.
 # 3. Hard: AI uses advanced strategy to predict ship placements.
-# Like the game mode selection, the function ensures that the user input is valid (either 1, 2, or 3).
+# 4. Expert: AI fires at the cell most likely to hold a ship, based only on what it has seen.
+# 5. Master: AI samples whole fleet layouts that match what it has seen and fires where ships turn up most often.
+# Like the game mode selection, the function ensures that the user input is valid (1 to 5).
 def choose_ai_difficulty():
     print("\nChoose AI Difficulty Level:")
     print("1. Easy")
     print("2. Medium")
-    print("3. Hard\n")
+    print("3. Hard")
+    print("4. Expert")
+    print("5. Master\n")
     
-    # Loop until the user provides valid input (1, 2, or 3). If the input is invalid,
+    # Loop until the user provides valid input (1 to 5). If the input is invalid,
     # the function prompts the user again until a valid difficulty level is selected.
     while True:
         try:
-            difficulty = int(input("Enter your choice (1, 2, or 3): "))
-            if difficulty not in [1, 2, 3]:  # Ensure input is either 1, 2, or 3
+            difficulty = int(input("Enter your choice (1, 2, 3, 4, or 5): "))
+            if difficulty not in [1, 2, 3, 4, 5]:  # Ensure input is between 1 and 5
                 raise ValueError
             break
         except ValueError:
-            print("Invalid input. Please enter 1, 2, or 3.")  # Notify the user if input is invalid
+            print("Invalid input. Please enter 1, 2, 3, 4, or 5.")  # Notify the user if input is invalid
     return difficulty  # Return the selected difficulty level
 
 # The main program execution begins here.
@@ -89,7 +111,9 @@ if __name__ == '__main__':
 
     # Setup phase for Player vs Player or Player vs AI based on the selected game mode.
     # If the game mode is 1 (PvP), both players will manually place their ships.
+    salvo = False  # Whether the players fire salvos instead of single shots (PvP only)
     if game_mode == 1:
+        salvo = choose_salvo_variant()
         # Player 1 sets up their ships by placing them on their board.
         startGame.game_setup(0)
         # Player 2 sets up their ships next.
@@ -112,24 +136,25 @@ if __name__ == '__main__':
         # End the player's turn after setup to allow AI to begin its turn in the game loop.
         currentplayer.end_turn()
     
+    # If a file name was given on the command line (e.g., `python main.py game.bsr`), record the game to it
+    # as a binary replay log once both fleets are placed. Salvo games are not recorded, as a replay log holds one shot per turn.
+    replay_file = None
+    if len(sys.argv) > 1 and salvo:
+        print("Salvo games are not recorded; playing without a replay log.")
+    elif len(sys.argv) > 1:
+        replay_file = open(sys.argv[1], 'wb')
+        startGame.replay = ReplayWriter(replay_file)
+        startGame.replay.write_header(boards)
+
     # Initialize game variables for tracking the state of the game and AI.
     gameOver = False  # Boolean flag indicating if the game has ended
     last_hit = None   # Tracks the last hit made by a player
     previous_hits = []  # List to track previous hit coordinates
-    ai_targeted_coordinates = set()  # A set to track the coordinates that the AI has already targeted, preventing repeated shots.
+    ai_targeted_coordinates = ShotPool()  # Tracks the coordinates that the AI has already targeted, preventing repeated shots.
     
     # Initialize the AI state for medium and hard difficulty modes. The AI will use this state to intelligently 
-    # select which coordinate to fire at based on previous hits and misses. The `target_mode` flag indicates whether
-    # the AI is currently trying to sink a ship after a successful hit. Other parameters like `directions_tried` and 
-    # `steps_in_current_direction` help the AI navigate around a hit ship to find the rest of it.
-    ai_state = {
-        'last_hit': None,
-        'target_mode': False,  # Whether AI is actively targeting after a hit
-        'directions_tried': [],  # Tracks directions AI has already tried
-        'direction': None,  # The direction in which AI is currently firing
-        'steps_in_current_direction': 0,  # How many steps the AI has taken in the current direction
-        'initial_hit': None  # Stores the first hit's coordinates to help AI retrace its strategy if needed
-    }
+    # select which coordinate to fire at based on previous hits and misses.
+    ai_state = new_ai_state()
     
     # Main game loop. The game continues until one player or the AI sinks all the opponent's ships, 
     # which triggers the game over condition.
@@ -145,56 +170,37 @@ if __name__ == '__main__':
         if game_mode == 1 or (game_mode == 2 and currentplayer.player_num == 1):
             boards[current_board_index].display_board()  # Display the current player's board.
             
-            # The player takes their turn using the `take_turn()` method from the `Game` class.
-            # This method handles input, firing at the opponent's board, and determining if the game is over.
-            gameOver = startGame.take_turn(current_board_index)
+            # The player takes their turn using the `take_turn()` method from the `Game` class, or `take_salvo_turn()`
+            # in the salvo variant. These methods handle input, firing at the opponent's board, and determining if the game is over.
+            if salvo:
+                gameOver = startGame.take_salvo_turn(current_board_index)
+            else:
+                gameOver = startGame.take_turn(current_board_index)
             if gameOver:
                 break  # Exit the game loop if the game is over.
             currentplayer.end_turn()  # End the player's turn after firing.
 
         else:
             # If it's the AI's turn (Player vs AI mode), the AI will fire at the human player's board.
-            if ai_difficulty == 1:
-                # Easy difficulty: AI randomly selects a coordinate to fire at, without any strategic logic.
-                ai_coordinate = ai_fire_easy(boards[0], ai_targeted_coordinates)  # Track AI's fired coordinates to avoid duplicates.
-            elif ai_difficulty == 2:
-                # Medium difficulty: AI uses basic strategy after hitting a ship. It targets adjacent coordinates intelligently.
-                ai_coordinate = ai_fire_medium(boards[0], ai_state, ai_targeted_coordinates)
-            elif ai_difficulty == 3:
-                # Hard difficulty: AI uses advanced algorithms to predict and fire at ship placements.
-                ai_coordinate = ai_fire_hard(boards[0])
+            # The shooter for the chosen difficulty picks the cell; it tracks the AI's fired coordinates to avoid duplicates.
+            shooter = SHOOTERS[AI_DIFFICULTIES[ai_difficulty - 1]]
+            ai_index = shooter(boards[0], ships[0], ai_state, ai_targeted_coordinates)
 
-            # AI fires at the chosen coordinate and the result of the shot is processed.
-            print(f"AI fires at {ai_coordinate}")
-            fire_result = boards[0].fire(ai_coordinate, ships[0])  # `fire()` returns the result of the AI's shot (miss, hit, or sink).
-            row, col = coordinate_to_indices(ai_coordinate)  # Convert the AI's coordinate to board indices.
+            # AI fires at the chosen cell and the result of the shot is processed.
+            print(f"AI fires at {COORDINATES[ai_index]}")
+            fire_result = boards[0].fire_index(ai_index, ships[0])  # `fire_index()` returns the result of the AI's shot (miss, hit, or sink).
+            row, col = CELL_ROW_COL[ai_index]  # Convert the AI's cell index to board indices.
+            if startGame.replay is not None:
+                startGame.replay.record_shot(row, col, fire_result)  # Record the AI's shot in the replay log.
+            update_ai_state(ai_state, fire_result, row, col)  # Let the AI update its targeting state from the result.
             
             # AI shot result handling based on the fire result.
             # If AI misses, the targeting mode is reset (if applicable), and the turn ends.
             if fire_result == 0:  # Missed shot
                 print("AI missed!")
-                if ai_state['target_mode']:
-                    # If AI was in targeting mode, reset the targeting direction and stop tracking hits in the current direction.
-                    ai_state['direction'] = None
-                    ai_state['steps_in_current_direction'] = 0
-                else:
-                    # If not in targeting mode, reset the last hit and targeting state.
-                    ai_state['last_hit'] = None
-                    ai_state['target_mode'] = False
                 currentplayer.end_turn()  # End the AI's turn after a miss.
             elif fire_result == 1:  # Hit shot
                 print("AI hit your ship!")
-                # If AI was not already in targeting mode, enter targeting mode and start tracking the hit.
-                if not ai_state['target_mode']:
-                    ai_state['target_mode'] = True
-                    ai_state['last_hit'] = (row, col)  # Update last hit coordinates for AI's strategy.
-                    ai_state['initial_hit'] = (row, col)  # Record the initial hit to return if needed.
-                    ai_state['directions_tried'] = []  # Reset directions tried for targeting.
-                    ai_state['direction'] = None  # Reset current direction for AI's firing.
-                    ai_state['steps_in_current_direction'] = 0  # Reset steps in current direction.
-                else:
-                    # Update the last hit if already in targeting mode.
-                    ai_state['last_hit'] = (row, col)
                 # Check if the human player has lost the game after the AI's hit.
                 if boards[0].game_over():
                     print("GAME OVER: AI wins!")  # If the AI sinks all ships, declare the AI as the winner.
@@ -203,15 +209,12 @@ if __name__ == '__main__':
                 currentplayer.end_turn()  # AI ends turn after a successful hit.
             elif fire_result == 2:  # AI sunk a ship
                 print("AI sunk your ship!")
-                # If AI sinks a ship, reset targeting mode and stop tracking hits.
                 if boards[0].game_over():
                     print("GAME OVER: AI wins!")  # Declare the AI as the winner if all ships are sunk.
                     gameOver = True
                     break  # Exit the game loop.
-                ai_state['target_mode'] = False  # Reset AI targeting mode.
-                ai_state['last_hit'] = None  # Reset last hit coordinates.
-                ai_state['initial_hit'] = None  # Reset initial hit.
-                ai_state['directions_tried'] = []  # Clear the list of tried directions.
-                ai_state['direction'] = None  # Reset current direction.
-                ai_state['steps_in_current_direction'] = 0  # Reset steps in current direction.
                 currentplayer.end_turn()  # End the AI's turn after sinking a ship.
+
+    # Close the replay log once the game is over.
+    if replay_file is not None:
+        replay_file.close()
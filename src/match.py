@@ -0,0 +1,170 @@
+# One Battleship match as a plain object, without any terminal input or output.
+# The interactive game drives `Board`, `Ships` and `Game` through `input()` and `print()`; a `Match` exposes the
+# same rules as methods that take the player's move and return its outcome, so a server can host many matches
+# at once and feed them moves as they arrive. Invalid moves raise a ValueError with a message for the player.
+#
+# The rules follow `Game.take_turn` and the AI branch of `main.py`: every shot ends the turn, a player who has
+# landed 3 hits earns an airstrike that must be used before the turn passes, and the AI never gets airstrikes.
+
+import time
+
+from board import Board
+from ships import Ships
+from ai import ShotPool, ai_place_ships, new_ai_state, update_ai_state
+from simulation import SHOOTERS
+from utilities import CELL_INDEX, CELL_ROW_COL, COORDINATES
+
+# Match phases
+SETUP = 'setup'  # Players are placing their fleets
+PLAYING = 'playing'  # Shots are being fired
+OVER = 'over'  # One fleet has been sunk
+
+# Hits needed to earn an airstrike, like `Game.check_airstrike`
+AIRSTRIKE_HITS = 3
+
+# Turn a coordinate such as "A5" into 0-based board indices, or raise a ValueError for the player.
+def parse_coordinate(coordinate):
+    index = CELL_INDEX.get(coordinate.strip().upper())
+    if index is None:
+        raise ValueError("Invalid coordinate! Please enter a valid coordinate (e.g., A5 or A10).")
+    return CELL_ROW_COL[index]
+
+# Format 0-based board indices as a coordinate such as "A5".
+def format_coordinate(row, col):
+    return COORDINATES[row * 10 + col]
+
+class Match:
+    # Create a match with a fleet of `num_ships` ships (1-5) per player.
+    # `ai` is the name of a shooter from `simulation.SHOOTERS` for a match against the AI, which plays as player 2
+    # and places its fleet straight away; None means two human players.
+    def __init__(self, match_id, ai=None, num_ships=5, board_class=Board):
+        if ai is not None and ai not in SHOOTERS:
+            raise ValueError("Unknown AI difficulty: " + str(ai) + ".")
+        if not 1 <= num_ships <= 5:
+            raise ValueError("Invalid number of ships.")
+        self.match_id = match_id
+        self.ai = ai
+        self.boards = [board_class(1), board_class(2)]
+        self.ships = [Ships(1), Ships(2)]
+        for ships in self.ships:
+            ships.set_num_ships(num_ships)
+            ships.load_types()
+        self.unplaced = [list(range(1, num_ships + 1)), list(range(1, num_ships + 1))]  # Ship sizes still to place
+        self.phase = SETUP
+        self.turn = 0  # Index of the player whose turn it is (player 1 fires first)
+        self.player_hits = [0, 0]  # Hits towards the next airstrike, like `Game.player_hits`
+        self.airstrike_ready = False  # Whether the current player must now use an airstrike
+        self.winner = None  # Index of the winning player once the match is over
+        self.last_active = time.monotonic()  # When the match last received a move
+
+        if ai is not None:
+            self.ai_state = new_ai_state()
+            self.ai_targeted_coordinates = ShotPool()
+            ai_place_ships(self.boards[1], self.ships[1])
+            self.unplaced[1] = []
+
+    # Place one of `player`'s ships of the given size with its upper leftmost cell at `coordinate`.
+    # The match starts once both fleets are complete; this returns True when that happens.
+    def place(self, player, size, orientation, coordinate):
+        if self.phase != SETUP:
+            raise ValueError("Ships can only be placed before the first shot.")
+        if size not in self.unplaced[player]:
+            raise ValueError("No ship of size " + str(size) + " left to place.")
+        orientation = orientation.strip().lower()
+        if orientation not in ('h', 'v'):
+            raise ValueError("Enter 'h' for horizontal or 'v' for vertical.")
+        row, col = parse_coordinate(coordinate)
+
+        placement = self.boards[player].check_placement(row, col, size, orientation)
+        self.boards[player].add_ship(placement)
+        self.unplaced[player].remove(size)
+        self.last_active = time.monotonic()
+
+        if not self.unplaced[0] and not self.unplaced[1]:
+            self.phase = PLAYING
+            return True
+        return False
+
+    # Check that `player` may make a move now.
+    def _check_turn(self, player):
+        if self.phase == SETUP:
+            raise ValueError("Both fleets must be placed first.")
+        if self.phase == OVER:
+            raise ValueError("The game is over.")
+        if player != self.turn:
+            raise ValueError("It is not your turn.")
+
+    # Fire one of `player`'s shots at the opponent's board.
+    # Returns 0 for a miss, 1 for a hit and 2 for a sunk ship, like `Board.fire`. Afterwards the turn passes
+    # to the opponent unless the player has won or earned an airstrike (see `airstrike_ready`).
+    def fire(self, player, coordinate):
+        self._check_turn(player)
+        if self.airstrike_ready:
+            raise ValueError("You have earned an airstrike! Choose a row (1-10) to fire at.")
+        row, col = parse_coordinate(coordinate)
+        opponent = 1 - player
+        board = self.boards[opponent]
+        if board.board[row][col] in ("X", "."):
+            raise ValueError("You already targeted this location.")
+
+        fire_result = board.fire_index(row * 10 + col, self.ships[opponent])
+        self.last_active = time.monotonic()
+        if fire_result != 0:
+            self.player_hits[player] += 1
+            if board.game_over():
+                self._finish(player)
+                return fire_result
+            if self.player_hits[player] >= AIRSTRIKE_HITS:
+                self.airstrike_ready = True
+                return fire_result
+        self.turn = opponent
+        return fire_result
+
+    # Use the airstrike `player` has earned on a row (0-based) of the opponent's board and return the number of hits.
+    def airstrike(self, player, row):
+        self._check_turn(player)
+        if not self.airstrike_ready:
+            raise ValueError("You have not earned an airstrike.")
+        if not 0 <= row < 10:
+            raise ValueError("Row must be between 1 and 10.")
+        opponent = 1 - player
+        hits = self.boards[opponent].perform_airstrike(row, self.ships[opponent])
+        self.airstrike_ready = False
+        self.player_hits[player] = 0
+        self.last_active = time.monotonic()
+        if self.boards[opponent].game_over():
+            self._finish(player)
+        else:
+            self.turn = opponent
+        return hits
+
+    # Let the AI (player 2) fire if it is its turn. Returns (row, col, fire_result), or None if the AI does not move.
+    def ai_turn(self):
+        if self.ai is None or self.phase != PLAYING or self.turn != 1:
+            return None
+        index = SHOOTERS[self.ai](self.boards[0], self.ships[0], self.ai_state, self.ai_targeted_coordinates)
+        fire_result = self.boards[0].fire_index(index, self.ships[0])
+        row, col = CELL_ROW_COL[index]
+        update_ai_state(self.ai_state, fire_result, row, col)
+        if self.boards[0].game_over():
+            self._finish(1)
+        else:
+            self.turn = 0
+        return row, col, fire_result
+
+    def _finish(self, player):
+        self.phase = OVER
+        self.winner = player
+        self.airstrike_ready = False
+
+    # Text view of the match for `player`: their own board with ships shown, then the opponent's board with
+    # ships hidden, in the same symbols as `Board.display_board` and `Board.display_opponent_board`.
+    def render(self, player):
+        header = "   " + " ".join(chr(ord('A') + i) for i in range(10))
+        lines = ["Here is your board: ", header]
+        for i, row in enumerate(self.boards[player].board):
+            lines.append(f"{i + 1:2} " + " ".join("O" if isinstance(cell, int) else cell for cell in row))
+        lines += ["Here is your opponent's board: ", header]
+        for i, row in enumerate(self.boards[1 - player].board):
+            lines.append(f"{i + 1:2} " + " ".join("~" if isinstance(cell, int) else cell for cell in row))
+        return lines
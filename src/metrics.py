@@ -0,0 +1,148 @@
+# Built-in instrumentation for the engine's hot paths.
+# `METRICS` collects counters (shots, hits, sinks, airstrikes, placement retries, rejected AI draws, ...) and
+# histograms (latency of every shot and AI decision, recursion depth of the medium AI) for the whole process.
+# It is off by default: instrumented code checks `METRICS.enabled` before doing anything else, so a disabled
+# build pays one attribute test per call. Call `METRICS.enable()` to start collecting, then export what was
+# collected with `to_json` or `to_prometheus`, or hand `to_dict` to another process and `merge` it there
+# (the tournament runner does this for its workers).
+#
+# Metric names follow Prometheus conventions (`_total` for counters, base units such as seconds) and may carry
+# labels, e.g. METRICS.observe('ai_decision_seconds', 0.001, ai='medium').
+
+import json
+from bisect import bisect_left
+
+# Prefix for every metric name in the Prometheus export
+NAMESPACE = 'battleship'
+
+# Upper bounds of the latency histogram buckets, in seconds (1 microsecond to 1 second)
+LATENCY_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Upper bounds of the buckets for small whole-number measurements, such as recursion depth
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+
+# Counts of observations that fell into each bucket, plus their sum and number.
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)  # Upper bound of each bucket; one more bucket holds everything above
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # Number of observations at or below each bucket's upper bound, ending with the total ("+Inf").
+    def cumulative(self):
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+# Turn keyword labels into a hashable, ordered key part.
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+# Format a metric name and its labels the Prometheus way: name{label="value",...}
+def _series(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+# Format a bucket bound for the `le` label.
+def _bound(value):
+    return "+Inf" if value == float('inf') else repr(float(value))
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False  # Checked by every instrumented call before it records anything
+        self.counters = {}  # (name, labels) -> count
+        self.histograms = {}  # (name, labels) -> Histogram
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    # Forget everything collected so far.
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    # Add `amount` to a counter.
+    def count(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    # Record one observation in a histogram, created with `buckets` on first use.
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, _label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    # Everything collected, as plain lists and numbers that survive JSON and pickling.
+    def to_dict(self):
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels), 'buckets': list(histogram.buckets),
+                            'counts': list(histogram.counts), 'sum': histogram.sum, 'count': histogram.count}
+                           for (name, labels), histogram in sorted(self.histograms.items())]
+        }
+
+    # Add the metrics from another process's `to_dict` to these.
+    def merge(self, data):
+        for counter in data['counters']:
+            self.count(counter['name'], counter['value'], **counter['labels'])
+        for entry in data['histograms']:
+            key = (entry['name'], _label_key(entry['labels']))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(entry['buckets'])
+            if list(histogram.buckets) != list(entry['buckets']):
+                raise ValueError("Cannot merge histograms with different buckets: " + entry['name'] + ".")
+            for i, count in enumerate(entry['counts']):
+                histogram.counts[i] += count
+            histogram.sum += entry['sum']
+            histogram.count += entry['count']
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    # Everything collected in the Prometheus text exposition format.
+    def to_prometheus(self):
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            full_name = NAMESPACE + '_' + name
+            if full_name not in typed:
+                lines.append(f"# TYPE {full_name} counter")
+                typed.add(full_name)
+            lines.append(f"{_series(full_name, labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            full_name = NAMESPACE + '_' + name
+            if full_name not in typed:
+                lines.append(f"# TYPE {full_name} histogram")
+                typed.add(full_name)
+            for bound, seen in zip(histogram.buckets + (float('inf'),), histogram.cumulative()):
+                lines.append(f"{_series(full_name + '_bucket', labels, [('le', _bound(bound))])} {seen}")
+            lines.append(f"{_series(full_name + '_sum', labels)} {histogram.sum!r}")
+            lines.append(f"{_series(full_name + '_count', labels)} {histogram.count}")
+        return "".join(line + "\n" for line in lines)
+
+    # Write the metrics to a file: Prometheus text if the name ends in .prom, JSON otherwise.
+    def save(self, path):
+        with open(path, 'w') as output:
+            output.write(self.to_prometheus() if path.endswith('.prom') else self.to_json() + "\n")
+
+# Metrics shared by the whole process
+METRICS = Metrics()
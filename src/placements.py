@@ -0,0 +1,76 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# Longest ship covered by the precomputed placement tables (the standard fleet has ships of sizes 1-5)
+MAX_SHIP_LENGTH = 5
+
+# Largest board size that gets a precomputed placement table and cell bitmasks.
+# Bigger boards (e.g., 1000x1000 stress maps) build placements on demand, without a mask, since a table or a
+# million-bit mask per ship would cost far more than the ships themselves.
+MAX_TABLE_SIZE = 32
+
+# One legal position for a ship on the board.
+# `mask` has one bit set per covered cell (bit = row * size + col), or is None on boards above `MAX_TABLE_SIZE`,
+# and `cells` lists the covered (row, col) pairs.
+# `row`/`col` is the upper leftmost cell and `orientation` is 'h' (horizontal) or 'v' (vertical).
+Placement = namedtuple('Placement', ['mask', 'cells', 'row', 'col', 'length', 'orientation'])
+
+# Build the placement of a ship starting at (row, col), or return None if it would run off the board.
+def make_placement(row, col, length, orientation, size=10):
+    if not (0 <= row < size and 0 <= col < size):
+        return None
+    # Skip starting cells where the ship would run off the board
+    if orientation == 'h' and col + length > size:
+        return None
+    if orientation == 'v' and row + length > size:
+        return None
+    if orientation == 'h':
+        cells = tuple((row, col + i) for i in range(length))
+    else:
+        cells = tuple((row + i, col) for i in range(length))
+    mask = None
+    if size <= MAX_TABLE_SIZE:
+        mask = 0
+        for cell_row, cell_col in cells:
+            mask |= 1 << (cell_row * size + cell_col)
+    return Placement(mask, cells, row, col, length, orientation)
+
+# Index of every legal ship placement on a square board of a given size.
+# `by_ship[(length, orientation)]` lists all placements of that shape, and
+# `by_start[(row, col, length, orientation)]` finds the placement that starts at a given cell.
+class PlacementTable:
+    def __init__(self, size):
+        self.size = size
+        self.by_ship = {}
+        self.by_start = {}
+        for length in range(1, MAX_SHIP_LENGTH + 1):
+            for orientation in ('h', 'v'):
+                placements = []
+                for row in range(size):
+                    for col in range(size):
+                        placement = make_placement(row, col, length, orientation, size)
+                        if placement is None:
+                            continue
+                        placements.append(placement)
+                        self.by_start[(row, col, length, orientation)] = placement
+                self.by_ship[(length, orientation)] = tuple(placements)
+
+    # Return every placement of a ship of `length`, in both orientations.
+    def for_length(self, length):
+        return self.by_ship[(length, 'h')] + self.by_ship[(length, 'v')]
+
+# Whether placements of a ship of `length` on a board of `size` come from a precomputed table.
+def has_table(size, length=MAX_SHIP_LENGTH):
+    return size <= MAX_TABLE_SIZE and length <= MAX_SHIP_LENGTH
+
+# Get the placement table for a board size. Each table is built once and shared by every board of that size.
+@lru_cache(maxsize=None)
+def placement_table(size=10):
+    return PlacementTable(size)
+
+# Look up the placement of a ship starting at (row, col), or None if it would not fit on the board.
+# Boards and ships beyond the tables get a freshly built placement.
+def placement_at(row, col, length, orientation, size=10):
+    if has_table(size, length):
+        return placement_table(size).by_start.get((row, col, length, orientation))
+    return make_placement(row, col, length, orientation, size)
@@ -0,0 +1,141 @@
+# Terminal rendering for the boards.
+# On a terminal that understands ANSI escape codes, the player's board and the opponent's board are drawn once,
+# side by side at the top of the screen, and every later update only rewrites the cells that changed, using cursor
+# moves. The rest of the screen below the boards is a scroll region, so prompts and messages scroll underneath
+# without moving the boards. Each update is built in memory and sent with a single write.
+#
+# On dumb terminals (TERM=dumb, output redirected to a file or pipe, or BATTLESHIP_RENDER=plain) the boards are
+# printed in full as plain text every time instead, and clearing the screen just scrolls it with blank lines.
+# Neither mode starts a process to clear the screen.
+
+import atexit
+import os
+import shutil
+import sys
+
+from utilities import column_label
+
+# Panels the boards are drawn in
+OWN_BOARD = 0  # The player's own board, ships shown
+OPPONENT_BOARD = 1  # The opponent's board, ships hidden
+
+# Screen layout of a panel: a title line, the column header and one line per board row
+PANEL_WIDTH = 30  # Fewest columns from the start of one panel to the start of the next
+HEADER_LINES = 2  # Lines above the first board row: the title and the column header
+
+# Blank lines printed to clear the screen in plain mode
+CLEAR_LINES = 50
+
+# Whether the output stream is a terminal that understands ANSI escape codes.
+def supports_ansi(stream):
+    mode = os.environ.get('BATTLESHIP_RENDER')
+    if mode in ('ansi', 'plain'):
+        return mode == 'ansi'
+    if not hasattr(stream, 'isatty') or not stream.isatty():
+        return False
+    if os.name == 'nt':
+        return 'WT_SESSION' in os.environ  # Windows Terminal; the classic console needs VT mode enabled first
+    return os.environ.get('TERM', 'dumb') != 'dumb'
+
+# Widths of the row numbers and of each cell for a board of `size` rows and columns. Cells are as wide as the
+# longest column label (e.g., 2 for "AB" on boards of more than 26 columns).
+def panel_widths(size):
+    return len(str(size)), len(column_label(size - 1))
+
+# Screen column of cell `col` within a panel, counted from the panel's first column.
+def cell_offset(col, size):
+    number_width, cell_width = panel_widths(size)
+    return number_width + 1 + col * (cell_width + 1)
+
+# Lines of a panel as plain text, laid out like the original `print`-based board display.
+def panel_lines(title, rows):
+    size = len(rows)
+    number_width, cell_width = panel_widths(size)
+    lines = [title, " " * number_width + " ".join(f"{column_label(i):<{cell_width}}" for i in range(size))]
+    for i, row in enumerate(rows):
+        lines.append(f"{i + 1:{number_width}} " + " ".join(f"{cell:<{cell_width}}" for cell in row))
+    return lines
+
+# Prints every panel in full, for dumb terminals.
+class PlainRenderer:
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def out(self):
+        return self.stream or sys.stdout
+
+    # Show a panel: `rows` is a list of rows of one-character cell symbols.
+    def show(self, panel, title, rows):
+        self.out().write("\n".join(panel_lines(title, rows)) + "\n")
+
+    def clear(self):
+        self.out().write("\n" * CLEAR_LINES)
+
+# Keeps the panels on screen and redraws only the cells that changed.
+class AnsiRenderer:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.panels = {}  # Panel -> (title, rows) currently on screen
+        self.active = False  # Whether the panel area and scroll region are set up
+        atexit.register(self.reset)
+
+    def out(self):
+        return self.stream or sys.stdout
+
+    def show(self, panel, title, rows):
+        parts = []
+        if not self.active:
+            # First frame after a clear: reserve the top of the screen and let everything else scroll below it
+            height = shutil.get_terminal_size().lines
+            panel_height = HEADER_LINES + len(rows) + 1  # Lines taken by the panels, including a blank line below them
+            parts.append("\x1b[2J\x1b[H")  # Clear the screen and home the cursor
+            if height > panel_height + 1:
+                parts.append(f"\x1b[{panel_height + 1};{height}r")  # Scroll region below the panels
+            parts.append(f"\x1b[{panel_height + 1};1H")
+            self.active = True
+
+        parts.append("\x1b7")  # Save the cursor, which belongs to the scrolling text below
+        width = max(PANEL_WIDTH, cell_offset(len(rows), len(rows)) + 1)
+        x = panel * width + 1
+        previous = self.panels.get(panel)
+        if previous is None or previous[0] != title or len(previous[1]) != len(rows):
+            # New panel: draw it in full
+            for line_number, line in enumerate(panel_lines(title, rows)):
+                parts.append(f"\x1b[{line_number + 1};{x}H{line:<{width - 1}}")
+        else:
+            # Known panel: only rewrite the changed cells
+            for r, (old_row, new_row) in enumerate(zip(previous[1], rows)):
+                for c, (old, new) in enumerate(zip(old_row, new_row)):
+                    if old != new:
+                        parts.append(f"\x1b[{r + HEADER_LINES + 1};{x + cell_offset(c, len(rows))}H{new}")
+        parts.append("\x1b8")  # Back to the scrolling text
+        self.panels[panel] = (title, [list(row) for row in rows])
+
+        stream = self.out()
+        stream.write("".join(parts))
+        stream.flush()
+
+    # Blank the screen (e.g., between players' turns). The panels are drawn from scratch on the next `show`.
+    def clear(self):
+        stream = self.out()
+        stream.write("\x1b[r\x1b[2J\x1b[H")  # Reset the scroll region, clear the screen and home the cursor
+        stream.flush()
+        self.panels.clear()
+        self.active = False
+
+    # Give the terminal back its full scroll region when the program exits.
+    def reset(self):
+        if self.active:
+            stream = self.out()
+            stream.write(f"\x1b[r\x1b[{shutil.get_terminal_size().lines};1H\n")
+            stream.flush()
+            self.active = False
+
+# Pick the renderer for a stream (standard output by default).
+def make_renderer(stream=None):
+    if supports_ansi(stream or sys.stdout):
+        return AnsiRenderer(stream)
+    return PlainRenderer(stream)
+
+# Renderer shared by the terminal I/O (see `game_io.py`)
+RENDERER = make_renderer()
@@ -0,0 +1,177 @@
+# Compact binary replay logs for Battleship games.
+#
+# A log starts with a header, followed by one fixed-width record per action:
+#   header:  b"BSR" + version byte
+#            board size (H), flags (B, bit 0 = seed present), record width in bytes (B), seed (q)
+#            description length (B) + UTF-8 description (e.g., the strategies that played), at most 255 bytes
+#            for each of the two players: ship count (H), then per ship: length (B), orientation (B, 0 = 'h',
+#            1 = 'v'), row (H), column (H)
+#   records: a shot at cell index i (row * size + col) is stored as i * 2 + hit (1 if the shot hit a ship);
+#            an airstrike on a row r is stored as 2 * size * size + r.
+# On a 10x10 board every record fits in one byte. Players alternate shots, starting with player 1, and an airstrike
+# belongs to the player who fired the shot before it, so records do not need to store the player.
+# Sunk ships and game over are not stored; they follow from replaying the shots through `Board`.
+
+import struct
+
+from board import Board
+from ships import Ships
+from placements import placement_at
+
+MAGIC = b"BSR"
+VERSION = 2
+
+_HEADER = struct.Struct('<HBBq')
+_SHIP_COUNT = struct.Struct('<H')
+_PLACEMENT = struct.Struct('<BBHH')
+
+# Longest description stored in a log, in bytes
+MAX_DESCRIPTION = 255
+
+# Size of the chunks read from the stream while replaying
+READ_CHUNK = 4096
+
+# Record width in bytes needed for a board of the given size.
+def record_width(size):
+    largest = 2 * size * size + size - 1  # The largest airstrike code
+    return (largest.bit_length() + 7) // 8
+
+# Largest board size and number of ships per player the header can hold
+MAX_SIZE = 65535
+MAX_SHIPS = 65535
+
+# Writes a replay log to a binary stream (e.g., a file opened with 'wb' or 'ab').
+# Records are appended as they happen, so a log is usable up to the last action even if the game is cut short.
+# The board size is taken from the boards passed to `write_header`; if `size` is given as well, it must match them.
+class ReplayWriter:
+    def __init__(self, stream, seed=None, description="", size=None):
+        self.stream = stream
+        self.seed = seed  # Seed the game was played with, so simulated games can be re-run exactly
+        self.description = description  # Free text, e.g., the strategies that played
+        self.size = size  # Board size, known for sure once the header is written
+        self.width = None  # Bytes per record, set with the header
+
+    # Write the header once both fleets are on their boards.
+    def write_header(self, boards):
+        size = boards[0].size
+        if any(board.size != size for board in boards) or (self.size is not None and self.size != size):
+            raise ValueError("The replay log and both boards must have the same size.")
+        if size > MAX_SIZE:
+            raise ValueError("Replay logs support boards up to " + str(MAX_SIZE) + "x" + str(MAX_SIZE) + ".")
+        if any(len(board.placements) > MAX_SHIPS for board in boards):
+            raise ValueError("Replay logs support up to " + str(MAX_SHIPS) + " ships per player.")
+        self.size = size
+        self.width = record_width(size)
+        # Cut long descriptions at a character boundary, so a multi-byte character is never split
+        description = self.description.encode('utf-8')[:MAX_DESCRIPTION].decode('utf-8', 'ignore').encode('utf-8')
+        parts = [MAGIC, bytes([VERSION]),
+                 _HEADER.pack(self.size, 1 if self.seed is not None else 0, self.width, self.seed or 0),
+                 bytes([len(description)]), description]
+        for board in boards:
+            parts.append(_SHIP_COUNT.pack(len(board.placements)))
+            for placement in board.placements:
+                parts.append(_PLACEMENT.pack(placement.length, 0 if placement.orientation == 'h' else 1,
+                                             placement.row, placement.col))
+        self.stream.write(b"".join(parts))
+
+    # Record a shot at (row, col); `fire_result` is the value returned by `Board.fire`.
+    def record_shot(self, row, col, fire_result):
+        self._write((row * self.size + col) * 2 + (1 if fire_result else 0))
+
+    # Record an airstrike on a row (0-based).
+    def record_airstrike(self, row):
+        self._write(2 * self.size * self.size + row)
+
+    def _write(self, code):
+        self.stream.write(code.to_bytes(self.width, 'little'))
+
+    def flush(self):
+        self.stream.flush()
+
+# Reads a replay log from a binary stream without loading it all at once.
+# The header is parsed on creation; iterating yields one record at a time:
+#   ('shot', player, row, col, hit) or ('airstrike', player, row), with players numbered 0 and 1.
+class ReplayReader:
+    def __init__(self, stream):
+        self.stream = stream
+        if self._read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a Battleship replay log.")
+        version = self._read(1)[0]
+        if version != VERSION:
+            raise ValueError("Unsupported replay log version " + str(version) + ".")
+        self.size, flags, self.width, seed = _HEADER.unpack(self._read(_HEADER.size))
+        self.seed = seed if flags & 1 else None
+        self.description = self._read(self._read(1)[0]).decode('utf-8')
+        self.fleets = []  # Per player: a list of (length, orientation, row, col)
+        for _ in range(2):
+            fleet = []
+            ship_count = _SHIP_COUNT.unpack(self._read(_SHIP_COUNT.size))[0]
+            for _ in range(ship_count):
+                length, orientation, row, col = _PLACEMENT.unpack(self._read(_PLACEMENT.size))
+                fleet.append((length, 'h' if orientation == 0 else 'v', row, col))
+            self.fleets.append(fleet)
+
+    # Read exactly `count` bytes from the stream.
+    def _read(self, count):
+        data = self.stream.read(count)
+        if len(data) != count:
+            raise ValueError("Replay log ended unexpectedly.")
+        return data
+
+    def __iter__(self):
+        cells = self.size * self.size
+        width = self.width
+        player = 1  # The player who fired the previous shot (player 0 fires first)
+        leftover = b""
+        while True:
+            chunk = self.stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            data = leftover + chunk
+            usable = len(data) - len(data) % width
+            for offset in range(0, usable, width):
+                code = data[offset] if width == 1 else int.from_bytes(data[offset:offset + width], 'little')
+                if code < 2 * cells:
+                    player = 1 - player  # Players alternate shots
+                    row, col = divmod(code >> 1, self.size)
+                    yield ('shot', player, row, col, code & 1)
+                else:
+                    yield ('airstrike', player, code - 2 * cells)
+            leftover = data[usable:]
+
+# Replays a log through `Board` and `Ships`, one record at a time.
+# The boards and ships are rebuilt from the header, and iterating applies each record and yields it with its outcome:
+#   ('shot', player, row, col, fire_result) where fire_result is 0 (miss), 1 (hit) or 2 (sunk), or
+#   ('airstrike', player, row, hits).
+# A ValueError is raised if a shot does not reproduce the hit or miss that was logged.
+class GameReplay:
+    def __init__(self, stream, board_class=Board):
+        self.reader = ReplayReader(stream)
+        self.boards = [board_class(1, self.reader.size), board_class(2, self.reader.size)]
+        self.ships = [Ships(1), Ships(2)]
+        for board, fleet, ship in zip(self.boards, self.reader.fleets, self.ships):
+            ship.set_fleet([length for length, _, _, _ in fleet])
+            ship.load_types()
+            for ship_id, (length, orientation, row, col) in enumerate(fleet, 1):
+                board.add_ship(placement_at(row, col, length, orientation, self.reader.size), ship_id)
+
+    def __iter__(self):
+        for record in self.reader:
+            if record[0] == 'shot':
+                _, player, row, col, hit = record
+                opponent = 1 - player
+                fire_result = self.boards[opponent].fire_index(row * self.reader.size + col, self.ships[opponent])
+                if (fire_result != 0) != bool(hit):
+                    raise ValueError("Replay does not match the log at " + chr(ord('A') + col) + str(row + 1) + ".")
+                yield ('shot', player, row, col, fire_result)
+            else:
+                _, player, row = record
+                hits = self.boards[1 - player].perform_airstrike(row, self.ships[1 - player])
+                yield ('airstrike', player, row, hits)
+
+    # Index of the player who sank the other fleet (0 or 1), or None if the replayed game did not finish.
+    def winner(self):
+        for player in (0, 1):
+            if self.boards[1 - player].game_over():
+                return player
+        return None
@@ -0,0 +1,202 @@
+# Multi-game replay archives with random access to any game.
+#
+# An archive is a data file of concatenated frames, one per game: a 4-byte little-endian length followed by a
+# replay log in the format of `replay.py`. Next to it, `<archive>.idx` stores the byte offset of every frame as an
+# array of 8-byte little-endian integers, so game N is found with a single lookup.
+#
+# Several processes (e.g., tournament workers) can append to the same data file at once: every frame is written
+# with one `os.write` on a file opened in append mode. Appending does not update the index; run `compact_archive`
+# afterwards to merge archives and rebuild it. Readers open the data file with `mmap`, so seeking to game 4,000,000
+# or handing slices of the archive to parallel workers does not parse anything before it.
+#
+# Examples: python replay_archive.py compact games.bsa worker1.bsa worker2.bsa
+#           python replay_archive.py show games.bsa 4000000
+
+import argparse
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from replay import GameReplay, ReplayReader
+
+_FRAME = struct.Struct('<I')
+
+# Path of the offset index that belongs to an archive.
+def index_path(path):
+    return path + '.idx'
+
+# Appends finished games to an archive data file.
+class ArchiveWriter:
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    # Append one game's replay log (bytes) as a single frame.
+    def append(self, log):
+        os.write(self.fd, _FRAME.pack(len(log)) + log)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Walk the frames of an archive data buffer and return the offset of every frame.
+def scan_offsets(data):
+    offsets = array('Q')
+    position = 0
+    end = len(data)
+    while position + _FRAME.size <= end:
+        (length,) = _FRAME.unpack_from(data, position)
+        if position + _FRAME.size + length > end:
+            break  # A frame that is still being written, or was cut short
+        offsets.append(position)
+        position += _FRAME.size + length
+    return offsets
+
+# Write the offset index for an archive data file and return the number of games in it.
+def build_index(path):
+    with open(path, 'rb') as data_file:
+        size = os.fstat(data_file.fileno()).st_size
+        if size == 0:
+            offsets = array('Q')
+        else:
+            with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets = scan_offsets(data)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    with open(index_path(path), 'wb') as index_file:
+        offsets.tofile(index_file)
+    return len(offsets)
+
+# Merge one or more archive data files into `destination` and write its index.
+# `destination` may also be one of the sources; the merge goes through a temporary file that replaces it at the end.
+# Incomplete frames at the end of a source are dropped.
+def compact_archive(sources, destination):
+    temporary = destination + '.tmp'
+    offsets = array('Q')
+    position = 0
+    with open(temporary, 'wb') as output:
+        for source in sources:
+            with open(source, 'rb') as data_file:
+                if os.fstat(data_file.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    source_offsets = scan_offsets(data)
+                    if not source_offsets:
+                        continue
+                    last = source_offsets[-1]
+                    end = last + _FRAME.size + _FRAME.unpack_from(data, last)[0]
+                    output.write(data[:end])
+                    offsets.extend(position + offset for offset in source_offsets)
+                    position += end
+    os.replace(temporary, destination)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    with open(index_path(destination), 'wb') as index_file:
+        offsets.tofile(index_file)
+    return len(offsets)
+
+# Read-only view of an archive with random access to every game.
+# `archive[n]` is game n's replay log as bytes, `archive.game(n)` replays it through `Board`, and
+# `archive.logs(start, stop)` iterates over a slice.
+class ArchiveReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        # Use the index if it is present and covers the data, otherwise scan the frames once
+        self.offsets = array('Q')
+        if os.path.exists(index_path(path)):
+            with open(index_path(path), 'rb') as index_file:
+                self.offsets.frombytes(index_file.read())
+            if sys.byteorder != 'little':
+                self.offsets.byteswap()
+        if not self._index_is_current():
+            self.offsets = scan_offsets(self.data)
+
+    # An index is current when its last frame ends exactly where the data ends.
+    def _index_is_current(self):
+        if not self.offsets:
+            return len(self.data) == 0
+        last = self.offsets[-1]
+        if last + _FRAME.size > len(self.data):
+            return False
+        return last + _FRAME.size + _FRAME.unpack_from(self.data, last)[0] == len(self.data)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    # Replay log of game `number` as bytes.
+    def __getitem__(self, number):
+        offset = self.offsets[number]
+        (length,) = _FRAME.unpack_from(self.data, offset)
+        start = offset + _FRAME.size
+        return self.data[start:start + length]
+
+    # Parse the header of game `number` (seed, description, fleets) and iterate its records.
+    def reader(self, number):
+        return ReplayReader(io.BytesIO(self[number]))
+
+    # Replay game `number` through `Board` and `Ships`.
+    def game(self, number, **kwargs):
+        return GameReplay(io.BytesIO(self[number]), **kwargs)
+
+    # Iterate over the replay logs of games start to stop - 1.
+    def logs(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        for number in range(start, stop):
+            yield self[number]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Work with Battleship replay archives.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    compact = commands.add_parser('compact', help="merge archives and rebuild the index")
+    compact.add_argument('destination')
+    compact.add_argument('sources', nargs='+')
+    show = commands.add_parser('show', help="replay one game from an archive")
+    show.add_argument('archive')
+    show.add_argument('number', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        count = compact_archive(args.sources, args.destination)
+        print(f"{count} games written to {args.destination}")
+    else:
+        with ArchiveReader(args.archive) as archive:
+            replay = archive.game(args.number)
+            print(f"Game {args.number} of {len(archive)}: {replay.reader.description or 'no description'}"
+                  f" (seed {replay.reader.seed})")
+            for record in replay:
+                player = record[1] + 1
+                if record[0] == 'shot':
+                    outcome = ("MISS", "HIT", "SUNK BATTLESHIP")[record[4]]
+                    print(f"Player {player} fires at {chr(ord('A') + record[3])}{record[2] + 1}: {outcome}")
+                else:
+                    print(f"Player {player} airstrike on row {record[2] + 1}: {record[3]} hits")
+            winner = replay.winner()
+            print("Winner: " + (f"Player {winner + 1}" if winner is not None else "none (game unfinished)"))
+
+if __name__ == '__main__':
+    main()
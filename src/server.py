@@ -0,0 +1,329 @@
+# Asyncio TCP server that hosts many Battleship matches in one process.
+# Every connection speaks a line-based text protocol; each command is one line and gets one reply line starting
+# with OK or ERR (STATE replies with several lines ending in END). Things that happen without the player asking,
+# such as the opponent's shots, arrive as EVENT lines.
+#
+#   NEW AI <difficulty> [ships]   start a match against the AI (easy, medium, hard or probability; see --ai)
+#   NEW PVP [ships]               start a match against another player and wait for them to join
+#   JOIN <match>                  join a waiting PVP match as player 2
+#   PLACE <size> <h|v> <coord>    place a ship with its upper leftmost cell at a coordinate (e.g., PLACE 5 h A1)
+#   FIRE <coord>                  fire at the opponent's board (e.g., FIRE B7)
+#   AIRSTRIKE <row>               use an earned airstrike on a row (1-10)
+#   STATE                         show both boards
+#   METRICS                       engine metrics in Prometheus text format (when started with --metrics)
+#   QUIT                          leave the match and close the connection
+#
+# Each connection has a bounded outbox that a writer task drains to the socket. A client that sends commands
+# without reading the replies fills its own outbox, which stops the server from reading its next command until
+# the socket drains. Events for another player never wait: if that player's outbox is full, they are disconnected,
+# so one slow client cannot hold up its opponent or the rest of the server.
+#
+# The AI answers on the event loop, inside the reply to the player's move, so the server only offers the AIs that
+# take well under a millisecond per shot. monte_carlo spends several milliseconds per shot and endgame may search
+# tens of thousands of placements, which would hold up every other connection; `--ai` can allow them anyway.
+#
+# Matches live in a `SessionStore`, which spills idle matches to disk (see `session_store.py`), so connections only
+# remember the id of their match and look it up for every command.
+#
+# Example: python server.py --port 5050, then connect with e.g. `nc localhost 5050`
+
+import argparse
+import asyncio
+import itertools
+
+from match import Match, OVER, parse_coordinate, format_coordinate
+from metrics import METRICS
+from session_store import SessionStore
+from simulation import SHOOTERS
+
+# Lines a connection may have queued for sending before it is throttled (own replies) or dropped (events)
+OUTBOX_SIZE = 64
+
+# Longest command line accepted, in bytes
+MAX_LINE = 256
+
+# Seconds a connection may stay silent before it is closed
+IDLE_TIMEOUT = 600
+
+# Seconds a closing connection gets to receive what is still queued for it
+CLOSE_TIMEOUT = 10
+
+# Seconds between sweeps that spill idle matches to disk
+SWEEP_INTERVAL = 30
+
+# AI difficulties offered unless the server is started with --ai
+DEFAULT_AIS = ('easy', 'medium', 'hard', 'probability')
+
+# Words for the results returned by `Board.fire`
+FIRE_RESULTS = ("MISS", "HIT", "SUNK")
+
+# Read a whole number from a command argument.
+def parse_number(text):
+    if not text.isdigit():
+        raise ValueError("Expected a number, got " + text + ".")
+    return int(text)
+
+# One client connection and the seat it holds in a match.
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.outbox = asyncio.Queue(OUTBOX_SIZE)
+        self.match_id = None  # Id of the match this connection is playing in
+        self.player = None  # Index of this connection's player in the match (0 or 1)
+        self.closed = False
+
+    # Queue a reply to this connection's own command, waiting while its outbox is full.
+    async def reply(self, line):
+        await self.outbox.put(line)
+
+    # Queue an event for this connection without waiting. A connection that cannot keep up is closed.
+    def notify(self, line):
+        if self.closed:
+            return
+        try:
+            self.outbox.put_nowait(line)
+        except asyncio.QueueFull:
+            self.close()
+
+    # Send queued lines until the connection closes, waiting for the socket to drain after each batch.
+    async def send_loop(self):
+        try:
+            while True:
+                line = await self.outbox.get()
+                if line is None:
+                    break
+                lines = [line]
+                while not self.outbox.empty():  # Write everything that is already queued in one go
+                    line = self.outbox.get_nowait()
+                    if line is None:
+                        break
+                    lines.append(line)
+                self.writer.write(("\n".join(lines) + "\n").encode())
+                await self.writer.drain()
+                if line is None:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+class GameServer:
+    def __init__(self, store, ai_names=DEFAULT_AIS):
+        self.store = store  # Match id -> Match, see `SessionStore`
+        self.ai_names = ai_names  # AI difficulties players may choose, names from `simulation.SHOOTERS`
+        self.seats = {}  # Match id -> [player 1 connection, player 2 connection]
+        self.match_ids = itertools.count(1)
+        self.connections = 0  # Connections currently open
+
+    # Serve one client until it quits, goes idle or disconnects.
+    async def handle(self, reader, writer):
+        connection = Connection(reader, writer)
+        sender = asyncio.create_task(connection.send_loop())
+        self.connections += 1
+        try:
+            await connection.reply("WELCOME battleship")
+            while not connection.closed:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, ValueError, ConnectionError):  # ValueError: line longer than MAX_LINE
+                    break
+                if not line:
+                    break
+                words = line.decode(errors='replace').split()
+                if not words:
+                    continue
+                if words[0].upper() == 'QUIT':
+                    await connection.reply("OK BYE")
+                    break
+                await self.dispatch(connection, words)
+        finally:
+            self.connections -= 1
+            self.leave(connection)
+            try:
+                connection.outbox.put_nowait(None)  # Let the sender flush what is queued, then close
+                await asyncio.wait_for(sender, CLOSE_TIMEOUT)
+            except (asyncio.QueueFull, asyncio.TimeoutError):
+                sender.cancel()
+                connection.close()
+
+    # Run one command and reply with OK or ERR. Invalid moves raise ValueError inside `Match`.
+    async def dispatch(self, connection, words):
+        command = words[0].upper()
+        handler = getattr(self, 'command_' + command.lower(), None)
+        if handler is None:
+            await connection.reply("ERR Unknown command " + command + ".")
+            return
+        try:
+            for line in handler(connection, words[1:]):
+                await connection.reply(line)
+        except ValueError as e:
+            await connection.reply("ERR " + str(e))
+        except IndexError:
+            await connection.reply("ERR Missing argument for " + command + ".")
+
+    # Connection playing the other side of `connection`'s match, if any.
+    def opponent(self, connection):
+        seats = self.seats.get(connection.match_id)
+        return seats[1 - connection.player] if seats else None
+
+    def command_new(self, connection, args):
+        if connection.match_id is not None:
+            raise ValueError("You are already in a match.")
+        mode = args[0].upper()
+        if mode == 'AI':
+            difficulty = args[1].lower()
+            if difficulty not in self.ai_names:
+                raise ValueError("Unknown AI difficulty. Choose one of: " + ", ".join(self.ai_names) + ".")
+            num_ships = parse_number(args[2]) if len(args) > 2 else 5
+        elif mode == 'PVP':
+            difficulty = None
+            num_ships = parse_number(args[1]) if len(args) > 1 else 5
+        else:
+            raise ValueError("Choose NEW AI <difficulty> or NEW PVP.")
+
+        match = Match(next(self.match_ids), difficulty, num_ships)
+        self.store.add(match)
+        self.seats[match.match_id] = [connection, None]
+        connection.match_id = match.match_id
+        connection.player = 0
+        yield f"OK MATCH {match.match_id} PLAYER 1" + (" WAITING" if difficulty is None else "")
+
+    def command_join(self, connection, args):
+        if connection.match_id is not None:
+            raise ValueError("You are already in a match.")
+        match = self.store.get(parse_number(args[0]))
+        if match is None or match.ai is not None or self.seats[match.match_id][1] is not None:
+            raise ValueError("No open match " + args[0] + ".")
+        self.seats[match.match_id][1] = connection
+        connection.match_id = match.match_id
+        connection.player = 1
+        self.seats[match.match_id][0].notify("EVENT JOINED")
+        yield f"OK MATCH {match.match_id} PLAYER 2"
+
+    def command_place(self, connection, args):
+        match = self.require_match(connection)
+        started = match.place(connection.player, parse_number(args[0]), args[1], args[2])
+        yield "OK PLACED " + args[0]
+        if started:
+            opponent = self.opponent(connection)
+            if opponent is not None:
+                opponent.notify("EVENT START TURN 1")
+            yield "EVENT START TURN 1"
+
+    def command_fire(self, connection, args):
+        match = self.require_match(connection)
+        row, col = parse_coordinate(args[0])
+        fire_result = match.fire(connection.player, args[0])
+        yield "OK " + FIRE_RESULTS[fire_result] + (" AIRSTRIKE" if match.airstrike_ready else "")
+        yield from self.after_move(connection, match, f"FIRE {format_coordinate(row, col)} {FIRE_RESULTS[fire_result]}")
+
+    def command_airstrike(self, connection, args):
+        match = self.require_match(connection)
+        row = parse_number(args[0]) - 1
+        hits = match.airstrike(connection.player, row)
+        yield f"OK HITS {hits}"
+        yield from self.after_move(connection, match, f"AIRSTRIKE {row + 1} {hits}")
+
+    def command_state(self, connection, args):
+        match = self.require_match(connection)
+        yield "OK STATE " + match.phase.upper()
+        yield from match.render(connection.player)
+        yield "END"
+
+    # Engine metrics for the whole server, one Prometheus text line per reply line.
+    def command_metrics(self, connection, args):
+        if not METRICS.enabled:
+            raise ValueError("Metrics are off; start the server with --metrics.")
+        yield "OK METRICS"
+        yield from METRICS.to_prometheus().splitlines()
+        yield "END"
+
+    def require_match(self, connection):
+        if connection.match_id is None:
+            raise ValueError("Start or join a match first.")
+        match = self.store.get(connection.match_id)
+        if match is None:
+            raise ValueError("Match no longer exists.")
+        return match
+
+    # Tell the opponent about a move, let the AI answer in AI matches and announce the winner.
+    def after_move(self, connection, match, move):
+        opponent = self.opponent(connection)
+        if opponent is not None:
+            opponent.notify("EVENT OPPONENT " + move)
+        # In AI matches the AI fires straight away, so its shot is part of the reply
+        ai_shot = match.ai_turn()
+        if ai_shot is not None:
+            row, col, fire_result = ai_shot
+            yield f"EVENT OPPONENT FIRE {format_coordinate(row, col)} {FIRE_RESULTS[fire_result]}"
+        if match.phase == OVER:
+            line = f"EVENT WIN PLAYER {match.winner + 1}"
+            if opponent is not None:
+                opponent.notify(line)
+            yield line
+            self.end_match(match.match_id)
+
+    # Forget a finished or abandoned match; its connections can start new ones.
+    def end_match(self, match_id):
+        seats = self.seats.pop(match_id, None)
+        self.store.remove(match_id)
+        for seat in seats or ():
+            if seat is not None:
+                seat.match_id = None
+                seat.player = None
+
+    # Remove a connection from its match; the opponent is told and the match ends.
+    def leave(self, connection):
+        if connection.match_id is None:
+            return
+        opponent = self.opponent(connection)
+        if opponent is not None:
+            opponent.notify("EVENT OPPONENT LEFT")
+        self.end_match(connection.match_id)
+
+    # Spill idle matches to disk every `SWEEP_INTERVAL` seconds.
+    async def sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.store.sweep()
+
+async def serve(host, port, store, ai_names=DEFAULT_AIS):
+    server = GameServer(store, ai_names)
+    sweeper = asyncio.create_task(server.sweep_loop())
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print("Serving Battleship on " + addresses, flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        sweeper.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Battleship matches over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5050)
+    parser.add_argument('--sessions', default='sessions', help="directory for matches spilled to disk")
+    parser.add_argument('--max-memory', type=int, default=256, help="memory for live matches, in MB")
+    parser.add_argument('--idle-timeout', type=float, default=300, help="seconds before an idle match is spilled")
+    parser.add_argument('--ai', nargs='+', choices=tuple(SHOOTERS), default=DEFAULT_AIS,
+                        help="AI difficulties to offer (monte_carlo and endgame are slow enough to delay other players)")
+    parser.add_argument('--metrics', action='store_true', help="collect engine metrics for the METRICS command")
+    args = parser.parse_args()
+    if args.metrics:
+        METRICS.enable()
+    store = SessionStore(args.sessions, args.max_memory * 1024 * 1024, args.idle_timeout)
+    try:
+        asyncio.run(serve(args.host, args.port, store, tuple(args.ai)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# Memory-bounded store for the matches a long-running server is hosting.
+# Live matches are kept in memory, least recently used first. A match that has not been touched for `idle_timeout`
+# seconds, or the least recently used one whenever the store goes over `max_bytes`, is written to disk in a compact
+# binary form (a few hundred bytes instead of tens of kilobytes of Python objects) and dropped from memory.
+# The next `get` for it reads it back, so callers never see the difference.
+#
+# Serialized form of a match (little-endian): a header, followed by the boards, fleets, airstrike counters and AI
+# state as a `GameState` snapshot in the form written by `game_state.encode_state`.
+#   header: version (B), match id (I), AI (B, 0 = none, else 1 + index in AI_NAMES: 1 = easy, 2 = medium,
+#           3 = hard, 4 = probability, 5 = monte_carlo, 6 = endgame), ships per fleet (B),
+#           phase (B), turn (B), airstrike ready (B), winner (b, -1 = none)
+
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+from board import Board
+from match import Match, SETUP, PLAYING, OVER
+from placements import Placement
+from game_io import TerminalIO, ScriptedIO, NullIO
+from game_state import capture_state, decode_state, encode_state, restore_state
+from simulation import SHOOTERS
+
+VERSION = 2
+
+# AI difficulties in the order they are numbered on disk: the order of `simulation.SHOOTERS`, so every shooter a
+# match accepts can be stored. New shooters go at the end of SHOOTERS, or saved matches would load the wrong AI.
+AI_NAMES = tuple(SHOOTERS)
+PHASES = (SETUP, PLAYING, OVER)
+
+_MATCH = struct.Struct('<BIBBBBBb')
+
+# Serialize a match to bytes.
+def encode_match(match):
+    header = _MATCH.pack(VERSION, match.match_id, 0 if match.ai is None else AI_NAMES.index(match.ai) + 1,
+                         match.ships[0].num_ships, PHASES.index(match.phase), match.turn,
+                         1 if match.airstrike_ready else 0, -1 if match.winner is None else match.winner)
+    if match.ai is None:
+        state = capture_state(match.boards, match.ships, match)
+    else:
+        state = capture_state(match.boards, match.ships, match, ai_state=match.ai_state,
+                              ai_targeted_coordinates=match.ai_targeted_coordinates)
+    return header + encode_state(state)
+
+# Rebuild a match from the bytes written by `encode_match`.
+def decode_match(data, board_class=Board):
+    version, match_id, ai, num_ships, phase, turn, airstrike_ready, winner = _MATCH.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError("Unsupported session version " + str(version) + ".")
+    match = Match(match_id, None, num_ships, board_class)  # The boards, fleets and AI are replaced below
+    restored = restore_state(decode_state(data[_MATCH.size:]), board_class)
+    match.boards = restored.boards
+    match.ships = restored.ships
+    for player in range(2):
+        placed = [placement.length for placement in match.boards[player].placements]
+        match.unplaced[player] = [size for size in range(1, num_ships + 1) if size not in placed]
+    match.phase = PHASES[phase]
+    match.turn = turn
+    match.player_hits = restored.player_hits
+    match.airstrike_ready = bool(airstrike_ready)
+    match.winner = None if winner < 0 else winner
+    if ai:
+        match.ai = AI_NAMES[ai - 1]
+        match.ai_state = restored.ai_state
+        match.ai_targeted_coordinates = restored.ai_targeted_coordinates
+    return match
+
+# Objects a match refers to but shares with every other match: the placement tuples (shared by all boards through
+# `placement_table`), classes, and the I/O objects the boards and fleets write through (`TERMINAL_IO` and its renderer).
+SHARED_TYPES = (Placement, type, TerminalIO, ScriptedIO, NullIO)
+
+# Approximate memory held by a live match: every object reachable from it, except the shared ones above.
+def match_size(match):
+    seen = set()
+    pending = [match]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            pending.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            pending.append(obj.__dict__)
+    return total
+
+class SessionStore:
+    # `directory` holds the spilled matches, `max_bytes` caps the approximate memory of the live matches and
+    # `idle_timeout` is how many seconds a match may go untouched before `sweep` spills it.
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, idle_timeout=300, board_class=Board):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.board_class = board_class
+        os.makedirs(directory, exist_ok=True)
+        self.live = OrderedDict()  # Match id -> Match, least recently used first
+        self.sizes = {}  # Match id -> approximate memory of the live match
+        self.spilled = set()  # Ids of the matches on disk
+        self.memory_bytes = 0  # Approximate memory held by the live matches
+        self.evicted = 0  # Matches spilled to stay under `max_bytes`
+        self.idle_spills = 0  # Matches spilled by `sweep` for being idle
+        self.restored = 0  # Matches read back from disk
+
+    # Path of the file a spilled match is stored in.
+    def path(self, match_id):
+        return os.path.join(self.directory, str(match_id) + '.match')
+
+    def __contains__(self, match_id):
+        return match_id in self.live or match_id in self.spilled
+
+    def __len__(self):
+        return len(self.live) + len(self.spilled)
+
+    # Start keeping a new match.
+    def add(self, match):
+        self.live[match.match_id] = match
+        self.sizes[match.match_id] = match_size(match)
+        self.memory_bytes += self.sizes[match.match_id]
+        self._enforce_limit()
+
+    # Return a match by id, reading it back from disk if it was spilled, or None if it is unknown.
+    # The match counts as used now, so it is the last to be spilled. A live match is measured again, as it has
+    # grown with the moves made since it was last handed out.
+    def get(self, match_id):
+        match = self.live.get(match_id)
+        if match is None:
+            if match_id not in self.spilled:
+                return None
+            match = self._restore(match_id)
+        else:
+            self.live.move_to_end(match_id)
+            self._measure(match_id, match)
+        match.last_active = time.monotonic()
+        return match
+
+    # Forget a match, in memory or on disk.
+    def remove(self, match_id):
+        if self.live.pop(match_id, None) is not None:
+            self.memory_bytes -= self.sizes.pop(match_id)
+        elif match_id in self.spilled:
+            self.spilled.discard(match_id)
+            os.remove(self.path(match_id))
+
+    # Spill every match that has been idle for longer than `idle_timeout` and return how many were spilled.
+    def sweep(self, now=None):
+        cutoff = (time.monotonic() if now is None else now) - self.idle_timeout
+        spilled = 0
+        # The least recently used matches come first, so the scan stops at the first one still in use
+        while self.live:
+            match_id, match = next(iter(self.live.items()))
+            if match.last_active > cutoff:
+                break
+            self._spill(match_id)
+            self.idle_spills += 1
+            spilled += 1
+        return spilled
+
+    # Update the recorded size of a live match and spill others if the store went over `max_bytes`.
+    def _measure(self, match_id, match):
+        size = match_size(match)
+        self.memory_bytes += size - self.sizes[match_id]
+        self.sizes[match_id] = size
+        self._enforce_limit()
+
+    # Spill the least recently used matches until the live ones fit in `max_bytes` (always keeping the newest).
+    def _enforce_limit(self):
+        while self.memory_bytes > self.max_bytes and len(self.live) > 1:
+            self._spill(next(iter(self.live)))
+            self.evicted += 1
+
+    def _spill(self, match_id):
+        match = self.live.pop(match_id)
+        self.memory_bytes -= self.sizes.pop(match_id)
+        temporary = self.path(match_id) + '.tmp'
+        with open(temporary, 'wb') as spill_file:
+            spill_file.write(encode_match(match))
+        os.replace(temporary, self.path(match_id))  # Never leave a half-written match behind
+        self.spilled.add(match_id)
+
+    def _restore(self, match_id):
+        with open(self.path(match_id), 'rb') as spill_file:
+            match = decode_match(spill_file.read(), self.board_class)
+        os.remove(self.path(match_id))
+        self.spilled.discard(match_id)
+        self.restored += 1
+        self.add(match)
+        return match
+
+    # Counters for monitoring the store.
+    def stats(self):
+        return {
+            'active': len(self.live),
+            'spilled': len(self.spilled),
+            'evicted': self.evicted,
+            'idle_spills': self.idle_spills,
+            'restored': self.restored,
+            'memory_bytes': self.memory_bytes
+        }
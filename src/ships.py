@@ -1,3 +1,5 @@
+from game_io import TERMINAL_IO
+
 class Ships:
     # Constructor for initializing the Ships object.
     # Each player has their own instance of Ships, where their ships' data (number, types, and remaining units) are stored.
@@ -5,11 +7,15 @@ class Ships:
     # 1. `player_num` to identify which player owns these ships.
     # 2. `num_ships` to store how many ships the player has (initially 0).
     # 3. `ship_types` and `remaining_units` are initialized as empty lists and will hold the ship types and their hit points.
-    def __init__(self, player_num):
+    # Prompts go through `io` (the terminal by default, see `game_io.py`).
+    def __init__(self, player_num, io=None):
         self.player_num = player_num  # Store the player number (either player 1 or player 2)
         self.num_ships = 0  # Number of ships is initially set to 0
         self.ship_types = []  # This list will store the types of ships (each ship type has a specific size)
         self.remaining_units = []  # This list will store how many units (hit points) each ship has remaining
+        self.units_left = 0  # Live count of unsunk segments across the whole fleet
+        self.lengths = []  # Length of each ship in the fleet, by ship id - 1
+        self.io = io or TERMINAL_IO  # Where prompts for this fleet's owner go
 
     # This method allows the player to choose the number of ships they want to place on their board.
     # It enforces that the number must be between 1 and 5 and ensures valid input from the user.
@@ -17,32 +23,49 @@ class Ships:
         while True:
             try:
                 # Prompt the player to select how many ships they want to play with (between 1 and 5)
-                num_ships = int(input("Choose the number of ships for your board (1-5): "))
+                num_ships = int(self.io.read("Choose the number of ships for your board (1-5): "))
                 self.num_ships = num_ships  # Store the chosen number of ships
                 break  # Exit the loop once a valid number is entered
-            except:  # Handle cases where the input isn't a valid integer
-                print("Invalid number of ships.")  # Prompt the player to try again
+            except ValueError:  # Handle cases where the input isn't a valid integer
+                self.io.write("Invalid number of ships.")  # Prompt the player to try again
         
         # If the user selects an invalid number outside the range (1-5), prompt them to select a valid number
         while (self.num_ships < 1) or (self.num_ships > 5):
             try:
                 # Ask the player to select a valid number of ships
-                new_num = int(input("Invalid number of ships. Select a new number: "))
+                new_num = int(self.io.read("Invalid number of ships. Select a new number: "))
                 self.num_ships = new_num  # Store the corrected number of ships
-            except:
+            except ValueError:
                 self.num_ships = 0  # If input fails again, reset `num_ships` to 0
 
         # Once a valid number of ships is set, initialize the `remaining_units` list.
-        # Each ship starts with a number of hit points equal to its index + 1 (i.e., ship 1 has 1 HP, ship 2 has 2 HP, etc.)
-        for i in range(num_ships):
-            self.remaining_units.append(i + 1)  # Add the number of hit points to each ship
+        self.set_num_ships(self.num_ships)
+
+    # This method sets the number of ships without prompting, which lets the AI and the headless simulation build a fleet.
+    # Each ship starts with a number of hit points equal to its index + 1 (i.e., ship 1 has 1 HP, ship 2 has 2 HP, etc.)
+    def set_num_ships(self, num_ships):
+        self.set_fleet([i + 1 for i in range(num_ships)])
+
+    # This method sets up a fleet with any ship lengths (e.g., [5, 4, 3, 3, 2]) for custom or large boards.
+    # Ships are numbered from 1 in the order given; that number (the ship id) is the value stored on the board for
+    # the ship's cells. In the standard fleet, ship i has length i, so the id is also the ship's size.
+    def set_fleet(self, lengths):
+        self.lengths = list(lengths)  # Length of each ship, by ship id - 1
+        self.num_ships = len(self.lengths)  # Store the number of ships
+        self.remaining_units = list(self.lengths)  # Add the number of hit points to each ship
+        self.units_left = sum(self.remaining_units)  # Every segment starts unsunk
+
+    # This method records a hit on the ship represented by `ship_value` (the ship id stored on the board).
+    # It returns True if the hit sinks that ship.
+    def hit_unit(self, ship_value):
+        self.remaining_units[ship_value - 1] -= 1  # Decrease the remaining parts of the hit ship
+        self.units_left -= 1  # Keep the fleet-wide count in step
+        return self.remaining_units[ship_value - 1] == 0
 
     # This method loads the ship types and their associated sizes.
-    # Each ship's size is determined by its index (e.g., the first ship has size 1, the second ship has size 2, and so on).
+    # Each ship's size comes from the fleet (in the standard fleet, the first ship has size 1, the second ship has size 2, and so on).
     # The `ship_types` list is filled with ships, where each ship is represented by a list containing [1, size].
     def load_types(self):
-        i = 1
-        # Loop through the number of ships and assign each ship a type and size
-        while i < (self.num_ships + 1):  # Loop through the number of ships the player has chosen
-            self.ship_types.append([1, i])  # Add the ship type to `ship_types`. Each ship type is a list of [1, ship size]
-            i += 1  # Increment to the next ship type
+        # Loop through the ships the player has chosen and add each one's type and size
+        for length in self.lengths:
+            self.ship_types.append([1, length])  # Add the ship type to `ship_types`. Each ship type is a list of [1, ship size]
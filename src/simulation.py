@@ -0,0 +1,136 @@
+# Headless simulation engine for running complete AI-vs-AI games without any terminal input or output.
+# It reuses the same `Board`, `Ships` and AI functions as the interactive game, but replaces the
+# `SwitchPlayers`/`Game` turn loop (which waits on `input()` and clears the screen) with a tight in-process loop.
+# This makes it possible to evaluate AI changes over a large number of games unattended.
+
+import random
+from collections import namedtuple
+from time import perf_counter
+
+from board import Board
+from ships import Ships
+from ai import ShotPool, ai_place_ships, ai_fire_easy, ai_fire_medium, ai_fire_hard, ai_fire_probability, ai_fire_monte_carlo, ai_fire_endgame, new_ai_state, update_ai_state
+from metrics import METRICS
+from utilities import BOARD_SIZE
+
+# Compact result of a simulated game.
+# `winner` is 0 for player A, 1 for player B, or None if the game was cut off by `max_shots`.
+# `shots` is a (player A, player B) tuple with the number of shots each player fired.
+GameResult = namedtuple('GameResult', ['winner', 'shots'])
+
+# Shooter adapters give every firing strategy the same signature: (opponent board, opponent ships, ai_state, targeted coordinates).
+# Each returns the cell index (row * size + column) the AI wants to fire at next.
+def shoot_easy(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_easy(board, targeted_coordinates)
+
+def shoot_medium(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_medium(board, ai_state, targeted_coordinates)
+
+def shoot_hard(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_hard(board)
+
+def shoot_probability(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_probability(board, ships, targeted_coordinates)
+
+def shoot_monte_carlo(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_monte_carlo(board, ships, targeted_coordinates)
+
+def shoot_endgame(board, ships, ai_state, targeted_coordinates):
+    return ai_fire_endgame(board, ships, ai_state, targeted_coordinates)
+
+# Placement adapter that samples whole fleets uniformly.
+def place_uniform(board, ships):
+    ai_place_ships(board, ships, uniform=True)
+
+# Registries of the available strategies so callers can refer to them by name.
+PLACERS = {
+    'random': ai_place_ships,
+    'uniform': place_uniform
+}
+SHOOTERS = {
+    'easy': shoot_easy,
+    'medium': shoot_medium,
+    'hard': shoot_hard,
+    'probability': shoot_probability,
+    'monte_carlo': shoot_monte_carlo,
+    'endgame': shoot_endgame
+}
+
+# Wrap a shooter so that, when metrics are enabled, every decision it makes is timed under its name.
+def _timed_shooter(name, shooter):
+    def shoot(board, ships, ai_state, targeted_coordinates):
+        if not METRICS.enabled:
+            return shooter(board, ships, ai_state, targeted_coordinates)
+        start = perf_counter()
+        index = shooter(board, ships, ai_state, targeted_coordinates)
+        METRICS.observe('ai_decision_seconds', perf_counter() - start, ai=name)
+        return index
+    return shoot
+
+SHOOTERS = {name: _timed_shooter(name, shooter) for name, shooter in SHOOTERS.items()}
+
+# Holds everything one side of a simulated game needs: its own board and ships, plus its AI's firing state.
+# `fleet` is a list of ship lengths, or None for the standard fleet of `num_ships` ships.
+class SimulatedPlayer:
+    def __init__(self, player_num, placer, shooter, num_ships, board_class, size=BOARD_SIZE, fleet=None):
+        self.board = board_class(player_num, size)  # This player's own board (the opponent fires at it)
+        self.ships = Ships(player_num)  # This player's fleet
+        if fleet is None:
+            self.ships.set_num_ships(num_ships)  # Choose the fleet size without prompting
+        else:
+            self.ships.set_fleet(fleet)
+        self.ships.load_types()
+        self.shooter = shooter  # Firing strategy used against the opponent
+        self.ai_state = new_ai_state()  # Targeting state for the medium AI
+        self.targeted_coordinates = ShotPool(size)  # Coordinates this player has already fired at (on the opponent's board)
+        placer(self.board, self.ships)  # Place the fleet on the board
+
+# Look up a strategy by name, or accept a callable directly.
+def _resolve(strategy, registry):
+    if callable(strategy):
+        return strategy
+    return registry[strategy]
+
+# Run one complete game between two AI players and return a `GameResult`.
+# Players alternate single shots, starting with player A, exactly like the AI branch of the interactive game loop.
+# `seed` makes the game reproducible, `num_ships` sets the fleet size (1-5) and `max_shots` caps the number of
+# shots per player as a safety net against strategies that stop making progress.
+# `board_class` selects the board backend (e.g., `Board`, `BitBoard` or `SparseBoard`) and `replay`, a `ReplayWriter`,
+# records the game so it can be replayed later.
+# `size` sets the board dimensions and `fleet` a custom list of ship lengths (e.g., hundreds of ships on a
+# 1000x1000 `SparseBoard` for stress runs, with a `max_shots` to match); the probability and Monte Carlo
+# shooters need the standard 10x10 board.
+def simulate_game(placer_a, shooter_a, placer_b, shooter_b, seed=None, num_ships=5, max_shots=200, board_class=Board,
+                  replay=None, size=BOARD_SIZE, fleet=None):
+    if seed is not None:
+        random.seed(seed)  # The AI functions draw from the module-level random generator
+
+    players = [
+        SimulatedPlayer(1, _resolve(placer_a, PLACERS), _resolve(shooter_a, SHOOTERS), num_ships, board_class, size, fleet),
+        SimulatedPlayer(2, _resolve(placer_b, PLACERS), _resolve(shooter_b, SHOOTERS), num_ships, board_class, size, fleet)
+    ]
+    shots = [0, 0]
+    current = 0  # Player A fires first
+    if replay is not None:
+        replay.write_header([player.board for player in players])
+
+    while shots[current] < max_shots:
+        player = players[current]
+        opponent = players[1 - current]
+
+        # Let the current player's AI pick a coordinate and fire it at the opponent's board
+        index = player.shooter(opponent.board, opponent.ships, player.ai_state, player.targeted_coordinates)
+        fire_result = opponent.board.fire_index(index, opponent.ships)
+        row, col = divmod(index, size)
+        update_ai_state(player.ai_state, fire_result, row, col)
+        shots[current] += 1
+        if replay is not None:
+            replay.record_shot(row, col, fire_result)
+
+        # Only a hit or a sink can end the game
+        if fire_result != 0 and opponent.board.game_over():
+            return GameResult(current, tuple(shots))
+
+        current = 1 - current  # Switch to the other player
+
+    return GameResult(None, tuple(shots))  # The shot limit was reached without a winner
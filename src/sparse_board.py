@@ -0,0 +1,115 @@
+from board import Board, resolve_volley
+from game_io import TERMINAL_IO
+from bitboard import _GridView
+from utilities import BOARD_SIZE
+
+# Board backend for very large maps (e.g., 1000x1000 with hundreds of ships in stress scenarios).
+# Only the cells that hold a ship or have been fired at are stored, in a dict and two sets keyed by cell index
+# (row * size + column), so memory and the cost of a shot grow with the number of ships and shots instead of
+# with the area of the grid. Placing a ship costs one lookup per ship cell, and an airstrike one per column.
+# Like `BitBoard`, it keeps all of the `Board` public methods, and `board.board[row][col]` still reads and writes
+# the usual "~", ".", "X" and ship values through a view, so the AIs that only use `fire_index` and the shot pool
+# (easy and medium) run unchanged on any size.
+class SparseBoard(Board):
+    def __init__(self, player_num, size=BOARD_SIZE, io=None):
+        self.player_num = player_num  # Store the player number (either player 1 or player 2)
+        self.size = size  # Number of rows and columns
+        self.ship_cells = {}  # Cell index -> id of the ship occupying it (the ship size in the standard fleet)
+        self.hits = set()  # Ship cells that have been hit
+        self.misses = set()  # Open-water cells that have been fired at
+        self.ship_mask = 0  # Unused: placements are checked cell by cell, as large boards have no placement masks
+        self.remaining_segments = 0  # Live count of ship segments that have not been hit yet
+        self.placements = []  # Placements of the ships on this board, in the order they were placed
+        self.io = io or TERMINAL_IO  # Where prompts and messages for this board's owner go
+
+    # Expose the stored cells through a list-of-lists style view for code that reads the grid directly.
+    @property
+    def board(self):
+        return _GridView(self)
+
+    # Return the value a list-of-lists board would hold at this cell ("~", ".", "X" or the ship id).
+    def get_cell(self, row, column):
+        index = row * self.size + column
+        if index in self.hits:
+            return "X"
+        if index in self.misses:
+            return "."
+        return self.ship_cells.get(index, "~")
+
+    # Write a value into a cell, keeping the dict, the sets and the live segment count consistent.
+    def set_cell(self, row, column, value):
+        index = row * self.size + column
+        was_afloat = index in self.ship_cells and index not in self.hits and index not in self.misses
+        self.hits.discard(index)
+        self.misses.discard(index)
+        if isinstance(value, int):  # Placing a ship segment
+            self.ship_cells[index] = value
+        elif value == "X":
+            self.hits.add(index)
+        elif value == ".":
+            self.misses.add(index)
+        else:  # Open water
+            self.ship_cells.pop(index, None)
+        self.remaining_segments += isinstance(value, int) - was_afloat
+
+    def is_empty(self, row, column):
+        index = row * self.size + column
+        return index not in self.ship_cells and index not in self.hits and index not in self.misses
+
+    # A placement fits if none of its cells already holds a ship.
+    def can_place(self, placement):
+        size = self.size
+        return all(row * size + col not in self.ship_cells for row, col in placement.cells)
+
+    # Record the ship's cells. The placement must already have been validated.
+    def add_ship(self, placement, ship_id=None):
+        value = placement.length if ship_id is None else ship_id
+        for row, col in placement.cells:
+            self.ship_cells[row * self.size + col] = value
+        self.remaining_segments += placement.length
+        self.placements.append(placement)
+
+    # Process a shot at a cell index (for `Board.fire_index`) with the same return codes as `Board.fire`:
+    # 0 for a miss, 1 for a hit and 2 for a sunk ship.
+    def _fire_index(self, index, ship):
+        if index in self.hits or index in self.misses:  # If the player already fired at this spot
+            self.io.write("You already targeted this location.")
+            return 0
+        ship_id = self.ship_cells.get(index)
+        if ship_id is not None:  # If the shot hits a ship
+            self.hits.add(index)
+            self.remaining_segments -= 1  # One less segment left afloat
+            if ship.hit_unit(ship_id):  # Decrease the remaining parts of the hit ship
+                return 2  # Ship is sunk
+            return 1  # Ship is hit but not sunk
+        self.misses.add(index)  # Open water, mark the miss
+        return 0
+
+    # Fire at every cell of a row at once (for `Board.perform_airstrike`) and return the number of new hits.
+    # If the owner's `ship` object is given, each hit ship loses the matching number of units.
+    def _perform_airstrike(self, row, ship=None):
+        hits = 0
+        start = row * self.size
+        for index in range(start, start + self.size):
+            if index in self.hits or index in self.misses:
+                continue
+            ship_id = self.ship_cells.get(index)
+            if ship_id is None:
+                self.misses.add(index)
+                continue
+            self.hits.add(index)
+            self.remaining_segments -= 1  # One less segment left afloat
+            if ship is not None:
+                ship.hit_unit(ship_id)
+            hits += 1
+        return hits
+
+    # Fire at a volley of cell indices (for `Board.fire_many`), sorting the cells into hits and misses with set
+    # operations; only the hits are then looked at one by one.
+    def _fire_many(self, cells, ship):
+        new_cells = set(cells).difference(self.hits, self.misses)
+        hit_cells = new_cells & self.ship_cells.keys()
+        self.hits |= hit_cells
+        self.misses |= new_cells - hit_cells
+        self.remaining_segments -= len(hit_cells)
+        return resolve_volley(cells, hit_cells, self.ship_cells.__getitem__, ship)
@@ -0,0 +1,217 @@
+# Tournament runner for comparing the AI strategies from `ai.py` against each other.
+# Every pairing of (placement strategy, firing strategy) players plays N headless games through `simulate_game`,
+# spread over a `ProcessPoolExecutor`. Workers send back small per-chunk summaries that are merged as they
+# arrive, so memory stays constant however many games are played, and a pairing can stop early once the
+# confidence interval on its win rate is tight enough.
+#
+# With --archive, every game is also saved to a replay archive (see `replay_archive.py`) that workers append to.
+# With --metrics, workers collect engine metrics (see `metrics.py`) that are merged and saved at the end.
+#
+# Example: python tournament.py --games 100000 --shooters easy medium probability --precision 0.005
+
+import argparse
+import io
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from metrics import METRICS
+from simulation import PLACERS, SHOOTERS, simulate_game
+from replay import ReplayWriter
+from replay_archive import ArchiveWriter, compact_archive
+
+# Shots-to-win are recorded in a fixed-size histogram; games are capped at this many shots per player
+MAX_SHOTS = 200
+
+# z-score for a 95% confidence interval
+Z_95 = 1.96
+
+# Play one chunk of games between two players and return a compact summary.
+# Sides alternate who fires first (even games: A first, odd games: B first) to cancel out the first-move advantage.
+# The summary is (wins, histograms): `wins` is [A wins, B wins, unfinished games] and `histograms` holds, for A and B,
+# how many of their wins took each number of shots. If `archive` is a path, every game's replay log is appended to it.
+# With `metrics=True` the chunk's engine metrics are collected and returned as a third item (None otherwise).
+def run_chunk(player_a, player_b, seeds, archive=None, metrics=False):
+    if metrics:
+        METRICS.reset()  # Worker processes are reused, so start each chunk from zero
+        METRICS.enable()
+    wins = [0, 0, 0]
+    histograms = [[0] * (MAX_SHOTS + 1), [0] * (MAX_SHOTS + 1)]
+    writer = ArchiveWriter(archive) if archive else None
+    for i, seed in enumerate(seeds):
+        first, second = (player_a, player_b) if i % 2 == 0 else (player_b, player_a)
+        replay = None
+        if writer is not None:
+            log = io.BytesIO()
+            replay = ReplayWriter(log, seed, '/'.join(first) + " vs " + '/'.join(second))
+        result = simulate_game(first[0], first[1], second[0], second[1], seed=seed, max_shots=MAX_SHOTS, replay=replay)
+        if writer is not None:
+            writer.append(log.getvalue())
+
+        if i % 2 == 0:
+            winner, shots = result.winner, result.shots
+        else:
+            winner = None if result.winner is None else 1 - result.winner  # Translate back to A/B
+            shots = (result.shots[1], result.shots[0])
+        if winner is None:
+            wins[2] += 1
+        else:
+            wins[winner] += 1
+            histograms[winner][shots[winner]] += 1
+    if writer is not None:
+        writer.close()
+    return wins, histograms, METRICS.to_dict() if metrics else None
+
+# Running totals for one pairing, built from chunk summaries.
+class MatchupStats:
+    def __init__(self, player_a, player_b):
+        self.player_a = player_a  # (placer name, shooter name)
+        self.player_b = player_b
+        self.wins = [0, 0, 0]  # A wins, B wins, unfinished games
+        self.histograms = [[0] * (MAX_SHOTS + 1), [0] * (MAX_SHOTS + 1)]
+        self.games = 0
+        self.submitted = 0  # Games handed to workers so far
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    # Merge one chunk summary into the totals.
+    def add(self, wins, histograms):
+        for i in range(3):
+            self.wins[i] += wins[i]
+        for side in range(2):
+            totals = self.histograms[side]
+            for shots, count in enumerate(histograms[side]):
+                totals[shots] += count
+        self.games += sum(wins)
+        self.elapsed = time.perf_counter() - self.started
+
+    # Fraction of games won by a side (0 = A, 1 = B).
+    def win_rate(self, side):
+        return self.wins[side] / self.games if self.games else 0.0
+
+    # Half-width of the 95% Wilson score interval for player A's win rate.
+    def half_width(self):
+        if not self.games:
+            return 1.0
+        n = self.games
+        p = self.win_rate(0)
+        return Z_95 * math.sqrt(p * (1 - p) / n + Z_95 * Z_95 / (4 * n * n)) / (1 + Z_95 * Z_95 / n)
+
+    # Mean number of shots a side needed to win.
+    def mean_shots(self, side):
+        histogram = self.histograms[side]
+        count = sum(histogram)
+        if not count:
+            return float('nan')
+        return sum(shots * n for shots, n in enumerate(histogram)) / count
+
+    # Shots a side needed to win at the given percentile (0-100).
+    def percentile_shots(self, side, percentile):
+        histogram = self.histograms[side]
+        count = sum(histogram)
+        if not count:
+            return float('nan')
+        target = percentile / 100 * count
+        seen = 0
+        for shots, n in enumerate(histogram):
+            seen += n
+            if seen >= target:
+                return shots
+        return MAX_SHOTS
+
+    # Format the results for this pairing as a short report.
+    def report(self):
+        lines = [f"{'/'.join(self.player_a)} vs {'/'.join(self.player_b)}: {self.games} games, "
+                 f"{self.games / self.elapsed if self.elapsed else 0:.0f} games/s"]
+        for side, name in ((0, 'A'), (1, 'B')):
+            lines.append(f"  {name} wins {self.win_rate(side) * 100:5.1f}%"
+                         f"  shots to win: mean {self.mean_shots(side):5.1f}"
+                         f"  p50 {self.percentile_shots(side, 50)}"
+                         f"  p90 {self.percentile_shots(side, 90)}"
+                         f"  p99 {self.percentile_shots(side, 99)}")
+        lines.append(f"  A win rate 95% CI: +/-{self.half_width() * 100:.2f}%"
+                     + (f"  ({self.wins[2]} games unfinished)" if self.wins[2] else ""))
+        return "\n".join(lines)
+
+# Run the tournament and yield each pairing's `MatchupStats` as soon as it is done.
+# `games` is the number of games per pairing, `chunk_size` the number of games per worker task and `precision`
+# the target half-width of the win-rate confidence interval (0 disables early stopping).
+# `archive` is the path of a replay archive to append every game to. With `metrics=True`, the workers' engine
+# metrics are merged into this process's `METRICS`.
+def run_tournament(players, games, workers=None, chunk_size=500, seed=0, precision=0.0, min_games=1000, archive=None,
+                   metrics=False):
+    matchups = [MatchupStats(a, b) for a, b in itertools.combinations_with_replacement(players, 2)]
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2  # Keep every worker busy without queuing the whole tournament
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}  # Future -> MatchupStats
+        next_seed = seed
+        queue = list(matchups)
+
+        while queue or pending:
+            # Hand out chunks round-robin until enough work is in flight
+            while queue and len(pending) < max_in_flight:
+                matchup = queue.pop(0)
+                count = min(chunk_size, games - matchup.submitted)
+                seeds = range(next_seed, next_seed + count)  # Every game gets its own seed, so results are reproducible
+                next_seed += count
+                matchup.submitted += count
+                future = executor.submit(run_chunk, matchup.player_a, matchup.player_b, seeds, archive, metrics)
+                pending[future] = matchup
+                if matchup.submitted < games:
+                    queue.append(matchup)
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                matchup = pending.pop(future)
+                wins, histograms, chunk_metrics = future.result()
+                matchup.add(wins, histograms)
+                if chunk_metrics is not None:
+                    METRICS.merge(chunk_metrics)
+
+                # Stop handing out chunks once the confidence interval is tight enough
+                if (precision and matchup in queue and matchup.games >= min_games
+                        and matchup.half_width() <= precision):
+                    queue.remove(matchup)
+
+                if matchup not in queue and matchup not in pending.values():
+                    yield matchup
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI-vs-AI Battleship tournaments.")
+    parser.add_argument('--games', type=int, default=1000, help="games per pairing")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=500, help="games per worker task")
+    parser.add_argument('--seed', type=int, default=0, help="base seed")
+    parser.add_argument('--placers', nargs='+', default=sorted(PLACERS), choices=sorted(PLACERS))
+    parser.add_argument('--shooters', nargs='+', default=sorted(SHOOTERS), choices=sorted(SHOOTERS))
+    parser.add_argument('--precision', type=float, default=0.0,
+                        help="stop a pairing early once the 95%% CI half-width of its win rate is below this")
+    parser.add_argument('--archive', help="save every game to this replay archive")
+    parser.add_argument('--metrics', help="save engine metrics to this file (Prometheus text if it ends in .prom, else JSON)")
+    args = parser.parse_args()
+
+    players = list(itertools.product(args.placers, args.shooters))
+    started = time.perf_counter()
+    total_games = 0
+    for matchup in run_tournament(players, args.games, args.workers, args.chunk_size, args.seed, args.precision,
+                                  archive=args.archive, metrics=bool(args.metrics)):
+        print(matchup.report(), flush=True)
+        total_games += matchup.games
+    elapsed = time.perf_counter() - started
+    print(f"\n{total_games} games in {elapsed:.1f}s ({total_games / elapsed:.0f} games/s)")
+
+    if args.archive:
+        # Workers append without an index, so rebuild it now that every game has been written
+        count = compact_archive([args.archive], args.archive)
+        print(f"{count} games saved to {args.archive}")
+
+    if args.metrics:
+        METRICS.save(args.metrics)
+        print("Metrics saved to " + args.metrics)
+
+if __name__ == '__main__':
+    main()
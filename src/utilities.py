@@ -1,41 +1,101 @@
-import os
-import random
+# Cells are numbered row by row: cell index = row * BOARD_SIZE + column, so A1 is 0, J1 is 9 and J10 is 99.
+# The tables below are built once, so converting between indices, (row, column) pairs and coordinate strings,
+# or walking from a cell in a direction, is a single lookup.
+BOARD_SIZE = 10
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+
+# (row, column) of every cell index
+CELL_ROW_COL = tuple(divmod(index, BOARD_SIZE) for index in range(CELL_COUNT))
+
+# Coordinate string (e.g., "A5") of every cell index, and the cell index of every valid coordinate string
+COORDINATES = tuple(chr(ord('A') + col) + str(row + 1) for row, col in CELL_ROW_COL)
+CELL_INDEX = {coordinate: index for index, coordinate in enumerate(COORDINATES)}
+
+# Row and column steps for each direction an AI can search in
+DIRECTION_STEPS = {
+    'up': (-1, 0),
+    'down': (1, 0),
+    'left': (0, -1),
+    'right': (0, 1)
+}
+
+# The cells met when walking from a cell in one direction until the edge of the board:
+# RAYS[direction][index][0] is the neighbor in that direction, RAYS[direction][index][1] the cell after it, etc.
+def _build_rays():
+    rays = {}
+    for direction, (row_step, col_step) in DIRECTION_STEPS.items():
+        direction_rays = []
+        for row, col in CELL_ROW_COL:
+            ray = []
+            row, col = row + row_step, col + col_step
+            while 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+                ray.append(row * BOARD_SIZE + col)
+                row, col = row + row_step, col + col_step
+            direction_rays.append(tuple(ray))
+        rays[direction] = tuple(direction_rays)
+    return rays
+
+RAYS = _build_rays()
+
+# Column label for any board size: A-Z, then AA, AB, ... like spreadsheet columns
+def column_label(col):
+    label = ""
+    col += 1
+    while col:
+        col, letter = divmod(col - 1, 26)
+        label = chr(ord('A') + letter) + label
+    return label
+
+# Format a cell index on a board of the given size as a coordinate (e.g., A5, or AB120 on a large board)
+def format_cell(index, size=BOARD_SIZE):
+    if size == BOARD_SIZE:
+        return COORDINATES[index]
+    row, col = divmod(index, size)
+    return column_label(col) + str(row + 1)
+
+# Parse a coordinate on a board of the given size into a cell index, or return None if it is not on the board
+def parse_cell(coordinate, size=BOARD_SIZE):
+    coordinate = coordinate.strip().upper()
+    if size == BOARD_SIZE:
+        return CELL_INDEX.get(coordinate)
+    letters = len(coordinate) - len(coordinate.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    digits = coordinate[letters:]
+    if not letters or not digits.isdigit() or not digits.isascii():
+        return None
+    col = 0
+    for letter in coordinate[:letters]:
+        col = col * 26 + ord(letter) - ord('A') + 1
+    row = int(digits) - 1
+    col -= 1
+    if not (0 <= row < size and 0 <= col < size):
+        return None
+    return row * size + col
 
 # Function to validate if a given coordinate is valid (e.g., A1, B10)
-def is_valid_coordinate(coordinate):
-    if len(coordinate) < 2 or len(coordinate) > 3:  # Coordinate must be 2 or 3 characters long (like A1, B10)
-        return False
-    row = coordinate[0].upper()  # Extract row (A-J)
-    col = coordinate[1:]  # Extract column (1-10)
-
-    # Check if row is between 'A' and 'J'
-    if row < 'A' or row > 'J':
-        return False
-    # Check if column is a number between 1 and 10
-    if not col.isdigit() or not (1 <= int(col) <= 10):
-        return False
-    return True
+def is_valid_coordinate(coordinate, size=BOARD_SIZE):
+    if size == BOARD_SIZE:
+        return coordinate.upper() in CELL_INDEX
+    return parse_cell(coordinate, size) is not None
 
 # Convert a board coordinate (e.g., A5) into row and column indices (for accessing the board array)
 def coordinate_to_indices(coordinate):
-    if len(coordinate) == 3 and coordinate[1:] == "10":  # Handle case for column 10
-        col = ord(coordinate[0]) - ord('A')  # Convert column letter to index (A=0, B=1,...)
-        row = 9  # Row 10 is index 9
-    else:
-        col = ord(coordinate[0]) - ord('A')  # Convert column letter to index
-        row = int(coordinate[1]) - 1  # Convert row to 0-based index
-    return row, col
-
-# Generate a random valid coordinate for the board (e.g., A1, J10)
-def generate_random_coordinate():
-    row = random.randint(0, 9)  # Random row (0-9 corresponds to 1-10)
-    col = random.randint(0, 9)  # Random column (0-9 corresponds to A-J)
-    return chr(ord('A') + col) + str(row + 1)  # Convert to board coordinate (e.g., A5)
-
-# Randomly choose an orientation for ship placement (horizontal or vertical)
-def random_orientation():
-    return random.choice(['h', 'v'])  # 'h' for horizontal, 'v' for vertical
-
-# Clear the console screen
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')  # Use 'cls' for Windows, 'clear' for other OSes
+    return CELL_ROW_COL[CELL_INDEX[coordinate.upper()]]
+
+# Convert row and column indices into a cell index
+def cell_index(row, col, size=BOARD_SIZE):
+    return row * size + col
+
+# Cell indices of a whole row, for row strikes
+def row_cells(row, size=BOARD_SIZE):
+    return range(row * size, (row + 1) * size)
+
+# Cell indices of a whole column, for column strikes
+def column_cells(col, size=BOARD_SIZE):
+    return range(col, size * size, size)
+
+# Cell indices of the square of cells within `radius` of (row, col), e.g., the 3x3 area hit by a bomb.
+# Cells that would fall off the edge of the board are left out.
+def square_cells(row, col, size=BOARD_SIZE, radius=1):
+    rows = range(max(row - radius, 0), min(row + radius + 1, size))
+    cols = range(max(col - radius, 0), min(col + radius + 1, size))
+    return [r * size + c for r in rows for c in cols]
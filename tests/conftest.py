@@ -0,0 +1,35 @@
+# The game modules live in `src` and import each other by name (e.g., `from board import Board`),
+# so the tests put `src` on the import path the same way running a script from there does.
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from ships import Ships
+from ai import ai_place_ships
+from game_io import NullIO
+from utilities import BOARD_SIZE
+
+# `placed_board(board_class, seed, size=10)` returns (board, ships): a board of `board_class` with the standard fleet
+# placed from `seed`, so every backend gets the same layout. Messages go nowhere (firing at a cell twice complains).
+@pytest.fixture
+def placed_board():
+    def make(board_class, seed, size=BOARD_SIZE):
+        random.seed(seed)
+        board = board_class(1, size, io=NullIO())
+        ships = Ships(1)
+        ships.set_num_ships(5)
+        ships.load_types()
+        ai_place_ships(board, ships)
+        return board, ships
+    return make
+
+# `grid(board)` returns the grid as plain lists, whatever the backend stores.
+@pytest.fixture
+def grid():
+    def rows(board):
+        return [list(row) for row in board.board]
+    return rows
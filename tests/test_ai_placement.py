@@ -0,0 +1,56 @@
+# AI fleets must always be legal, and uniform placement must make every layout equally likely.
+import random
+
+import pytest
+
+import ai
+from board import Board
+from ships import Ships
+from ai import ai_place_ships, sample_uniform_fleet
+
+# Place the standard fleet of `num_ships` ships with the AI and return the board and ships.
+def ai_fleet(num_ships=5, uniform=False):
+    board = Board(2)
+    ships = Ships(2)
+    ships.set_num_ships(num_ships)
+    ships.load_types()
+    ai_place_ships(board, ships, uniform=uniform)
+    return board, ships
+
+@pytest.mark.parametrize('uniform', [False, True])
+def test_fleets_are_legal(uniform):
+    random.seed(3)
+    for _ in range(50):
+        board, ships = ai_fleet(uniform=uniform)
+        cells = [cell for row in board.board for cell in row if isinstance(cell, int)]
+        assert sorted(cells) == sorted(length for length in range(1, 6) for _ in range(length))
+        assert board.remaining_segments == 15
+
+def test_uniform_layouts_do_not_overlap():
+    random.seed(4)
+    for _ in range(200):
+        layout = sample_uniform_fleet(Board(2), [5, 4, 3, 2, 1])
+        assert [placement.length for placement in layout] == [5, 4, 3, 2, 1]
+        occupied = 0
+        for placement in layout:
+            assert not placement.mask & occupied
+            occupied |= placement.mask
+
+# With a single ship every placement is equally likely, so each corner is covered about as often as the others
+# (a 5-ship covers a corner in 2 of its 120 placements).
+def test_uniform_placement_treats_the_corners_alike():
+    random.seed(5)
+    corners = {(0, 0): 0, (0, 9): 0, (9, 0): 0, (9, 9): 0}
+    for _ in range(6000):
+        placement, = sample_uniform_fleet(Board(2), [5])
+        for cell in corners:
+            corners[cell] += cell in placement.cells
+    for count in corners.values():
+        assert 60 <= count <= 140  # 100 expected
+
+# When no whole fleet fits within the attempts, ships are placed one by one instead.
+def test_falls_back_to_ship_by_ship_placement(monkeypatch):
+    monkeypatch.setattr(ai, 'UNIFORM_PLACEMENT_ATTEMPTS', 0)
+    random.seed(6)
+    board, _ = ai_fleet(uniform=True)
+    assert board.remaining_segments == 15
@@ -0,0 +1,58 @@
+# The board backends must behave exactly like the list-of-lists `Board`: same fire results, same grid, same
+# counters, on the same seeded games.
+import random
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from simulation import simulate_game
+
+BACKENDS = (Board, BitBoard, SparseBoard)
+
+@pytest.mark.parametrize('seed', range(20))
+def test_backends_agree_shot_by_shot(placed_board, grid, seed):
+    players = [placed_board(board_class, seed) for board_class in BACKENDS]
+    assert all(grid(board) == grid(players[0][0]) for board, _ in players)
+
+    order = list(range(100))
+    random.Random(seed).shuffle(order)
+    for index in order:
+        results = [board.fire_index(index, ships) for board, ships in players]
+        assert results == [results[0]] * len(BACKENDS)
+        reference = players[0][0]
+        for board, ships in players[1:]:
+            assert board.remaining_segments == reference.remaining_segments
+            assert board.game_over() == reference.game_over()
+            assert ships.ship_types == players[0][1].ship_types
+    assert all(grid(board) == grid(players[0][0]) for board, _ in players)
+    assert all(board.game_over() for board, _ in players)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_backends_agree_on_airstrikes(placed_board, grid, seed):
+    players = [placed_board(board_class, seed) for board_class in BACKENDS]
+    for row in (0, 4, 9):
+        hits = [board.perform_airstrike(row, ships) for board, ships in players]
+        assert hits == [hits[0]] * len(BACKENDS)
+    assert all(grid(board) == grid(players[0][0]) for board, _ in players)
+    assert len({board.remaining_segments for board, _ in players}) == 1
+
+def test_fire_by_coordinate_matches_fire_index(placed_board, grid):
+    by_coordinate, ships_a = placed_board(BitBoard, 3)
+    by_index, ships_b = placed_board(BitBoard, 3)
+    assert by_coordinate.fire("C4", ships_a) == by_index.fire_index(32, ships_b)
+    assert grid(by_coordinate) == grid(by_index)
+
+@pytest.mark.parametrize('shooter', ['easy', 'medium', 'probability', 'endgame'])
+def test_seeded_games_are_identical_on_every_backend(shooter):
+    for seed in range(5):
+        results = {simulate_game('random', shooter, 'uniform', shooter, seed=seed, board_class=board_class)
+                   for board_class in BACKENDS}
+        assert len(results) == 1
+
+def test_sparse_board_matches_board_on_a_larger_grid():
+    results = {simulate_game('random', 'medium', 'random', 'medium', seed=7, board_class=board_class, size=13,
+                             max_shots=169)
+               for board_class in (Board, BitBoard, SparseBoard)}
+    assert len(results) == 1
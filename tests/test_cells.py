@@ -0,0 +1,44 @@
+# Cell indices, (row, column) pairs and coordinate strings must all describe the same cells.
+import pytest
+
+from board import Board
+from ships import Ships
+from utilities import (CELL_COUNT, CELL_INDEX, CELL_ROW_COL, COORDINATES, DIRECTION_STEPS, RAYS, cell_index,
+                       coordinate_to_indices, is_valid_coordinate)
+
+def test_tables_agree():
+    assert (COORDINATES[0], COORDINATES[9], COORDINATES[99]) == ("A1", "J1", "J10")
+    for index in range(CELL_COUNT):
+        row, col = CELL_ROW_COL[index]
+        assert cell_index(row, col) == index
+        assert CELL_INDEX[COORDINATES[index]] == index
+        assert coordinate_to_indices(COORDINATES[index].lower()) == (row, col)
+
+@pytest.mark.parametrize('coordinate, valid', [("A1", True), ("j10", True), ("K1", False), ("A11", False),
+                                               ("A0", False), ("", False), ("10A", False)])
+def test_valid_coordinates(coordinate, valid):
+    assert is_valid_coordinate(coordinate) == valid
+
+# Every ray walks one step at a time in its direction and stops at the edge of the board.
+@pytest.mark.parametrize('direction', sorted(DIRECTION_STEPS))
+def test_rays_reach_the_edge(direction):
+    row_step, col_step = DIRECTION_STEPS[direction]
+    for index in range(CELL_COUNT):
+        row, col = CELL_ROW_COL[index]
+        expected = []
+        row, col = row + row_step, col + col_step
+        while 0 <= row < 10 and 0 <= col < 10:
+            expected.append(cell_index(row, col))
+            row, col = row + row_step, col + col_step
+        assert list(RAYS[direction][index]) == expected
+
+def test_fire_index_matches_fire():
+    boards = [Board(1), Board(1)]
+    fleets = [Ships(1), Ships(1)]
+    for board, ships in zip(boards, fleets):
+        ships.set_num_ships(5)
+        board.place_ship_at(2, 2, 5, 'h')
+        board.place_ship_at(5, 0, 4, 'v')
+    for index in range(0, CELL_COUNT, 3):
+        assert boards[0].fire(COORDINATES[index], fleets[0]) == boards[1].fire_index(index, fleets[1])
+    assert boards[0].board == boards[1].board
@@ -0,0 +1,73 @@
+# The endgame solver's counts must match listing every arrangement by brute force, and it must give up
+# within its limits.
+import itertools
+import random
+
+import pytest
+
+from ships import Ships
+from endgame import count_arrangements, endgame_counts, endgame_shot
+from placements import placement_table
+
+# Misses everywhere below row 4, so only rows 1-4 are open and the positions stay small.
+OPEN_ROWS_MISS = sum(1 << cell for cell in range(40, 100))
+
+# Count the arrangements and the per-cell counts by trying every combination of placements.
+def brute_force(hit_mask, miss_mask, sunk_lengths, afloat_lengths):
+    table = placement_table(10)
+    choices = [[p.mask for p in table.for_length(length) if not p.mask & ~hit_mask] for length in sunk_lengths]
+    choices += [[p.mask for p in table.for_length(length) if not p.mask & miss_mask and p.mask & ~hit_mask]
+                for length in afloat_lengths]
+    arrangements = 0
+    counts = [0] * 100
+    for combination in itertools.product(*choices):
+        occupied = 0
+        for mask in combination:
+            if mask & occupied:
+                break
+            occupied |= mask
+        else:
+            if hit_mask & ~occupied:
+                continue  # A hit no ship explains
+            arrangements += 1
+            for mask in combination[len(sunk_lengths):]:
+                for cell in range(100):
+                    counts[cell] += mask >> cell & 1
+    return arrangements, counts
+
+@pytest.mark.parametrize('hits, sunk, afloat', [
+    ([0, 25], [], [3, 3]),
+    ([0, 25], [], [2, 3]),
+    ([12, 30, 31], [2], [3]),
+    ([5], [], [2, 2]),
+])
+def test_counts_match_brute_force(hits, sunk, afloat):
+    hit_mask = sum(1 << cell for cell in hits)
+    expected = brute_force(hit_mask, OPEN_ROWS_MISS, sunk, afloat)
+    assert expected[0] > 0
+    assert count_arrangements(hit_mask, OPEN_ROWS_MISS, sunk, afloat) == expected
+
+def test_gives_up_past_its_limits():
+    hit_mask = (1 << 0) | (1 << 25)
+    assert count_arrangements(hit_mask, OPEN_ROWS_MISS, [], [3, 3]) is not None
+    assert count_arrangements(hit_mask, OPEN_ROWS_MISS, [], [3, 3], max_configurations=10) is None
+    assert count_arrangements(hit_mask, OPEN_ROWS_MISS, [], [3, 3], max_nodes=100) is None
+    assert count_arrangements(hit_mask, OPEN_ROWS_MISS, [], [3, 3], time_cap=0) is None
+    assert count_arrangements(hit_mask, 0, [], [3, 3]) is None  # Too many arrangements on an open board
+
+def test_not_an_endgame_at_the_start():
+    assert endgame_counts(0, 0, [], [1, 2, 3, 4, 5]) is None
+
+# With one 2-ship left and a single hit, the shot goes next to the hit.
+def test_shoots_next_to_the_last_hit():
+    random.seed(13)
+    ships = Ships(2)
+    ships.set_fleet([2, 3])
+    for _ in range(3):
+        ships.hit_unit(2)  # The 3-ship is sunk
+    ships.hit_unit(1)
+    hit_mask = (1 << 70) | (1 << 71) | (1 << 72) | (1 << 44)
+    miss_mask = (1 << 34) | (1 << 43)
+    index = endgame_shot(hit_mask, miss_mask, ships, set())
+    assert index in (45, 54)
+    assert endgame_shot(hit_mask, miss_mask, ships, {(4, 5), (5, 4)}) is None  # Nothing left worth a shot
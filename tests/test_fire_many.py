@@ -0,0 +1,100 @@
+# A volley must have exactly the effect of firing at its cells one by one with `fire_index`, on every backend.
+import random
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from game_io import ScriptedIO
+from game import Game
+from switch_players import SwitchPlayers
+from utilities import row_cells
+
+BACKENDS = (Board, BitBoard, SparseBoard)
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+@pytest.mark.parametrize('seed', range(25))
+def test_volley_matches_single_shots(placed_board, grid, board_class, seed):
+    rng = random.Random(seed)
+    volleys = [[rng.randrange(100) for _ in range(rng.randrange(1, 40))] for _ in range(4)]  # With repeats
+    one_by_one, single_ships = placed_board(board_class, seed)
+    batched, batched_ships = placed_board(board_class, seed)
+    for cells in volleys:
+        results = [one_by_one.fire_index(index, single_ships) for index in cells]
+        volley = batched.fire_many(cells, batched_ships)
+        assert volley.results == results
+        assert len(volley.sunk) == results.count(2)
+        assert grid(batched) == grid(one_by_one)
+        assert batched.remaining_segments == one_by_one.remaining_segments
+        assert batched_ships.remaining_units == single_ships.remaining_units
+        assert batched.game_over() == one_by_one.game_over()
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_sunk_ships_in_the_order_they_went_down(placed_board, board_class):
+    board, ships = placed_board(board_class, 8)
+    single, single_ships = placed_board(board_class, 8)
+    cells = list(range(99, -1, -1))
+    sunk = []
+    for index in cells:
+        ship_id = single.board[index // 10][index % 10]  # Read before the shot turns it into "X"
+        if single.fire_index(index, single_ships) == 2:
+            sunk.append(ship_id)
+    assert board.fire_many(cells, ships).sunk == sunk
+    assert len(sunk) == 5
+    assert board.game_over()
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_strikes_match_single_shots(placed_board, grid, board_class):
+    board, ships = placed_board(board_class, 2)
+    single, single_ships = placed_board(board_class, 2)
+    board.strike_row(3, ships)
+    board.strike_column(7, ships)
+    board.bomb(0, 0, ships)
+    for index in list(row_cells(3)) + list(range(7, 100, 10)) + [0, 1, 10, 11]:
+        single.fire_index(index, single_ships)
+    assert grid(board) == grid(single)
+    assert ships.remaining_units == single_ships.remaining_units
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_volley_on_a_larger_board(placed_board, grid, board_class):
+    board, ships = placed_board(board_class, 6, 13)
+    single, single_ships = placed_board(board_class, 6, 13)
+    cells = list(range(0, 169, 3))
+    assert board.fire_many(cells, ships).results == [single.fire_index(index, single_ships) for index in cells]
+    assert grid(board) == grid(single)
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_off_board_cells_are_rejected_before_firing(placed_board, grid, board_class):
+    board, ships = placed_board(board_class, 1)
+    before = grid(board)
+    for cells in ([5, 100], [-1, 5], range(95, 105)):
+        with pytest.raises(ValueError):
+            board.fire_many(cells, ships)
+    assert grid(board) == before
+    assert board.fire_many([], ships).results == []
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_generator_of_cells(placed_board, grid, board_class):
+    board, ships = placed_board(board_class, 2)
+    copy, copy_ships = placed_board(board_class, 2)
+    volley = board.fire_many((index for index in range(0, 100, 7)), ships)
+    assert volley.results == copy.fire_many(list(range(0, 100, 7)), copy_ships).results
+    assert grid(board) == grid(copy)
+    with pytest.raises(ValueError):
+        board.fire_many((index for index in (3, 100)), ships)
+
+def test_salvo_names_the_bad_coordinate(placed_board):
+    board, ships = placed_board(Board, 1)
+    with pytest.raises(ValueError, match="K1"):
+        board.salvo(["A1", "K1"], ships)
+    assert board.board[0][0] not in ("X", ".")
+
+# A salvo turn asks again until it gets one different, valid coordinate per ship afloat, then fires them together.
+def test_salvo_turn(placed_board):
+    io = ScriptedIO(["A1 B1", "A1 A1 A1 A1 A1", "A1 B1 C1 D1 K1", "A1 B1 C1 D1 E1"])
+    boards, ships = zip(placed_board(Board, 3), placed_board(Board, 4))
+    game = Game(list(boards), list(ships), SwitchPlayers(io=io), io=io)
+    assert not game.take_salvo_turn(0)
+    assert io.answered == 4
+    assert [boards[1].board[0][col] in ("X", ".") for col in range(6)] == [True] * 5 + [False]
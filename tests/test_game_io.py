@@ -0,0 +1,56 @@
+# A whole game must be playable from a script of answers, through the same prompts and checks as the terminal.
+import io
+
+import pytest
+
+from board import Board
+from ships import Ships
+from switch_players import SwitchPlayers
+from game import Game
+from game_io import NullIO, ScriptedIO
+
+def scripted_game(answers, transcript=None):
+    script = ScriptedIO(answers, transcript)
+    game = Game([Board(1, io=script), Board(2, io=script)], [Ships(1, io=script), Ships(2, io=script)],
+                SwitchPlayers(io=script), io=script)
+    return game, script
+
+# Setup asks again after every bad answer: a fleet size out of range, an unknown orientation, a ship off the board.
+def test_setup_repeats_bad_answers():
+    game, script = scripted_game(["", "7", "2", "x", "h", "A1", "v", "J10", "J1", ""])
+    game.game_setup(0)
+    assert script.answered == 10
+    assert game.boards[0].board[0][0] == 1
+    assert [game.boards[0].board[row][9] for row in range(2)] == [2, 2]
+    assert game.currentplayer.player_num == 2
+
+def test_scripted_game_to_the_end():
+    transcript = io.StringIO()
+    answers = ["", "1", "h", "A1", ""]  # Player 1 places a 1-ship at A1
+    answers += ["", "1", "h", "B2", ""]  # Player 2 places a 1-ship at B2
+    answers += ["A1"]  # Player 1 fires at A1 and misses
+    answers += ["B2"]  # Player 2 fires at B2 and misses
+    answers += ["B2"]  # Player 1 sinks the 1-ship at B2
+    game, script = scripted_game(answers, transcript)
+    game.game_setup(0)
+    game.game_setup(1)
+    assert not game.take_turn(0)
+    assert not game.take_turn(1)
+    assert game.take_turn(0)
+    assert script.answered == len(answers)
+    output = transcript.getvalue()
+    assert "Input the coordinate you want to fire at (e.g., A5 or A10): B2\n" in output
+    assert output.rstrip().endswith("GAME OVER: Player 1 wins!")
+
+def test_running_out_of_answers():
+    game, script = scripted_game([""])
+    with pytest.raises(EOFError, match="after 1 lines"):
+        game.game_setup(0)
+    with pytest.raises(EOFError):
+        NullIO().read("Anything? ")
+
+def test_script_from_a_file(tmp_path):
+    path = tmp_path / "moves.txt"
+    path.write_text("first\n\nthird\n")
+    script = ScriptedIO.from_file(str(path))
+    assert [script.read(), script.read(), script.read()] == ["first", "", "third"]
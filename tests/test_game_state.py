@@ -0,0 +1,135 @@
+# Snapshots must capture a game completely: restoring, forking and serializing one must all give back the same game.
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from ai import ShotPool, ai_fire_medium, new_ai_state, update_ai_state
+from game_state import apply_shot, capture_state, decode_state, encode_state, fleet_sunk, restore_state
+
+BACKENDS = (Board, BitBoard, SparseBoard)
+
+# `played_game(seed, shots)` returns a game between two seeded fleets with `shots` medium-AI shots fired at player 1's
+# board, as the parts `capture_state` takes.
+@pytest.fixture
+def played_game(placed_board):
+    def play(seed, shots, board_class=Board, size=10):
+        boards, ships = zip(placed_board(board_class, seed + 1000, size), placed_board(board_class, seed, size))
+        boards, ships = list(boards), list(ships)
+        ai_state = new_ai_state()
+        targeted = ShotPool(size)
+        for _ in range(shots):
+            index = ai_fire_medium(boards[0], ai_state, targeted)
+            fire_result = boards[0].fire_index(index, ships[0])
+            update_ai_state(ai_state, fire_result, *divmod(index, size))
+            if boards[0].game_over():
+                break
+        game = SimpleNamespace(player_hits=[2, 1])
+        players = SimpleNamespace(player_num=2)
+        return boards, ships, game, players, ai_state, targeted
+    return play
+
+# `snapshot_of(seed, shots)` is the `GameState` of such a game.
+@pytest.fixture
+def snapshot_of(played_game):
+    def snapshot(seed, shots, board_class=Board, size=10):
+        return capture_state(*played_game(seed, shots, board_class, size))
+    return snapshot
+
+@pytest.mark.parametrize('shots', [0, 25, 60])
+def test_bytes_round_trip(snapshot_of, shots):
+    state = snapshot_of(1, shots)
+    assert decode_state(encode_state(state)) == state
+
+def test_bytes_round_trip_on_a_larger_board(snapshot_of):
+    state = snapshot_of(2, 40, SparseBoard, 13)
+    assert state.size == 13
+    assert decode_state(encode_state(state)) == state
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_restore_gives_back_the_same_game(played_game, grid, board_class):
+    boards, ships, game, players, ai_state, targeted = played_game(3, 35)
+    state = capture_state(boards, ships, game, players, ai_state, targeted)
+    restored = restore_state(state, board_class)
+    for original, copy in zip(boards, restored.boards):
+        assert grid(copy) == grid(original)
+        assert copy.remaining_segments == original.remaining_segments
+    for original, copy in zip(ships, restored.ships):
+        assert copy.remaining_units == original.remaining_units
+    assert restored.player_hits == game.player_hits
+    assert restored.player_num == players.player_num
+    assert restored.ai_state == ai_state
+    assert sorted(restored.ai_targeted_coordinates) == sorted(targeted)
+    assert capture_state(restored.boards, restored.ships, SimpleNamespace(player_hits=restored.player_hits),
+                         SimpleNamespace(player_num=restored.player_num), restored.ai_state,
+                         restored.ai_targeted_coordinates) == state
+
+# The AI's directions come back in the order it tried them, not in a fixed order.
+def test_directions_keep_their_order(played_game):
+    boards, ships, game, players, ai_state, targeted = played_game(7, 10)
+    ai_state.update(last_hit=(4, 4), target_mode=True, directions_tried=['left', 'up'], direction='up',
+                    steps_in_current_direction=2, initial_hit=(4, 5))
+    restored = restore_state(decode_state(encode_state(capture_state(boards, ships, game, players, ai_state,
+                                                                     targeted))))
+    assert restored.ai_state == ai_state
+    assert restored.ai_state['directions_tried'] == ['left', 'up']
+
+# An AI that has not fired yet may be saved without its shot pool.
+def test_ai_state_without_shots(played_game):
+    boards, ships, game, players, _, _ = played_game(8, 0)
+    state = capture_state(boards, ships, game, players, new_ai_state())
+    restored = restore_state(decode_state(encode_state(state)))
+    assert restored.ai_state == new_ai_state()
+    assert len(restored.ai_targeted_coordinates) == 0
+
+def test_restores_are_independent(snapshot_of):
+    state = snapshot_of(4, 20)
+    first = restore_state(state)
+    second = restore_state(state)
+    for index in range(100):
+        first.boards[0].fire_index(index, first.ships[0])
+    first.ai_state['directions_tried'].append('up')
+    assert first.boards[0].game_over()
+    assert not second.boards[0].game_over()
+    assert second.ai_state['directions_tried'] == list(state.ai_state[2])
+    assert restore_state(state).boards[0].remaining_segments == second.boards[0].remaining_segments
+
+# The restored AI picks up where it left off: it never fires at a cell twice and finishes the game.
+# (Its random draws need not repeat the original's, as the pool's order is not part of the snapshot.)
+def test_restored_ai_plays_on(played_game):
+    boards, ships, game, players, ai_state, targeted = played_game(5, 30)
+    restored = restore_state(capture_state(boards, ships, game, players, ai_state, targeted))
+    board = restored.boards[0]
+    fired = {index for index in range(100) if board.board[index // 10][index % 10] in ("X", ".")}
+    while not board.game_over():
+        index = ai_fire_medium(board, restored.ai_state, restored.ai_targeted_coordinates)
+        assert index not in fired
+        fired.add(index)
+        fire_result = board.fire_index(index, restored.ships[0])
+        update_ai_state(restored.ai_state, fire_result, *divmod(index, 10))
+    assert restored.ships[0].units_left == 0
+
+@pytest.mark.parametrize('seed', range(5))
+def test_apply_shot_matches_firing_at_a_board(snapshot_of, seed):
+    state = snapshot_of(seed, 10)
+    board = restore_state(state)
+    rng = random.Random(seed)
+    order = list(range(100))
+    rng.shuffle(order)
+    for index in order:
+        forked, fire_result = apply_shot(state, 1, index)
+        assert fire_result == board.boards[0].fire_index(index, board.ships[0])
+        assert fleet_sunk(forked, 0) == board.boards[0].game_over()
+        assert restore_state(forked).boards[0].remaining_segments == board.boards[0].remaining_segments
+        state = forked
+    assert fleet_sunk(state, 0)
+
+def test_apply_shot_leaves_the_original_alone(snapshot_of):
+    state = snapshot_of(6, 0)
+    forked, _ = apply_shot(state, 1, 55)
+    assert forked != state
+    assert (state.players[0].hits | state.players[0].misses) == 0
+    assert apply_shot(forked, 1, 55) == (forked, 0)  # A cell already fired at counts as a miss
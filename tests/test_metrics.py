@@ -0,0 +1,71 @@
+# Metrics must add up across labels and processes, and the engine must report what it did when they are on.
+import pytest
+
+from metrics import METRICS, Histogram, Metrics
+from simulation import simulate_game
+
+# Turn the global metrics on for one test and leave them off and empty afterwards.
+@pytest.fixture
+def engine_metrics():
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+def counter(metrics, name, **labels):
+    return metrics.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+def test_counters_are_kept_per_label():
+    metrics = Metrics()
+    metrics.count('shots_total')
+    metrics.count('shots_total', 4)
+    metrics.count('shots_total', ai='easy')
+    assert counter(metrics, 'shots_total') == 5
+    assert counter(metrics, 'shots_total', ai='easy') == 1
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 2, 5))
+    for value in (0.5, 1, 3, 7, 7):
+        histogram.observe(value)
+    assert histogram.counts == [2, 0, 1, 2]
+    assert histogram.cumulative() == [2, 2, 3, 5]
+    assert (histogram.sum, histogram.count) == (18.5, 5)
+
+def test_merge_adds_up():
+    first, second = Metrics(), Metrics()
+    for metrics in (first, second):
+        metrics.count('hits_total', 2)
+        metrics.observe('fire_seconds', 0.001)
+    second.count('sinks_total')
+    first.merge(second.to_dict())
+    assert counter(first, 'hits_total') == 4 and counter(first, 'sinks_total') == 1
+    assert first.histograms[('fire_seconds', ())].count == 2
+    other = Metrics()
+    other.observe('fire_seconds', 1, buckets=(1, 2))
+    with pytest.raises(ValueError):
+        first.merge(other.to_dict())
+
+def test_prometheus_export():
+    metrics = Metrics()
+    metrics.count('shots_total', 3, ai='easy')
+    metrics.observe('fire_seconds', 0.5, buckets=(1,))
+    lines = metrics.to_prometheus().splitlines()
+    assert '# TYPE battleship_shots_total counter' in lines
+    assert 'battleship_shots_total{ai="easy"} 3' in lines
+    assert 'battleship_fire_seconds_bucket{le="1.0"} 1' in lines
+    assert 'battleship_fire_seconds_bucket{le="+Inf"} 1' in lines
+    assert 'battleship_fire_seconds_count 1' in lines
+
+def test_simulated_games_are_counted(engine_metrics):
+    result = simulate_game('random', 'medium', 'random', 'easy', seed=1)
+    assert counter(engine_metrics, 'shots_total') == sum(result.shots)
+    assert counter(engine_metrics, 'sinks_total') >= 5
+    decisions = {labels: histogram.count for (name, labels), histogram in engine_metrics.histograms.items()
+                 if name == 'ai_decision_seconds'}
+    assert decisions == {(('ai', 'medium'),): result.shots[0], (('ai', 'easy'),): result.shots[1]}
+
+def test_nothing_is_recorded_when_off():
+    METRICS.reset()
+    simulate_game('random', 'medium', 'random', 'easy', seed=1)
+    assert METRICS.counters == {} and METRICS.histograms == {}
@@ -0,0 +1,67 @@
+# The Monte Carlo AI must only fire at new cells, finish off ships it has hit and fall back when it cannot sample.
+import random
+
+import pytest
+
+import ai
+from board import Board
+from ships import Ships
+from ai import ai_fire_monte_carlo, ai_place_ships
+
+def standard_fleet():
+    ships = Ships(2)
+    ships.set_num_ships(5)
+    ships.load_types()
+    return ships
+
+# A clock that moves on by a fixed step every time it is read, so the AI draws the same number of layouts however
+# fast (or busy) the machine is. With only a handful of samples, the AI's choices are close to random.
+@pytest.fixture
+def steady_clock(monkeypatch):
+    now = [0.0]
+    def perf_counter():
+        now[0] += 0.0001
+        return now[0]
+    monkeypatch.setattr(ai.time, 'perf_counter', perf_counter)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_follows_up_a_hit(seed, steady_clock):
+    random.seed(seed)
+    board = Board(2)
+    ships = standard_fleet()
+    board.place_ship_at(4, 3, 5, 'h')
+    board.fire("E5", ships)
+    targeted = {(4, 4)}
+    ai_fire_monte_carlo(board, ships, targeted, time_budget=0.02)
+    (row, col), = targeted - {(4, 4)}
+    assert abs(row - 4) + abs(col - 4) == 1
+
+def test_fires_at_new_cells_until_the_fleet_is_sunk(steady_clock):
+    random.seed(9)
+    board = Board(2)
+    ships = standard_fleet()
+    ai_place_ships(board, ships)
+    targeted = set()
+    shots = 0
+    while not board.game_over():
+        before = set(targeted)
+        ai_fire_monte_carlo(board, ships, targeted, time_budget=0.001)
+        (row, col), = targeted - before
+        assert board.board[row][col] not in ("X", ".")
+        board.fire(chr(ord('A') + col) + str(row + 1), ships)
+        shots += 1
+    assert shots < 100
+
+# A fleet that cannot fit what the AI has seen (here a ship reported sunk without any hits) cannot be sampled,
+# so the probability AI picks the shot instead.
+def test_falls_back_to_the_probability_map(monkeypatch):
+    calls = []
+    fallback = ai.ai_fire_probability
+    monkeypatch.setattr(ai, 'ai_fire_probability', lambda *args, **kwargs: calls.append(args) or fallback(*args, **kwargs))
+    random.seed(10)
+    ships = standard_fleet()
+    ships.hit_unit(1)
+    targeted = set()
+    ai_fire_monte_carlo(Board(2), ships, targeted, time_budget=0.001)
+    assert len(calls) == 1
+    assert len(targeted) == 1
@@ -0,0 +1,32 @@
+# The placement tables must list every legal position of every ship exactly once, with masks matching the cells.
+import pytest
+
+from board import Board
+from placements import MAX_SHIP_LENGTH, placement_at, placement_table
+
+@pytest.mark.parametrize('length', range(1, MAX_SHIP_LENGTH + 1))
+def test_every_placement_is_listed_once(length):
+    table = placement_table(10)
+    for orientation in ('h', 'v'):
+        placements = table.by_ship[(length, orientation)]
+        assert len(placements) == 10 * (11 - length)
+        assert len({placement.cells for placement in placements}) == len(placements)
+        for placement in placements:
+            assert all(0 <= row < 10 and 0 <= col < 10 for row, col in placement.cells)
+            assert placement.mask == sum(1 << (row * 10 + col) for row, col in placement.cells)
+            assert placement_at(placement.row, placement.col, length, orientation) is placement
+    assert len(table.for_length(length)) == 2 * 10 * (11 - length)
+
+def test_lookups():
+    placement = placement_at(2, 3, 3, 'v')
+    assert placement.cells == ((2, 3), (3, 3), (4, 3))
+    assert placement_at(0, 8, 3, 'h') is None  # Runs off the right edge
+    assert placement_at(8, 0, 3, 'v') is None  # Runs off the bottom
+    assert placement_table(10) is placement_table(10)
+
+def test_board_checks_overlaps_with_the_masks():
+    board = Board(1)
+    board.add_ship(placement_at(0, 0, 5, 'h'))
+    assert not board.can_place(placement_at(0, 4, 2, 'v'))
+    assert board.can_place(placement_at(1, 0, 5, 'h'))
+    assert [board.board[0][col] for col in range(6)] == [5, 5, 5, 5, 5, "~"]
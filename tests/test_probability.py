@@ -0,0 +1,71 @@
+# The probability AI's vectorized placement counts must match counting every placement one by one.
+import random
+
+import numpy as np
+import pytest
+
+from board import Board
+from ships import Ships
+from ai import HIT_WEIGHT, _row_density, ai_fire_probability
+
+# Weighted count of the horizontal placements covering each cell, one placement at a time.
+def slow_row_density(blocked, hits, lengths, target_mode):
+    rows, size = blocked.shape
+    density = np.zeros(blocked.shape)
+    for length in lengths:
+        for row in range(rows):
+            for start in range(size - length + 1):
+                cells = range(start, start + length)
+                if any(blocked[row, col] for col in cells):
+                    continue
+                weight = 1 + HIT_WEIGHT * sum(hits[row, col] for col in cells) if target_mode else 1
+                for col in cells:
+                    density[row, col] += weight
+    return density
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('target_mode', [False, True])
+def test_row_density_counts_every_placement(seed, target_mode):
+    rng = np.random.default_rng(seed)
+    blocked = (rng.random((10, 10)) < 0.2).astype(np.int32)
+    hits = ((rng.random((10, 10)) < 0.1) & (blocked == 0)).astype(np.int32)
+    lengths = [1, 2, 3, 4, 5]
+    expected = slow_row_density(blocked, hits, lengths, target_mode)
+    assert np.array_equal(_row_density(blocked, hits, lengths, target_mode), expected)
+    assert np.array_equal(_row_density(blocked.T, hits.T, lengths, target_mode).T,
+                          slow_row_density(blocked.T, hits.T, lengths, target_mode).T)
+
+# On an empty board the middle of the board is covered by the most placements, never the corners.
+def test_opening_shot_avoids_the_corners():
+    random.seed(1)
+    ships = Ships(2)
+    ships.set_num_ships(5)
+    targeted = set()
+    ai_fire_probability(Board(2), ships, targeted)
+    (row, col), = targeted
+    assert 3 <= row <= 6 and 3 <= col <= 6
+
+# After a hit on a ship that is still afloat, the next shot goes right next to it.
+@pytest.mark.parametrize('seed', range(5))
+def test_follows_up_a_hit(seed):
+    random.seed(seed)
+    board = Board(2)
+    ships = Ships(2)
+    ships.set_num_ships(5)
+    board.place_ship_at(4, 3, 5, 'h')
+    board.fire("E5", ships)
+    targeted = {(4, 4)}
+    ai_fire_probability(board, ships, targeted)
+    (row, col), = targeted - {(4, 4)}
+    assert abs(row - 4) + abs(col - 4) == 1
+
+# Cells already fired at are never chosen again.
+def test_never_fires_twice():
+    random.seed(2)
+    board = Board(2)
+    ships = Ships(2)
+    ships.set_num_ships(5)
+    targeted = set()
+    for _ in range(100):
+        ai_fire_probability(board, ships, targeted)
+    assert targeted == {(row, col) for row in range(10) for col in range(10)}
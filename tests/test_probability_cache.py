@@ -0,0 +1,48 @@
+# The probability map cache must behave as a bounded LRU and only keep the opening positions worth sharing.
+import random
+
+import numpy as np
+
+from board import Board
+from ships import Ships
+from ai import PROBABILITY_CACHE_MAX_KNOWN_CELLS, ProbabilityCache, ai_fire_probability
+
+def test_least_recently_used_map_is_dropped():
+    cache = ProbabilityCache(maxsize=2)
+    maps = [np.full((10, 10), i, dtype=np.float32) for i in range(3)]
+    cache.put('a', maps[0])
+    cache.put('b', maps[1])
+    assert cache.get('a') is maps[0]  # 'b' is now the least recently used
+    cache.put('c', maps[2])
+    assert cache.get('b') is None
+    assert cache.get('a') is maps[0] and cache.get('c') is maps[2]
+    assert cache.stats()['entries'] == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and cache.memory_bytes == 0
+
+def new_game():
+    ships = Ships(2)
+    ships.set_num_ships(5)
+    return Board(2), ships
+
+def test_opening_maps_are_shared():
+    random.seed(11)
+    cache = ProbabilityCache()
+    for _ in range(3):
+        board, ships = new_game()
+        ai_fire_probability(board, ships, set(), cache)
+    assert cache.stats()['entries'] == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+# Positions with more known cells than the limit are computed every time and never stored.
+def test_later_positions_are_not_cached():
+    random.seed(12)
+    cache = ProbabilityCache()
+    board, ships = new_game()
+    for index in range(PROBABILITY_CACHE_MAX_KNOWN_CELLS + 1):
+        board.fire(chr(ord('A') + index) + "1", ships)
+    ai_fire_probability(board, ships, set(), cache)
+    ai_fire_probability(board, ships, set(), cache)
+    assert cache.stats()['entries'] == 0
+    assert cache.hits == 0
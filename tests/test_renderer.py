@@ -0,0 +1,59 @@
+# The ANSI renderer must draw a panel once and afterwards only send the cells that changed.
+import io
+import re
+
+from renderer import OWN_BOARD, OPPONENT_BOARD, AnsiRenderer, PlainRenderer, panel_lines
+
+CURSOR_MOVE = re.compile(r"\x1b\[(\d+);(\d+)H")
+
+def empty_rows():
+    return [["~"] * 10 for _ in range(10)]
+
+def test_first_frame_draws_the_whole_panel():
+    stream = io.StringIO()
+    renderer = AnsiRenderer(stream)
+    renderer.show(OWN_BOARD, "Your board", empty_rows())
+    output = stream.getvalue()
+    assert output.startswith("\x1b[2J")  # The screen is cleared once, on the first frame
+    for line in panel_lines("Your board", empty_rows()):
+        assert line in output
+
+def test_later_frames_only_send_changed_cells():
+    stream = io.StringIO()
+    renderer = AnsiRenderer(stream)
+    rows = empty_rows()
+    renderer.show(OWN_BOARD, "Your board", rows)
+    rows[4][6] = "X"
+    stream.seek(0)
+    stream.truncate()
+    renderer.show(OWN_BOARD, "Your board", rows)
+    output = stream.getvalue()
+    moves = CURSOR_MOVE.findall(output)
+    assert len(moves) == 1
+    assert int(moves[0][0]) == 4 + 3  # Below the title and the column header, counting lines from 1
+    assert output == "\x1b7" + "\x1b[{};{}H".format(*moves[0]) + "X" + "\x1b8"
+
+    stream.seek(0)
+    stream.truncate()
+    renderer.show(OWN_BOARD, "Your board", rows)
+    assert CURSOR_MOVE.findall(stream.getvalue()) == []  # Nothing changed, nothing is drawn
+
+def test_panels_are_side_by_side_and_redrawn_after_a_clear():
+    stream = io.StringIO()
+    renderer = AnsiRenderer(stream)
+    renderer.show(OWN_BOARD, "Yours", empty_rows())
+    renderer.show(OPPONENT_BOARD, "Theirs", empty_rows())
+    columns = {int(column) for _, column in CURSOR_MOVE.findall(stream.getvalue())}
+    assert len(columns) == 2  # The first column (the scrolling text and the player's panel) and the opponent's panel
+    renderer.clear()
+    stream.seek(0)
+    stream.truncate()
+    renderer.show(OWN_BOARD, "Yours", empty_rows())
+    assert "Yours" in stream.getvalue()
+
+def test_plain_renderer_prints_every_panel_in_full():
+    stream = io.StringIO()
+    renderer = PlainRenderer(stream)
+    renderer.show(OWN_BOARD, "Your board", empty_rows())
+    renderer.show(OWN_BOARD, "Your board", empty_rows())
+    assert stream.getvalue() == 2 * ("\n".join(panel_lines("Your board", empty_rows())) + "\n")
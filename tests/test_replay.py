@@ -0,0 +1,73 @@
+# Replay logs must reproduce the games they record, on the standard board and on other sizes.
+import io
+import struct
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from sparse_board import SparseBoard
+from replay import MAGIC, MAX_DESCRIPTION, GameReplay, ReplayReader, ReplayWriter, record_width
+from simulation import simulate_game
+
+# Play a seeded game into a replay log and return (result, log bytes).
+def recorded_game(seed, shooter='medium', **kwargs):
+    stream = io.BytesIO()
+    writer = ReplayWriter(stream, seed=seed, description=shooter + " vs " + shooter)
+    result = simulate_game('random', shooter, 'random', shooter, seed=seed, replay=writer, **kwargs)
+    return result, stream.getvalue()
+
+# Replay a log to the end and return (replay, records).
+def replayed(log, **kwargs):
+    replay = GameReplay(io.BytesIO(log), **kwargs)
+    return replay, list(replay)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_standard_game_round_trip(seed):
+    result, log = recorded_game(seed)
+    reader = ReplayReader(io.BytesIO(log))
+    assert (reader.size, reader.width, reader.seed) == (10, 1, seed)
+    assert reader.description == "medium vs medium"
+
+    replay, records = replayed(log)
+    assert replay.winner() == result.winner
+    shots = [0, 0]
+    for record in records:
+        shots[record[1]] += 1
+    assert tuple(shots) == result.shots
+
+@pytest.mark.parametrize('board_class', [Board, BitBoard, SparseBoard])
+def test_larger_board_round_trip(board_class):
+    result, log = recorded_game(11, board_class=board_class, size=13, max_shots=169)
+    reader = ReplayReader(io.BytesIO(log))
+    assert (reader.size, reader.width) == (13, record_width(13))
+    replay, records = replayed(log, board_class=board_class)
+    assert replay.winner() == result.winner
+    assert len(records) == sum(result.shots)
+
+def test_more_than_255_ships_round_trip():
+    fleet = [2] * 300
+    result, log = recorded_game(1, shooter='easy', board_class=SparseBoard, size=60, fleet=fleet, max_shots=3600)
+    reader = ReplayReader(io.BytesIO(log))
+    assert [len(ships) for ships in reader.fleets] == [300, 300]
+    replay, _ = replayed(log, board_class=SparseBoard)
+    assert replay.winner() == result.winner
+
+def test_long_description_is_cut_on_a_character_boundary():
+    stream = io.BytesIO()
+    writer = ReplayWriter(stream, description="é" * 200)  # 400 bytes of two-byte characters
+    writer.write_header([Board(1), Board(2)])
+    description = ReplayReader(io.BytesIO(stream.getvalue())).description
+    assert description == "é" * (MAX_DESCRIPTION // 2)
+
+def test_header_rejects_mismatched_sizes():
+    with pytest.raises(ValueError):
+        ReplayWriter(io.BytesIO()).write_header([Board(1), Board(2, 12)])
+    with pytest.raises(ValueError):
+        ReplayWriter(io.BytesIO(), size=12).write_header([Board(1), Board(2)])
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        ReplayReader(io.BytesIO(b"not a replay"))
+    with pytest.raises(ValueError):
+        ReplayReader(io.BytesIO(MAGIC + bytes([9]) + struct.pack('<HBBq', 10, 0, 1, 0)))
@@ -0,0 +1,81 @@
+# Archives must hand back every game's log byte for byte, with or without an up-to-date index.
+import io
+import os
+
+from replay import ReplayWriter
+from replay_archive import ArchiveReader, ArchiveWriter, build_index, compact_archive, index_path
+from simulation import simulate_game
+
+# Replay logs of a few seeded games, the last one on a 13x13 board.
+def game_logs(count=6):
+    logs = []
+    for seed in range(count):
+        stream = io.BytesIO()
+        size = 13 if seed == count - 1 else 10
+        simulate_game('random', 'medium', 'random', 'easy', seed=seed, replay=ReplayWriter(stream, seed=seed),
+                      size=size, max_shots=size * size)
+        logs.append(stream.getvalue())
+    return logs
+
+def write_archive(path, logs):
+    with ArchiveWriter(path) as writer:
+        for log in logs:
+            writer.append(log)
+
+def test_random_access_without_an_index(tmp_path):
+    path = str(tmp_path / 'games.bsa')
+    logs = game_logs()
+    write_archive(path, logs)
+    with ArchiveReader(path) as archive:
+        assert len(archive) == len(logs)
+        assert archive[3] == logs[3]
+        assert list(archive.logs(1, 4)) == logs[1:4]
+        assert archive.reader(2).seed == 2
+        assert archive.reader(len(logs) - 1).size == 13
+
+def test_index_matches_a_scan(tmp_path):
+    path = str(tmp_path / 'games.bsa')
+    logs = game_logs()
+    write_archive(path, logs)
+    assert build_index(path) == len(logs)
+    assert os.path.getsize(index_path(path)) == 8 * len(logs)
+    with ArchiveReader(path) as archive:
+        assert list(archive.logs()) == logs
+
+def test_stale_index_falls_back_to_a_scan(tmp_path):
+    path = str(tmp_path / 'games.bsa')
+    logs = game_logs()
+    write_archive(path, logs[:3])
+    build_index(path)
+    write_archive(path, logs[3:])  # Appending does not update the index
+    with ArchiveReader(path) as archive:
+        assert list(archive.logs()) == logs
+
+def test_compact_merges_and_drops_cut_frames(tmp_path):
+    first = str(tmp_path / 'worker1.bsa')
+    second = str(tmp_path / 'worker2.bsa')
+    merged = str(tmp_path / 'games.bsa')
+    logs = game_logs()
+    write_archive(first, logs[:2])
+    write_archive(second, logs[2:])
+    with open(second, 'ab') as data:
+        data.write(b"\xff\x00\x00\x00partial")  # A frame that was still being written
+    compact_archive([first, second], merged)
+    with ArchiveReader(merged) as archive:
+        assert list(archive.logs()) == logs
+
+def test_games_replay_from_the_archive(tmp_path):
+    path = str(tmp_path / 'games.bsa')
+    write_archive(path, game_logs(3))
+    with ArchiveReader(path) as archive:
+        for number in range(len(archive)):
+            replay = archive.game(number)
+            list(replay)
+            assert replay.winner() is not None
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / 'empty.bsa')
+    write_archive(path, [])
+    assert build_index(path) == 0
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 0
@@ -0,0 +1,71 @@
+# The live segment count must always equal the unhit ship cells on the board, so `game_over` can trust it.
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from ships import Ships
+
+BACKENDS = (Board, BitBoard)
+
+# Unhit ship cells, counted the slow way.
+def unhit_cells(board):
+    return sum(isinstance(cell, int) for row in board.board for cell in row)
+
+# A board with ships 1-3 of the standard fleet: 1 at A1, 2 across B3-C3 and 3 down E5-E7.
+def small_fleet(board_class):
+    board = board_class(1)
+    ships = Ships(1)
+    ships.set_num_ships(3)
+    board.place_ship_at(0, 0, 1, 'h')
+    board.place_ship_at(2, 1, 2, 'h')
+    board.place_ship_at(4, 4, 3, 'v')
+    return board, ships
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_placing_adds_segments(board_class):
+    board, ships = small_fleet(board_class)
+    assert board.remaining_segments == unhit_cells(board) == ships.units_left == 6
+    assert not board.game_over()
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_shots_take_segments_off(board_class):
+    board, ships = small_fleet(board_class)
+    assert board.fire("J10", ships) == 0  # A miss changes nothing
+    assert board.remaining_segments == 6
+    assert board.fire("B3", ships) == 1
+    assert board.fire("B3", ships) == 0  # A repeated shot does not count twice
+    assert board.remaining_segments == unhit_cells(board) == ships.units_left == 5
+    assert board.fire("C3", ships) == 2
+    assert ships.remaining_units == [1, 0, 3]
+    for coordinate in ("A1", "E5", "E6", "E7"):
+        board.fire(coordinate, ships)
+    assert board.remaining_segments == unhit_cells(board) == ships.units_left == 0
+    assert board.game_over()
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_airstrikes_take_segments_off(board_class):
+    board, ships = small_fleet(board_class)
+    assert board.perform_airstrike(2, ships) == 2
+    assert board.perform_airstrike(2, ships) == 0
+    assert board.remaining_segments == unhit_cells(board) == ships.units_left == 4
+    assert ships.remaining_units == [1, 0, 3]
+    for row in (0, 4, 5, 6):
+        board.perform_airstrike(row, ships)
+    assert board.game_over()
+    assert ships.units_left == 0
+
+def test_hit_unit_reports_sinking():
+    ships = Ships(1)
+    ships.set_num_ships(2)
+    assert not ships.hit_unit(2)
+    assert ships.hit_unit(2)
+    assert ships.hit_unit(1)
+    assert ships.units_left == 0
+
+@pytest.mark.parametrize('board_class', BACKENDS)
+def test_cell_writes_keep_the_count(board_class):
+    board, ships = small_fleet(board_class)
+    board.set_cell(0, 0, ".")  # Overwrite the 1-ship with a miss
+    board.set_cell(9, 9, 2)  # Add a segment
+    board.set_cell(4, 4, "X")
+    assert board.remaining_segments == unhit_cells(board) == 5
@@ -0,0 +1,130 @@
+# A match written out by `encode_match` must come back from `decode_match` exactly as it was, and the store must
+# hand back spilled matches unchanged.
+import random
+
+import pytest
+
+from board import Board
+from bitboard import BitBoard
+from match import Match, SETUP, PLAYING, format_coordinate
+from metrics import METRICS
+from session_store import AI_NAMES, SessionStore, decode_match, encode_match, match_size
+from simulation import SHOOTERS
+
+# Place all of player 1's ships at random valid spots through `Match.place`.
+def place_fleet(match, rng):
+    for size in list(match.unplaced[0]):
+        while True:
+            try:
+                match.place(0, size, rng.choice('hv'), format_coordinate(rng.randrange(10), rng.randrange(10)))
+                break
+            except ValueError:
+                continue
+
+# Play `turns` turns of a match against the AI, with player 1 firing at random untargeted cells.
+def play(match, turns, rng):
+    cells = [(row, col) for row in range(10) for col in range(10)]
+    rng.shuffle(cells)
+    for row, col in cells[:turns]:
+        if match.phase != PLAYING:
+            break
+        if match.airstrike_ready:
+            match.airstrike(0, rng.randrange(10))
+        elif match.boards[1].board[row][col] not in ("X", "."):  # Airstrikes may have fired at it already
+            match.fire(0, format_coordinate(row, col))
+        match.ai_turn()
+
+# Everything that makes up a match's state, in plain values.
+def snapshot(match):
+    state = [match.match_id, match.ai, match.phase, match.turn, match.player_hits, match.airstrike_ready,
+             match.winner, match.unplaced]
+    for board, ships in zip(match.boards, match.ships):
+        state += [[list(row) for row in board.board], board.remaining_segments, board.placements,
+                  ships.remaining_units, ships.units_left]
+    if match.ai is not None:
+        state += [match.ai_state, sorted(match.ai_targeted_coordinates)]
+    return state
+
+def test_ai_names_cover_every_shooter():
+    assert set(AI_NAMES) == set(SHOOTERS)
+
+@pytest.mark.parametrize('ai', AI_NAMES)
+@pytest.mark.parametrize('turns', [0, 15, 60])
+def test_match_round_trip(ai, turns):
+    rng = random.Random(turns)
+    random.seed(turns)
+    match = Match(7, ai)
+    place_fleet(match, rng)
+    play(match, turns, rng)
+    restored = decode_match(encode_match(match))
+    assert snapshot(restored) == snapshot(match)
+
+def test_player_match_in_setup_round_trip():
+    match = Match(3, None, 3)
+    match.place(0, 3, 'v', "B2")
+    restored = decode_match(encode_match(match))
+    assert restored.phase == SETUP
+    assert snapshot(restored) == snapshot(match)
+
+def test_decode_onto_another_backend():
+    random.seed(5)
+    match = Match(9, 'medium')
+    place_fleet(match, random.Random(5))
+    play(match, 30, random.Random(5))
+    restored = decode_match(encode_match(match), BitBoard)
+    assert isinstance(restored.boards[0], BitBoard)
+    assert snapshot(restored) == snapshot(match)
+
+def test_restoring_does_not_count_shots():
+    random.seed(2)
+    match = Match(1, 'easy')
+    place_fleet(match, random.Random(2))
+    play(match, 20, random.Random(2))
+    data = encode_match(match)
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        before = dict(METRICS.counters)
+        decode_match(data)
+        assert METRICS.counters == before
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+
+def test_store_spills_and_restores(tmp_path):
+    store = SessionStore(str(tmp_path), max_bytes=1, idle_timeout=60, board_class=Board)
+    matches = []
+    for match_id in range(3):
+        random.seed(match_id)
+        match = Match(match_id, 'hard')
+        place_fleet(match, random.Random(match_id))
+        play(match, 10, random.Random(match_id))
+        matches.append(snapshot(match))
+        store.add(match)
+    # Only the newest match stays in memory under a 1-byte limit
+    assert store.stats()['spilled'] == 2
+    for match_id, expected in enumerate(matches):
+        assert snapshot(store.get(match_id)) == expected
+    assert store.get(99) is None
+
+def test_idle_matches_are_swept(tmp_path):
+    store = SessionStore(str(tmp_path), idle_timeout=10)
+    match = Match(4, 'easy')
+    store.add(match)
+    assert store.sweep(now=match.last_active + 5) == 0
+    assert store.sweep(now=match.last_active + 11) == 1
+    assert 4 in store
+    assert store.get(4).match_id == 4
+
+# A match is measured again whenever it is handed out, so the store follows it as it grows.
+def test_sizes_follow_the_matches(tmp_path):
+    store = SessionStore(str(tmp_path))
+    match = Match(5, 'medium')
+    store.add(match)
+    added = store.memory_bytes
+    rng = random.Random(5)
+    place_fleet(match, rng)
+    play(match, 30, rng)
+    store.get(5)
+    assert store.memory_bytes == store.sizes[5] == match_size(match)
+    assert store.memory_bytes != added
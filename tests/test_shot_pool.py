@@ -0,0 +1,58 @@
+# The shot pool must hand out every cell exactly once, however cells are drawn or marked as targeted.
+import random
+
+import pytest
+
+from board import Board
+from ai import ShotPool, ai_fire_easy, ai_fire_medium, new_ai_state
+
+ALL_CELLS = {(row, col) for row in range(10) for col in range(10)}
+
+# The pool's list and index must describe the same cells, and together with the targeted ones cover the board.
+def check_pool(pool):
+    assert all(pool.positions[cell] == i for i, cell in enumerate(pool.untargeted))
+    assert len(pool.positions) == len(pool.untargeted)
+    assert set(pool.untargeted) | pool.targeted == ALL_CELLS
+    assert not set(pool.untargeted) & pool.targeted
+
+@pytest.mark.parametrize('seed', range(5))
+def test_draws_and_adds_keep_the_pool_consistent(seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    pool = ShotPool()
+    drawn = []
+    while len(pool) < 100:
+        if rng.random() < 0.5:
+            drawn.append(pool.draw())
+        else:
+            pool.add((rng.randrange(10), rng.randrange(10)))  # May already be targeted
+        check_pool(pool)
+    assert len(set(drawn)) == len(drawn)
+    assert set(pool) == ALL_CELLS
+    with pytest.raises(IndexError):
+        pool.draw()
+
+def test_adding_twice_or_off_the_board_changes_nothing():
+    pool = ShotPool()
+    pool.add((3, 4))
+    pool.add((3, 4))
+    pool.add((10, 0))
+    assert len(pool) == 1 and (3, 4) in pool and (10, 0) not in pool
+    check_pool(pool)
+
+def test_easy_ai_fires_at_every_cell_once():
+    random.seed(7)
+    pool = ShotPool()
+    for _ in range(100):
+        ai_fire_easy(Board(1), pool)
+    assert set(pool) == ALL_CELLS
+
+# On a board with no ships the medium AI only hunts, and must never draw a cell twice.
+def test_medium_hunt_fires_at_every_cell_once():
+    random.seed(8)
+    board = Board(1)
+    pool = ShotPool()
+    ai_state = new_ai_state()
+    for _ in range(100):
+        ai_fire_medium(board, ai_state, pool)
+    assert set(pool) == ALL_CELLS